@@ -1,8 +1,10 @@
+from django.db import transaction
 from rest_framework import serializers
 from dj_rest_auth.registration.serializers import RegisterSerializer as \
                                                   js_RegisterSerializer
 
-from core.models import School
+from core.models import School, Profile
+from core.versions import touch
 
 
 class InviteSerializer(serializers.Serializer):
@@ -10,18 +12,27 @@ class InviteSerializer(serializers.Serializer):
 
 
 class RegisterSerializer(js_RegisterSerializer):
+    schools = serializers.ListField(child=serializers.IntegerField(),
+                                    required=False, write_only=True)
+
+    def validate_schools(self, ids):
+        ids = set(ids)
+        found = set(School.objects.filter(pk__in=ids)
+                    .values_list('pk', flat=True))
+        missing = sorted(ids - found)
+        if missing:
+            raise serializers.ValidationError(
+                "Invalid school ids %s." % missing
+            )
+        return sorted(found)
 
     def save(self, request):
-
-        if request.method == 'POST':
-            request_copy = request.data.copy()
-            schools_ids = []
-            if 'schools' in request_copy.keys():
-                schools_ids = request_copy.pop('schools')
-
+        with transaction.atomic():
             user = super().save(request)
-
-            for id in schools_ids:
-                School.objects.get(pk=id).users.add(user)
+            Profile.objects.bulk_create([
+                Profile(user=user, school_id=school_id)
+                for school_id in self.validated_data.get('schools', [])
+            ])
+        touch(Profile)
 
         return user
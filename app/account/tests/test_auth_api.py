@@ -1,9 +1,13 @@
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.contrib.auth import get_user_model
 
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from core.models import School, Profile
+
 
 class TestAuthApi(TestCase):
 
@@ -32,6 +36,63 @@ class TestAuthApi(TestCase):
         self.assertIn('user', res.data.keys())
         self.assertEquals(res.data.get('user')['email'], payload.get('email'))
 
+    def test_user_registration_joins_schools(self):
+        schools = [School.objects.create(basename="school-%d" % i,
+                                         name="School %d" % i)
+                   for i in range(3)]
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01",
+            "schools": [school.id for school in schools]
+        }
+        res = self.client.post(self.reg_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        user = get_user_model().objects.get(email=payload['email'])
+        self.assertEquals(
+            sorted(user.school_set.values_list('id', flat=True)),
+            payload['schools']
+        )
+
+    def test_user_registration_invalid_school(self):
+        school = School.objects.create(basename="school", name="School")
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01",
+            "schools": [school.id, school.id + 100]
+        }
+        res = self.client.post(self.reg_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('schools', res.data.keys())
+        self.assertFalse(get_user_model().objects.exists())
+        self.assertFalse(Profile.objects.exists())
+
+    def test_user_registration_queries_independent_of_schools(self):
+        schools = [School.objects.create(basename="school-%d" % i,
+                                         name="School %d" % i)
+                   for i in range(10)]
+
+        queries = []
+        for count in (1, 10):
+            payload = {
+                "email": "testuser%d@bondeveloper.com" % count,
+                "password1": "Qwerty!@#",
+                "password2": "Qwerty!@#",
+                "username": "testuser%d" % count,
+                "schools": [school.id for school in schools[:count]]
+            }
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.post(self.reg_url, payload, format='json')
+            self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+            queries.append(len(ctx.captured_queries))
+
+        self.assertEquals(queries[0], queries[1])
+
     def test_user_registration_email_required(self):
 
         payload = {
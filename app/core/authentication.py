@@ -0,0 +1,110 @@
+import os
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from dj_rest_auth.jwt_auth import JWTCookieAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+
+# short, because other processes only learn about changes when it expires
+USER_CACHE_TIMEOUT = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 30)
+
+
+def user_cache_key(user_id):
+    return 'auth:user:%s' % user_id
+
+
+def token_cache_key(key):
+    return 'auth:token:%s' % key
+
+
+# hits and misses of the user cache in this process. They are kept in
+# memory, so counting costs no cache round trip, and each worker has its
+# own; user.views.AuthCacheStatsView reports those of the one it runs in.
+_stats = {'hit': 0, 'miss': 0}
+
+
+def count(outcome):
+    _stats[outcome] += 1
+
+
+def cache_stats():
+    hits = _stats['hit']
+    misses = _stats['miss']
+    total = hits + misses
+    return {
+        'pid': os.getpid(),
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / total if total else 0.0,
+    }
+
+
+def forget_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+def forget_token(key):
+    cache.delete(token_cache_key(key))
+
+
+def cached_user(user_id, load):
+    """the cached user, or the result of ``load()`` which is then cached"""
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is not None:
+        count('hit')
+        return user
+
+    count('miss')
+    user = load()
+    cache.set(key, user, USER_CACHE_TIMEOUT)
+    return user
+
+
+def load_active_user(user_id):
+    try:
+        user = get_user_model().objects.get(pk=user_id)
+    except get_user_model().DoesNotExist:
+        raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+    if not user.is_active:
+        raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+    return user
+
+
+class CachedJWTCookieAuthentication(JWTCookieAuthentication):
+    """JWTCookieAuthentication that reads the token's user from the cache"""
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        return cached_user(user_id,
+                           partial(super().get_user, validated_token))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that caches which user a key belongs to, and the
+    user itself, instead of reading both on every request.
+    """
+
+    def authenticate_credentials(self, key):
+        user_id = cache.get(token_cache_key(key))
+        if user_id is None:
+            count('miss')
+            user, token = super().authenticate_credentials(key)
+            cache.set(token_cache_key(key), user.pk, USER_CACHE_TIMEOUT)
+            cache.set(user_cache_key(user.pk), user, USER_CACHE_TIMEOUT)
+            return user, token
+
+        user = cached_user(user_id, partial(load_active_user, user_id))
+        return user, self.get_model()(key=key, user_id=user_id)
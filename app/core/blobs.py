@@ -0,0 +1,76 @@
+"""
+Reference counts of the files in core.storage.ContentAddressedStorage.
+
+core.models.Blob counts the Attachments using each blob: signals
+``retain`` and ``release`` blobs as attachments are saved and deleted,
+and ``collect`` (the collect_blobs command) deletes the blobs nothing has
+used for a while, along with files whose attachment was never saved.
+
+Storing a file touches its blob, and ``collect`` leaves recently touched
+files alone, so a blob being reused is not collected under it.
+"""
+import os
+import time
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import Blob
+from core.storage import BLOBS_DIR, blob_prefix, is_blob
+
+
+def count(name, sign):
+    """add (sign 1) or take away (sign -1) a use of blob ``name``"""
+    if not is_blob(name):
+        return
+
+    blobs = Blob.objects.filter(name=name)
+    changes = {'refs': F('refs') + sign, 'updated_at': timezone.now()}
+
+    with transaction.atomic():
+        if not blobs.update(**changes) and sign > 0:
+            try:
+                with transaction.atomic():
+                    Blob.objects.create(name=name, refs=1)
+            except IntegrityError:
+                # created by a concurrent request in the meantime
+                blobs.update(**changes)
+
+
+def retain(name):
+    count(name, 1)
+
+
+def release(name):
+    count(name, -1)
+
+
+def known(digest, attachments):
+    """the name of the blob with ``digest`` used by ``attachments``, if any"""
+    return attachments.filter(file__startswith=blob_prefix(digest)) \
+                      .values_list('file', flat=True).first()
+
+
+def collect(storage, grace):
+    """
+    Delete the blobs unused for ``grace`` (a timedelta) and any other file
+    under blobs/ without a Blob that is as old. Returns how many files
+    were deleted.
+    """
+    Blob.objects.filter(refs__lte=0,
+                        updated_at__lt=timezone.now() - grace).delete()
+    used = set(Blob.objects.values_list('name', flat=True))
+    oldest = time.time() - grace.total_seconds()
+
+    deleted = 0
+    root = storage.path('')
+    for directory, _, files in os.walk(storage.path(BLOBS_DIR)):
+        for filename in files:
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, root).replace(os.sep, '/')
+            if name in used or os.path.getmtime(path) >= oldest:
+                continue
+            os.remove(path)
+            deleted += 1
+    return deleted
@@ -0,0 +1,98 @@
+"""
+Per-user iCalendar feeds of the sessions a user teaches or attends.
+
+Calendar apps cannot log in, so a feed URL carries a signed key naming
+its user. Each user's feed has its own version in the cache (see
+core.versions); signals touch the versions of the people in a lesson when
+its sessions change, so one change does not invalidate everybody's feed.
+"""
+from django.core import signing
+from django.utils import timezone
+
+from core.timetable import participants
+from core.versions import key_version, touch_keys
+
+
+SALT = 'core.feeds'
+
+
+def feed_key(user_id):
+    return signing.dumps(user_id, salt=SALT)
+
+
+def feed_user_id(key):
+    """the user id a feed key was made for, None if it is not valid"""
+    try:
+        return signing.loads(key, salt=SALT)
+    except signing.BadSignature:
+        return None
+
+
+def version_key(user_id):
+    return 'version:feed:%d' % user_id
+
+
+def feed_version(user_id):
+    return key_version(version_key(user_id))
+
+
+def touch_feeds(user_ids):
+    touch_keys(*[version_key(user_id) for user_id in user_ids])
+
+
+def touch_lesson_feeds(lesson_ids):
+    """touch the feeds of everybody in the lessons"""
+    people = participants(lesson_ids)
+    touch_feeds(set().union(*people.values()))
+
+
+def escape(text):
+    return text.replace('\\', '\\\\').replace(';', '\\;') \
+               .replace(',', '\\,').replace('\n', '\\n')
+
+
+def fold(line):
+    """split a content line into 75 octet parts, as RFC 5545 requires"""
+    data = line.encode()
+    parts = []
+    while len(data) > 75:
+        cut = 75 if not parts else 74
+        # do not split a multi-byte character
+        while data[cut] & 0xC0 == 0x80:
+            cut -= 1
+        parts.append(data[:cut].decode())
+        data = data[cut:]
+    parts.append(data.decode())
+    return '\r\n '.join(parts)
+
+
+def stamp(value):
+    return value.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def ics(sessions, name, domain):
+    """an iCalendar document with an event per session"""
+    now = stamp(timezone.now())
+    lines = ['BEGIN:VCALENDAR', 'VERSION:2.0',
+             'PRODID:-//maischool//timetable//EN', 'CALSCALE:GREGORIAN',
+             'X-WR-CALNAME:%s' % escape(name)]
+    for session in sessions:
+        # an occurrence keeps its UID when it is materialized
+        if session.series_id is not None:
+            uid = 'series-%d-%s@%s' % (session.series_id,
+                                       stamp(session.occurrence), domain)
+        else:
+            uid = 'session-%d@%s' % (session.pk, domain)
+        lines += [
+            'BEGIN:VEVENT',
+            'UID:%s' % uid,
+            'DTSTAMP:%s' % now,
+            'DTSTART:%s' % stamp(session.start_time),
+            'DTEND:%s' % stamp(session.end_time),
+            'SUMMARY:%s' % escape('%s (%s)' % (
+                session.lesson.name, session.get_type_display()
+            )),
+            'END:VEVENT',
+        ]
+    lines.append('END:VCALENDAR')
+    return ''.join(fold(line) + '\r\n' for line in lines)
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from core.blobs import collect
+from core.models import Attachment
+
+
+class Command(BaseCommand):
+    help = 'Delete attachment files that no attachment uses any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24,
+                            help='keep files used or stored less than this '
+                                 'many hours ago')
+
+    def handle(self, *args, **options):
+        storage = Attachment._meta.get_field('file').storage
+        count = collect(storage, timedelta(hours=options['hours']))
+        self.stdout.write(self.style.SUCCESS(
+            'Deleted %d files' % count
+        ))
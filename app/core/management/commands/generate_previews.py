@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Attachment
+from core.previews import generate
+
+
+class Command(BaseCommand):
+    help = 'Make the thumbnails and excerpts of attachments still pending'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retry', action='store_true',
+                            help='also redo failed previews and ones a '
+                                 'stopped worker left unfinished')
+
+    def handle(self, *args, **options):
+        if options['retry']:
+            Attachment.objects.filter(
+                preview_status__in=('failed', 'working')
+            ).update(preview_status='pending')
+
+        pending = Attachment.objects.filter(preview_status='pending') \
+                                    .values_list('id', flat=True)
+        count = 0
+        for pk in pending.iterator():
+            generate(pk)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(
+            'Processed %d attachments' % count
+        ))
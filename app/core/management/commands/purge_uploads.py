@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import Upload
+
+
+class Command(BaseCommand):
+    help = 'Delete chunked uploads that were never completed, and their parts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7,
+                            help='delete uploads started before this many '
+                                 'days ago')
+
+    def handle(self, *args, **options):
+        started = timezone.now() - timedelta(days=options['days'])
+        # one by one, so the signal discards each upload's parts
+        count = 0
+        for upload in Upload.objects.filter(created_at__lt=started):
+            upload.delete()
+            count += 1
+        self.stdout.write(self.style.SUCCESS(
+            'Deleted %d uploads' % count
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from core.scores import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per learner and subject score summaries'
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            'Rebuilt %d score summaries' % count
+        ))
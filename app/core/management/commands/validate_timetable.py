@@ -0,0 +1,53 @@
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from core.models import Session
+from core.timetable import clashes
+
+
+class Command(BaseCommand):
+    help = 'List the sessions of a term that clash for a person'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--school', type=int,
+                            help='only sessions of this school')
+        parser.add_argument('--from', dest='start',
+                            help='first day of the term, YYYY-MM-DD')
+        parser.add_argument('--to', dest='end',
+                            help='last day of the term, YYYY-MM-DD')
+
+    def day(self, value):
+        day = parse_date(value)
+        if day is None:
+            raise CommandError('Invalid date "%s".' % value)
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    def handle(self, *args, **options):
+        sessions = Session.objects.all()
+        if options['school']:
+            sessions = sessions.filter(
+                lesson__subject__school=options['school']
+            )
+        if options['start']:
+            sessions = sessions.filter(
+                end_time__gt=self.day(options['start'])
+            )
+        if options['end']:
+            sessions = sessions.filter(
+                start_time__lt=self.day(options['end']) + timedelta(days=1)
+            )
+
+        found = 0
+        for first, second, person in clashes(sessions.values_list(
+            'id', 'start_time', 'end_time', 'lesson_id'
+        ).iterator()):
+            found += 1
+            self.stdout.write('session %d clashes with session %d for '
+                              'user %d' % (first, second, person))
+
+        if found:
+            raise CommandError('%d timetable clashes found' % found)
+        self.stdout.write(self.style.SUCCESS('No timetable clashes'))
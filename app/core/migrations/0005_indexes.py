@@ -0,0 +1,29 @@
+# Generated by Django 3.1.14 on 2026-10-18 10:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_auto_20201201_0848'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attachment',
+            index=models.Index(fields=['session', 'id'], name='attachment_session_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='moderation',
+            index=models.Index(fields=['learner', 'session'], name='moderation_learner_session_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['lesson', 'start_time'], name='session_lesson_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['start_time', 'id'], name='session_start_idx'),
+        ),
+    ]
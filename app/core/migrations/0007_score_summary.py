@@ -0,0 +1,36 @@
+# Generated by Django 3.1.14 on 2026-10-18 11:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_updated_at_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.IntegerField(default=0)),
+                ('score_total', models.IntegerField(default=0)),
+                ('max_total', models.IntegerField(default=0)),
+                ('percent_total', models.FloatField(default=0)),
+                ('average', models.FloatField(blank=True, null=True)),
+                ('learner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.subject')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='scoresummary',
+            index=models.Index(fields=['subject', 'average'], name='summary_subject_average_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='scoresummary',
+            unique_together={('learner', 'subject')},
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 3.1.14 on 2026-10-18 11:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_score_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='session',
+            name='occurrence',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='SessionSeries',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('LCT', 'Lecture'), ('TST', 'Test'), ('XM', 'Exam'), ('TCN', 'Teaching'), ('PRT', 'Practical')], default='TCN', max_length=50)),
+                ('start_time', models.DateTimeField()),
+                ('end_time', models.DateTimeField()),
+                ('frequency', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly')], default='weekly', max_length=10)),
+                ('interval', models.PositiveIntegerField(default=1)),
+                ('until', models.DateTimeField(blank=True, null=True)),
+                ('count', models.PositiveIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.lesson')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='series',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sessions', to='core.sessionseries'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='session',
+            unique_together={('series', 'occurrence')},
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.1.14 on 2026-10-18 11:34
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attachment',
+            name='excerpt',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='preview_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('working', 'Working'), ('ready', 'Ready'), ('none', 'None'), ('failed', 'Failed')], db_index=True, default='pending', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='thumbnail',
+            field=models.FileField(blank=True, storage=core.storage.ContentAddressedStorage(), upload_to='previews'),
+        ),
+    ]
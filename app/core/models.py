@@ -1,7 +1,53 @@
-from django.db import models
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.db import models, connection
 from django.contrib.auth.models import BaseUserManager, AbstractBaseUser, \
                                     PermissionsMixin
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from core.storage import ContentAddressedStorage
+from core.versions import touch
+
+
+# below this many passwords, handing them to worker processes costs more
+# than hashing them in the request process
+PASSWORD_POOL_THRESHOLD = 8
+
+# worker processes hashing passwords, started on first use and kept for
+# the life of the process
+PASSWORD_WORKERS = os.cpu_count() or 1
+_password_pool = None
+
+
+def make_passwords(passwords):
+    """
+    Hash passwords, in parallel when there are many, they are CPU bound and
+    independent. A None password gives an unusable hash, which costs
+    nothing and never goes to the pool.
+    """
+    global _password_pool
+    hashes = [make_password(None) if password is None else None
+              for password in passwords]
+    todo = [i for i, password in enumerate(passwords) if password is not None]
+
+    if len(todo) < PASSWORD_POOL_THRESHOLD:
+        hashed = [make_password(passwords[i]) for i in todo]
+    else:
+        if _password_pool is None:
+            _password_pool = ProcessPoolExecutor(
+                max_workers=PASSWORD_WORKERS
+            )
+        hashed = _password_pool.map(
+            make_password, [passwords[i] for i in todo],
+            chunksize=max(1, len(todo) // PASSWORD_WORKERS)
+        )
+
+    for i, value in zip(todo, hashed):
+        hashes[i] = value
+    return hashes
 
 
 class UserManager(BaseUserManager):
@@ -25,6 +71,60 @@ class UserManager(BaseUserManager):
 
         return superuser
 
+    def bulk_create_users(self, users_data, require_password=True):
+        """
+        Create many users with one insert. Users that cannot be created
+        (missing email or password, email taken or repeated in the list)
+        are skipped and returned as failures alongside the created users.
+
+        Without ``require_password`` a missing password gives the user an
+        unusable one, to be set through a password reset.
+        """
+        failures = []
+        pending = {}
+        for user_data in users_data:
+            user_data = dict(user_data)
+            email = user_data.pop('email', None)
+            password = user_data.pop('password', None)
+
+            if not email or (require_password and not password):
+                failures.append({'email': email, 'errors': [
+                    "Please fill in all the required fields."
+                ]})
+                continue
+
+            email = self.normalize_email(email)
+            if email in pending:
+                failures.append({'email': email, 'errors': [
+                    "Email is repeated in this list."
+                ]})
+                continue
+
+            pending[email] = (password or None, user_data)
+
+        taken = self.filter(
+            email__in=list(pending)
+        ).values_list('email', flat=True)
+        for email in taken:
+            del pending[email]
+            failures.append({'email': email, 'errors': [
+                "A user with this email already exists."
+            ]})
+
+        hashes = make_passwords([password for password, _ in
+                                 pending.values()])
+        users = []
+        for (email, (_, user_data)), hashed in zip(pending.items(), hashes):
+            users.append(self.model(email=email, password=hashed,
+                                    **user_data))
+
+        self.bulk_create(users)
+        touch(self.model)
+        if not connection.features.can_return_rows_from_bulk_insert:
+            users = list(self.filter(email__in=list(pending)))
+
+        return users, failures
+
 
 class User(AbstractBaseUser, PermissionsMixin):
 
@@ -44,6 +144,7 @@ class Category(models.Model):
 
     basename = models.CharField(unique=True, max_length=255)
     name = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
 
 class School(models.Model):
@@ -54,6 +155,7 @@ class School(models.Model):
                                  blank=True, null=True
                                  )
     users = models.ManyToManyField(get_user_model(), through='Profile')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
 
 class Profile(models.Model):
@@ -69,6 +171,7 @@ class Subject(models.Model):
     basename = models.CharField(unique=True, max_length=255)
     name = models.CharField(unique=True, max_length=255)
     school = models.ForeignKey(School, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
 
 class Level(models.Model):
@@ -77,6 +180,7 @@ class Level(models.Model):
     school = models.ForeignKey(School, on_delete=models.DO_NOTHING,
                                blank=True, null=True
                                )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
 
 class Lesson(models.Model):
@@ -89,6 +193,90 @@ class Lesson(models.Model):
     learners = models.ManyToManyField(get_user_model(), blank=True,
                                       related_name="learners")
     name = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+
+SESSION_TYPES = [
+    ('LCT', "Lecture"),
+    ('TST', "Test"),
+    ('XM', "Exam"),
+    ('TCN', "Teaching"),
+    ('PRT', "Practical")
+]
+
+
+class SessionSeries(models.Model):
+    """
+    Sessions of a lesson repeating every ``interval`` days or weeks from
+    the first one, like an RRULE with FREQ, INTERVAL and UNTIL or COUNT.
+    Occurrences are computed on demand; one is stored as a Session only
+    once something (attendance, a moderation, notes) is recorded for it.
+    """
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE)
+    type = models.CharField(max_length=50, choices=SESSION_TYPES,
+                            default='TCN')
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    frequency = models.CharField(max_length=10,
+                                 choices=[('daily', 'Daily'),
+                                          ('weekly', 'Weekly')],
+                                 default='weekly')
+    interval = models.PositiveIntegerField(default=1)
+    until = models.DateTimeField(blank=True, null=True)
+    count = models.PositiveIntegerField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    @property
+    def step(self):
+        days = 7 if self.frequency == 'weekly' else 1
+        return timedelta(days=days * self.interval)
+
+    def index_of(self, occurrence):
+        """the number of the occurrence starting then, None if there is none"""
+        offset = occurrence - self.start_time
+        if offset % self.step or offset < timedelta(0):
+            return None
+        index = offset // self.step
+        if self.count is not None and index >= self.count:
+            return None
+        if self.until is not None and occurrence > self.until:
+            return None
+        return index
+
+    def occurrences(self, start, end):
+        """starts of the occurrences overlapping ``start`` to ``end``"""
+        duration = self.end_time - self.start_time
+        # skip straight to the last occurrence ending before ``start``
+        index = max(0, (start - duration - self.start_time) // self.step)
+        while True:
+            occurrence = self.start_time + index * self.step
+            if occurrence >= end or self.index_of(occurrence) is None:
+                return
+            if occurrence >= start or occurrence + duration > start:
+                yield occurrence
+            index += 1
+
+    def session(self, occurrence):
+        """the unsaved Session of an occurrence"""
+        session = Session(start_time=occurrence,
+                          end_time=occurrence + (self.end_time
+                                                 - self.start_time),
+                          type=self.type, lesson_id=self.lesson_id,
+                          series=self, occurrence=occurrence)
+        if self._meta.get_field('lesson').is_cached(self):
+            session.lesson = self.lesson
+        return session
+
+    def materialize(self, occurrence):
+        """the stored Session of an occurrence, saved on first use"""
+        session = self.session(occurrence)
+        session, _ = Session.objects.get_or_create(
+            series=self, occurrence=occurrence,
+            defaults={'start_time': session.start_time,
+                      'end_time': session.end_time,
+                      'type': session.type, 'lesson_id': session.lesson_id}
+        )
+        return session
 
 
 class Session(models.Model):
@@ -96,23 +284,86 @@ class Session(models.Model):
     end_time = models.DateTimeField()
     type = models.CharField(
                             max_length=50,
-                            choices=[
-                                ('LCT', "Lecture"),
-                                ('TST', "Test"),
-                                ('XM', "Exam"),
-                                ('TCN', "Teaching"),
-                                ('PRT', "Practical")
-                            ],
+                            choices=SESSION_TYPES,
                             default='Teaching'
                             )
     attendance = models.ManyToManyField(get_user_model(), blank=True)
     lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE)
+    # set when the session is an occurrence of a series
+    series = models.ForeignKey(SessionSeries, on_delete=models.SET_NULL,
+                               blank=True, null=True,
+                               related_name='sessions')
+    occurrence = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        unique_together = ('series', 'occurrence')
+        indexes = [
+            models.Index(fields=['lesson', 'start_time'],
+                         name='session_lesson_start_idx'),
+            models.Index(fields=['start_time', 'id'],
+                         name='session_start_idx'),
+        ]
+
+
+PREVIEW_STATUSES = [
+    ('pending', "Pending"),
+    ('working', "Working"),
+    ('ready', "Ready"),
+    ('none', "None"),
+    ('failed', "Failed"),
+]
 
 
 class Attachment(models.Model):
     notes = models.CharField(max_length=255)
     session = models.ForeignKey(Session, on_delete=models.CASCADE)
-    file = models.FileField(upload_to='session')
+    file = models.FileField(upload_to='session',
+                            storage=ContentAddressedStorage())
+    # derived from ``file`` in the background, see core.previews
+    thumbnail = models.FileField(upload_to='previews', blank=True,
+                                 storage=ContentAddressedStorage())
+    excerpt = models.TextField(blank=True)
+    preview_status = models.CharField(max_length=10,
+                                      choices=PREVIEW_STATUSES,
+                                      default='pending', db_index=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['session', 'id'],
+                         name='attachment_session_idx'),
+        ]
+
+
+class Blob(models.Model):
+    """a stored attachment file and how many Attachments use it"""
+    name = models.CharField(max_length=100, unique=True)
+    refs = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class Upload(models.Model):
+    """an Attachment being uploaded in parts (see core.uploads)"""
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
+    session = models.ForeignKey(Session, on_delete=models.CASCADE)
+    notes = models.CharField(max_length=255)
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    # SHA-256 of the file, to skip sending a file that is stored already
+    digest = models.CharField(max_length=64, blank=True)
+    chunk_size = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    @property
+    def parts(self):
+        return -(-self.size // self.chunk_size)
+
+    def part_size(self, number):
+        """bytes in part ``number``; only the last one may be short"""
+        if number < self.parts - 1:
+            return self.chunk_size
+        return self.size - self.chunk_size * (self.parts - 1)
 
 
 class Moderation(models.Model):
@@ -128,3 +379,49 @@ class Moderation(models.Model):
                                   ],
                                   default='units'
                                   )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['learner', 'session'],
+                         name='moderation_learner_session_idx'),
+        ]
+
+
+class Tombstone(models.Model):
+    """
+    Marks a deleted row so that clients syncing a school's changes can
+    drop it too. ``model`` is the model name, e.g. ``lesson``.
+    """
+    model = models.CharField(max_length=50)
+    object_id = models.IntegerField()
+    school_id = models.IntegerField(blank=True, null=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['school_id', 'deleted_at'],
+                         name='tombstone_school_deleted_idx'),
+        ]
+
+
+class ScoreSummary(models.Model):
+    """
+    A learner's comparable moderation scores in one subject, kept up to
+    date by core.scores as moderations change. ``average`` is the mean
+    percentage.
+    """
+    learner = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE)
+    count = models.IntegerField(default=0)
+    score_total = models.IntegerField(default=0)
+    max_total = models.IntegerField(default=0)
+    percent_total = models.FloatField(default=0)
+    average = models.FloatField(blank=True, null=True)
+
+    class Meta:
+        unique_together = ('learner', 'subject')
+        indexes = [
+            models.Index(fields=['subject', 'average'],
+                         name='summary_subject_average_idx'),
+        ]
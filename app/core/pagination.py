@@ -0,0 +1,23 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Opaque cursor pagination used as the default for every list endpoint.
+
+    Pages are read with ``WHERE key > <cursor> ORDER BY key LIMIT n`` rather
+    than OFFSET/COUNT, so fetching page 1000 costs the same as page 1.
+    Views can page on something other than ``id`` by setting
+    ``pagination_ordering``; the first field should be indexed.
+    """
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'pagination_ordering', None)
+        if ordering is None:
+            return super().get_ordering(request, queryset, view)
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
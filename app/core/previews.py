@@ -0,0 +1,175 @@
+"""
+Previews of attachment files: a small image of the first page and the
+start of the text, so a list of attachments can show what they are
+without downloading the files.
+
+When an attachment's file changes its preview becomes ``pending``. Once
+the transaction commits, it is made in a background thread of the worker
+(PREVIEWS_IN_BACKGROUND), and the generate_previews command makes any
+left pending, e.g. by a restart. A worker claims an attachment by moving
+it to ``working``, so the two never make the same preview twice.
+
+PDFs are read with poppler's pdftoppm and pdftotext when they are
+installed. DOCX text is read from the document XML, and the thumbnail
+Word saves in some documents is used as is. Attachments sharing a file
+share their preview, which is made once.
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+
+from core.models import Attachment
+
+
+THUMBNAIL_SIZE = 256
+EXCERPT_LENGTH = 1000
+TEXT_PAGES = 3
+# most that is read of a thumbnail saved in a document
+MAX_THUMBNAIL_BYTES = 512 * 1024
+TOOL_TIMEOUT = 60
+WORD = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+_executor = None
+
+
+def excerpt_of(text):
+    return ' '.join(text.split())[:EXCERPT_LENGTH]
+
+
+def run(*args):
+    return subprocess.run(args, stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL, check=True,
+                          timeout=TOOL_TIMEOUT).stdout
+
+
+def pdf_thumbnail(path):
+    if not shutil.which('pdftoppm'):
+        return None
+    with tempfile.TemporaryDirectory() as directory:
+        out = os.path.join(directory, 'page')
+        run('pdftoppm', '-png', '-f', '1', '-l', '1', '-singlefile',
+            '-scale-to', str(THUMBNAIL_SIZE), path, out)
+        with open(out + '.png', 'rb') as fp:
+            return fp.read(), '.png'
+
+
+def pdf_text(path):
+    if not shutil.which('pdftotext'):
+        return ''
+    text = run('pdftotext', '-l', str(TEXT_PAGES), '-enc', 'UTF-8',
+               path, '-')
+    return text.decode('utf-8', 'replace')
+
+
+def docx_thumbnail(path):
+    with zipfile.ZipFile(path) as document:
+        for info in document.infolist():
+            name, extension = os.path.splitext(info.filename)
+            if name == 'docProps/thumbnail' and \
+                    extension.lower() in ('.png', '.jpeg', '.jpg') and \
+                    info.file_size <= MAX_THUMBNAIL_BYTES:
+                return document.read(info), extension.lower()
+    return None
+
+
+def docx_text(path):
+    """the text of the first paragraphs, read no further than needed"""
+    parts = []
+    length = 0
+    with zipfile.ZipFile(path) as document:
+        with document.open('word/document.xml') as xml:
+            for _, element in ElementTree.iterparse(xml):
+                if element.tag == WORD + 't' and element.text:
+                    parts.append(element.text)
+                    length += len(element.text)
+                elif element.tag == WORD + 'p':
+                    parts.append('\n')
+                    element.clear()
+                    if length > EXCERPT_LENGTH:
+                        break
+    return ''.join(parts)
+
+
+# extension: (thumbnail, text) readers
+READERS = {
+    '.pdf': (pdf_thumbnail, pdf_text),
+    '.docx': (docx_thumbnail, docx_text),
+}
+
+
+def make(path):
+    """``(thumbnail, extension)`` or None, and the excerpt of a file"""
+    readers = READERS.get(os.path.splitext(path)[1].lower())
+    if readers is None:
+        return None, ''
+    thumbnail, text = readers
+    return thumbnail(path), excerpt_of(text(path))
+
+
+def preview(attachment):
+    """``(status, thumbnail, excerpt)`` of an attachment with a file"""
+    shared = Attachment.objects.filter(file=attachment.file.name,
+                                       preview_status='ready') \
+                               .exclude(pk=attachment.pk).first()
+    if shared is not None:
+        attachment.thumbnail = shared.thumbnail.name
+        return 'ready', None, shared.excerpt
+
+    try:
+        thumbnail, excerpt = make(attachment.file.path)
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile,
+            ElementTree.ParseError, subprocess.SubprocessError):
+        return 'failed', None, ''
+    return 'ready' if thumbnail or excerpt else 'none', thumbnail, excerpt
+
+
+def generate(pk):
+    """make the preview of a pending attachment"""
+    if not Attachment.objects.filter(pk=pk, preview_status='pending') \
+                             .update(preview_status='working'):
+        return
+    attachment = Attachment.objects.filter(pk=pk).first()
+    if attachment is None:
+        return
+
+    thumbnail, status = None, 'none'
+    if attachment.file:
+        status, thumbnail, attachment.excerpt = preview(attachment)
+    if thumbnail is not None:
+        data, extension = thumbnail
+        attachment.thumbnail.save('thumbnail' + extension,
+                                  ContentFile(data), save=False)
+
+    with transaction.atomic():
+        # unless the file changed or the attachment went in the meantime
+        if Attachment.objects.select_for_update().filter(
+            pk=pk, file=attachment.file.name, preview_status='working'
+        ).exists():
+            attachment.preview_status = status
+            attachment.save(update_fields=['thumbnail', 'excerpt',
+                                           'preview_status', 'updated_at'])
+
+
+def generate_in_background(pk):
+    try:
+        generate(pk)
+    finally:
+        connections.close_all()
+
+
+def schedule(pk):
+    """generate the preview in a thread once the transaction commits"""
+    def submit():
+        global _executor
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1)
+        _executor.submit(generate_in_background, pk)
+
+    transaction.on_commit(submit)
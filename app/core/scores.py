@@ -0,0 +1,205 @@
+"""
+Moderation scores as comparable percentages, and the ScoreSummary rows
+that keep per learner and subject totals of them.
+
+A ``percentage`` score is taken as is, any other is ``learner_score`` out
+of ``max_score``; a score out of 0 cannot be compared and is left out.
+
+Signals ``record`` each moderation as it is saved, adding or subtracting
+it with one UPDATE of its summary row. Deleted moderations are queued as
+they are (``queue_deleted``) and taken out together once deleted
+(``take_out_deleted``), so a cascade from a lesson or session costs one
+UPDATE per learner and subject, not several queries per moderation.
+``rebuild`` recomputes
+every row from the moderations, for data changed behind the signals' back
+(e.g. a lesson moved to another subject).
+"""
+import threading
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Case, Count, ExpressionWrapper, F, \
+                             FloatField, Sum, When
+from django.db.models.functions import Cast, NullIf
+
+from core.models import Moderation, Session, ScoreSummary
+from core.versions import touch
+
+
+def percent():
+    """a moderation's score as a percentage, None if max_score is 0"""
+    score = Cast('learner_score', FloatField())
+    return Case(
+        When(score_type='percentage', then=score),
+        default=ExpressionWrapper(score * 100 / NullIf('max_score', 0),
+                                  output_field=FloatField()),
+        output_field=FloatField(),
+    )
+
+
+def percent_of(learner_score, max_score, score_type):
+    if score_type == 'percentage':
+        return float(learner_score)
+    if not max_score:
+        return None
+    return learner_score * 100 / max_score
+
+
+def scored(moderation):
+    """what a moderation adds to its summary, None if it adds nothing"""
+    if moderation is None:
+        return None
+    if isinstance(moderation, Moderation):
+        subject = Session.objects.filter(pk=moderation.session_id) \
+                                 .values_list('lesson__subject_id',
+                                              flat=True).first()
+        moderation = {'learner_id': moderation.learner_id,
+                      'subject_id': subject,
+                      'learner_score': moderation.learner_score,
+                      'max_score': moderation.max_score,
+                      'score_type': moderation.score_type}
+
+    value = percent_of(moderation['learner_score'], moderation['max_score'],
+                       moderation['score_type'])
+    if value is None or moderation['subject_id'] is None:
+        return None
+    return dict(moderation, percent=value)
+
+
+def stored(pk):
+    """a moderation as it is in the database, to be taken out again"""
+    return Moderation.objects.filter(pk=pk).values(
+        'learner_id', 'learner_score', 'max_score', 'score_type',
+        subject_id=F('session__lesson__subject_id'),
+    ).first()
+
+
+def record(score, sign):
+    """add (sign 1) or subtract (sign -1) a ``scored`` moderation"""
+    if score is None:
+        return
+    change(score['learner_id'], score['subject_id'], sign,
+           sign * score['learner_score'], sign * score['max_score'],
+           sign * score['percent'])
+    touch(ScoreSummary)
+
+
+def change(learner_id, subject_id, count, score_total, max_total,
+           percent_total):
+    """add the totals, negative to take out, to one summary row"""
+    summaries = ScoreSummary.objects.filter(learner_id=learner_id,
+                                            subject_id=subject_id)
+    changes = {
+        'count': F('count') + count,
+        'score_total': F('score_total') + score_total,
+        'max_total': F('max_total') + max_total,
+        'percent_total': F('percent_total') + percent_total,
+        # the right hand side sees the values from before the update
+        'average': ExpressionWrapper(
+            (F('percent_total') + percent_total)
+            / NullIf(F('count') + count, 0),
+            output_field=FloatField()
+        ),
+    }
+
+    with transaction.atomic():
+        if not summaries.update(**changes) and count > 0:
+            try:
+                with transaction.atomic():
+                    ScoreSummary.objects.create(
+                        learner_id=learner_id, subject_id=subject_id,
+                        count=count, score_total=score_total,
+                        max_total=max_total, percent_total=percent_total,
+                        average=percent_total / count,
+                    )
+            except IntegrityError:
+                # created by a concurrent request in the meantime
+                summaries.update(**changes)
+        if count < 0:
+            summaries.filter(count__lte=0).delete()
+
+
+# moderations about to be deleted in this thread, by pk
+_deleted = threading.local()
+
+
+def queue_deleted(moderation):
+    """remember a moderation before it is deleted, without a query"""
+    if not hasattr(_deleted, 'moderations'):
+        _deleted.moderations = {}
+    _deleted.moderations[moderation.pk] = {
+        'learner_id': moderation.learner_id,
+        'session_id': moderation.session_id,
+        'learner_score': moderation.learner_score,
+        'max_score': moderation.max_score,
+        'score_type': moderation.score_type,
+    }
+
+
+def take_out_deleted():
+    """
+    Take the queued moderations that are gone out of their summaries,
+    grouped by learner and subject. Django deletes every moderation of a
+    cascade before it sends the first post_delete, and their sessions
+    after, so the first call takes out the lot while the sessions can
+    still be followed to their subjects.
+    """
+    queued = getattr(_deleted, 'moderations', None)
+    if not queued:
+        return
+    _deleted.moderations = {}
+
+    # a delete that failed after pre_delete left its rows in place
+    for pk in Moderation.objects.filter(pk__in=list(queued)) \
+                                .values_list('pk', flat=True):
+        del queued[pk]
+
+    subjects = dict(Session.objects.filter(
+        pk__in={row['session_id'] for row in queued.values()}
+    ).values_list('id', 'lesson__subject_id'))
+
+    totals = defaultdict(lambda: [0, 0, 0, 0])
+    for row in queued.values():
+        score = scored(dict(row, subject_id=subjects.get(row['session_id'])))
+        if score is None:
+            continue
+        total = totals[score['learner_id'], score['subject_id']]
+        total[0] -= 1
+        total[1] -= score['learner_score']
+        total[2] -= score['max_score']
+        total[3] -= score['percent']
+
+    for (learner_id, subject_id), total in totals.items():
+        change(learner_id, subject_id, *total)
+    if totals:
+        touch(ScoreSummary)
+
+
+def rebuild(batch_size=1000):
+    """recompute every summary from the moderations, returns the count"""
+    rows = Moderation.objects.order_by().annotate(percent=percent()) \
+                             .filter(percent__isnull=False,
+                                     session__lesson__subject__isnull=False) \
+                             .values('learner_id',
+                                     'session__lesson__subject_id') \
+                             .annotate(count=Count('id'),
+                                       score_total=Sum('learner_score'),
+                                       max_total=Sum('max_score'),
+                                       percent_total=Sum('percent'),
+                                       average=Avg('percent'))
+
+    with transaction.atomic():
+        ScoreSummary.objects.all().delete()
+        summaries = [
+            ScoreSummary(learner_id=row['learner_id'],
+                         subject_id=row['session__lesson__subject_id'],
+                         count=row['count'], score_total=row['score_total'],
+                         max_total=row['max_total'],
+                         percent_total=row['percent_total'],
+                         average=row['average'])
+            for row in rows.iterator()
+        ]
+        ScoreSummary.objects.bulk_create(summaries, batch_size=batch_size)
+
+    touch(ScoreSummary)
+    return len(summaries)
@@ -0,0 +1,202 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.signals import pre_save, post_save, pre_delete, \
+                                     post_delete, m2m_changed
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from core.authentication import forget_user, forget_token
+from core.blobs import retain, release
+from core.feeds import touch_feeds, touch_lesson_feeds
+from core.previews import schedule
+from core.models import Category, School, Profile, Subject, Level, Lesson, \
+                        Session, SessionSeries, Attachment, Moderation, \
+                        Upload
+from core.scores import queue_deleted, record, scored, stored, \
+                        take_out_deleted
+from core.sync import SCHOOL_FIELDS, bury, bury_deleted, mark_updated
+from core.uploads import discard
+from core.versions import touch
+
+
+VERSIONED_MODELS = (get_user_model(), Category, School, Profile, Subject,
+                    Level, Lesson, Session, SessionSeries, Attachment,
+                    Moderation)
+VERSIONED_RELATIONS = (School.users.through, Lesson.learners.through,
+                       Session.attendance.through)
+# the files of an Attachment, counted in core.blobs
+ATTACHMENT_FILES = ('file', 'thumbnail')
+# a change to these relations counts as a change to the owning row
+SYNCED_RELATIONS = (Lesson.learners.through, Session.attendance.through)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def forget_cached_token(sender, instance, **kwargs):
+    forget_token(instance.key)
+
+
+@receiver(post_delete, sender=Upload)
+def discard_upload_parts(sender, instance, **kwargs):
+    discard(instance)
+
+
+def touch_model(sender, **kwargs):
+    touch(sender)
+
+
+def touch_relation(sender, action, **kwargs):
+    if action.startswith('post_'):
+        touch(sender)
+
+
+def queue_tombstone(sender, instance, **kwargs):
+    bury(instance)
+
+
+def leave_tombstones(sender, instance, **kwargs):
+    bury_deleted(sender)
+
+
+def mark_relation_updated(sender, instance, action, reverse, model, pk_set,
+                          **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        mark_updated(type(instance), [instance.pk])
+    elif pk_set:
+        mark_updated(model, pk_set)
+
+
+@receiver(pre_save, sender=Moderation)
+def remember_old_score(sender, instance, raw=False, **kwargs):
+    instance._old_score = None
+    if instance.pk and not raw:
+        instance._old_score = scored(stored(instance.pk))
+
+
+@receiver(post_save, sender=Moderation)
+def replace_score(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record(getattr(instance, '_old_score', None), -1)
+        record(scored(instance), 1)
+
+
+@receiver(pre_delete, sender=Moderation)
+def queue_score(sender, instance, **kwargs):
+    queue_deleted(instance)
+
+
+@receiver(post_delete, sender=Moderation)
+def take_out_scores(sender, instance, **kwargs):
+    take_out_deleted()
+
+
+@receiver(pre_save, sender=Attachment)
+def remember_old_files(sender, instance, raw=False, **kwargs):
+    instance._old_files = {}
+    if raw:
+        return
+    if instance.pk:
+        instance._old_files = Attachment.objects.filter(pk=instance.pk) \
+                                                .values(*ATTACHMENT_FILES) \
+                                                .first() or {}
+    if instance.file.name != instance._old_files.get('file'):
+        # the preview of the old file does not fit the new one
+        instance.thumbnail = ''
+        instance.excerpt = ''
+        instance.preview_status = 'pending' if instance.file else 'none'
+
+
+@receiver(post_save, sender=Attachment)
+def replace_files(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old = getattr(instance, '_old_files', {})
+    for field in ATTACHMENT_FILES:
+        name = getattr(instance, field).name
+        if name != old.get(field):
+            retain(name)
+            release(old.get(field))
+
+    if settings.PREVIEWS_IN_BACKGROUND and \
+            instance.file.name != old.get('file') and \
+            instance.preview_status == 'pending':
+        schedule(instance.pk)
+
+
+@receiver(post_delete, sender=Attachment)
+def release_files(sender, instance, **kwargs):
+    for field in ATTACHMENT_FILES:
+        release(getattr(instance, field).name)
+
+
+def remember_old_lesson(sender, instance, raw=False, **kwargs):
+    instance._old_lesson_id = None
+    if instance.pk and not raw:
+        old = sender.objects.filter(pk=instance.pk)
+        instance._old_lesson_id = old.values_list('lesson_id',
+                                                  flat=True).first()
+
+
+def touch_session_feeds(sender, instance, **kwargs):
+    # a session moved to another lesson leaves the old one's feeds too
+    lesson_ids = {instance.lesson_id,
+                  getattr(instance, '_old_lesson_id', None)}
+    touch_lesson_feeds(lesson_ids - {None})
+
+
+@receiver(pre_save, sender=Lesson)
+def remember_old_instructor(sender, instance, raw=False, **kwargs):
+    instance._old_instructor_id = None
+    if instance.pk and not raw:
+        old = Lesson.objects.filter(pk=instance.pk)
+        instance._old_instructor_id = old.values_list('instructor_id',
+                                                      flat=True).first()
+
+
+def touch_lesson_feed(sender, instance, **kwargs):
+    touch_lesson_feeds([instance.pk])
+    old = getattr(instance, '_old_instructor_id', None)
+    if old is not None and old != instance.instructor_id:
+        touch_feeds([old])
+
+
+@receiver(m2m_changed, sender=Lesson.learners.through)
+def touch_learner_feeds(sender, instance, action, reverse, pk_set,
+                        **kwargs):
+    if reverse:
+        if action.startswith('post_') or action == 'pre_clear':
+            touch_feeds([instance.pk])
+    elif action == 'pre_clear':
+        touch_lesson_feeds([instance.pk])
+    elif action.startswith('post_') and pk_set:
+        touch_feeds(pk_set)
+
+
+for model in (Session, SessionSeries):
+    pre_save.connect(remember_old_lesson, sender=model)
+    post_save.connect(touch_session_feeds, sender=model)
+    pre_delete.connect(touch_session_feeds, sender=model)
+
+post_save.connect(touch_lesson_feed, sender=Lesson)
+pre_delete.connect(touch_lesson_feed, sender=Lesson)
+
+for model in VERSIONED_MODELS:
+    post_save.connect(touch_model, sender=model)
+    post_delete.connect(touch_model, sender=model)
+
+for through in VERSIONED_RELATIONS:
+    m2m_changed.connect(touch_relation, sender=through)
+
+for model in SCHOOL_FIELDS:
+    pre_delete.connect(queue_tombstone, sender=model)
+    post_delete.connect(leave_tombstones, sender=model)
+
+for through in SYNCED_RELATIONS:
+    m2m_changed.connect(mark_relation_updated, sender=through)
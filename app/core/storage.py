@@ -0,0 +1,93 @@
+"""
+Content-addressed storage for attachment files.
+
+Files are stored under blobs/ by the SHA-256 of their content, hashed as
+they are written, so a file attached to many sessions is kept once.
+Storing a file that is there already only touches it (see core.blobs for
+how unused blobs are collected).
+"""
+import hashlib
+import os
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+BLOBS_DIR = 'blobs'
+BUFFER_SIZE = 64 * 1024
+# the extension is kept for the content type; the name must fit in
+# FileField's default max_length of 100
+MAX_EXTENSION = 10
+
+
+def blob_prefix(digest):
+    return '%s/%s/%s' % (BLOBS_DIR, digest[:2], digest)
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(BLOBS_DIR + '/')
+
+
+def file_digest(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(BUFFER_SIZE), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def move_file(source, destination):
+    file_move_safe(source, destination, allow_overwrite=True)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """a FileSystemStorage that names files after their content"""
+
+    def get_available_name(self, name, max_length=None):
+        # the same name means the same content, so it is never taken
+        return name
+
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1].lower()
+        if len(extension) > MAX_EXTENSION:
+            extension = ''
+
+        if hasattr(content, 'temporary_file_path'):
+            # already on disk: hash it, then move it rather than copy it
+            source = content.temporary_file_path()
+            name = blob_prefix(file_digest(source)) + extension
+            return self.place(source, name, move_file)
+
+        directory = self.path(BLOBS_DIR)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            sha = hashlib.sha256()
+            with os.fdopen(fd, 'wb') as fp:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    sha.update(chunk)
+                    fp.write(chunk)
+            name = blob_prefix(sha.hexdigest()) + extension
+            return self.place(temp, name, os.replace)
+        finally:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+    def place(self, source, name, move):
+        """move ``source`` to blob ``name`` unless it is stored already"""
+        path = self.path(name)
+        if os.path.exists(path):
+            os.utime(path)
+            return name
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # a concurrent write of the same content may get there first
+        move(source, path)
+        if self.file_permissions_mode is not None:
+            os.chmod(path, self.file_permissions_mode)
+        return name
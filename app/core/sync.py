@@ -0,0 +1,137 @@
+"""
+Bookkeeping for the per-school "changes since" feed.
+
+Rows carry an indexed ``updated_at``, and deleting one leaves a
+core.models.Tombstone behind, so a client can fetch just what changed in
+its school after the last watermark it saw. Deleted rows are queued as
+they are (``bury``) and their tombstones written a model at a time once
+the rows are gone (``bury_deleted``), so a cascade costs a few queries per
+model, not two per row. Tombstones are kept ``SYNC_TOMBSTONE_DAYS``; an
+older ``since`` cannot be answered and needs a full sync.
+
+A large change set is sent a page at a time. Each type is read in
+``(updated_at, id)`` order, and a page ends with a signed cursor holding
+where every type stopped, so no page loads more than a page of rows of a
+type whatever the size of the school.
+"""
+import threading
+from collections import defaultdict
+
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.models import Subject, Level, Lesson, Session, SessionSeries, \
+                        Attachment, Moderation, Tombstone
+
+
+# models in the feed and their lookup path to School
+SCHOOL_FIELDS = {
+    Subject: 'school',
+    Level: 'school',
+    Lesson: 'subject__school',
+    Session: 'lesson__subject__school',
+    SessionSeries: 'lesson__subject__school',
+    Attachment: 'session__lesson__subject__school',
+    Moderation: 'session__lesson__subject__school',
+}
+
+
+# rows about to be deleted in this thread: model -> {pk: parent id}
+_buried = threading.local()
+
+
+def parent_of(model):
+    """the first field on the path to School and the rest of the path"""
+    field, _, rest = SCHOOL_FIELDS[model].partition('__')
+    return model._meta.get_field(field), rest
+
+
+def bury(instance):
+    """remember a row before it is deleted, without a query"""
+    if not hasattr(_buried, 'rows'):
+        _buried.rows = defaultdict(dict)
+    model = type(instance)
+    field, _ = parent_of(model)
+    _buried.rows[model][instance.pk] = getattr(instance, field.attname)
+
+
+def bury_deleted(model):
+    """
+    Leave tombstones for the queued rows of ``model`` that are gone. Django
+    deletes a model's rows together and the rows they belong to after, so
+    the first post_delete of a model finds its parents still there to
+    follow to their school.
+    """
+    queued = getattr(_buried, 'rows', {}).pop(model, None)
+    if not queued:
+        return
+
+    # a delete that failed after pre_delete left its rows in place
+    for pk in model.objects.filter(pk__in=list(queued)) \
+                           .values_list('pk', flat=True):
+        del queued[pk]
+
+    field, rest = parent_of(model)
+    if rest:
+        schools = dict(field.related_model.objects.filter(
+            pk__in=set(queued.values())
+        ).values_list('pk', rest))
+    else:
+        schools = {parent: parent for parent in queued.values()}
+
+    Tombstone.objects.bulk_create(
+        Tombstone(model=model._meta.model_name, object_id=pk,
+                  school_id=schools.get(parent))
+        for pk, parent in queued.items()
+    )
+
+
+def mark_updated(model, pks):
+    """bump ``updated_at`` on rows changed without being saved"""
+    model.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+
+
+def stamp(value):
+    """an ISO 8601 UTC time ending in ``Z``"""
+    return value.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def page(queryset, field, position, size):
+    """
+    The next ``size`` rows after ``position``, a ``[time, id]`` pair or
+    None for the first page, in ``(field, id)`` order, and the position
+    of the last one, or None when no rows are left.
+    """
+    if position is not None:
+        moment, pk = parse_datetime(position[0]), position[1]
+        queryset = queryset.filter(Q(**{field + '__gt': moment}) |
+                                   Q(**{field: moment, 'id__gt': pk}))
+    rows = list(queryset.order_by(field, 'id')[:size + 1])
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, [stamp(getattr(rows[-1], field)), rows[-1].pk]
+
+
+SALT = 'core.sync'
+
+
+def dump_cursor(since, watermark, positions):
+    return signing.dumps({
+        'since': stamp(since) if since is not None else None,
+        'watermark': stamp(watermark),
+        'positions': positions,
+    }, salt=SALT)
+
+
+def load_cursor(cursor):
+    """``(since, watermark, positions)``, None if the cursor is not valid"""
+    try:
+        data = signing.loads(cursor, salt=SALT)
+    except signing.BadSignature:
+        return None
+    since = data['since']
+    return (parse_datetime(since) if since is not None else None,
+            parse_datetime(data['watermark']), data['positions'])
@@ -0,0 +1,104 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework.authtoken.models import Token
+from rest_framework import status
+
+from core.authentication import cache_stats
+
+
+reg_url = '/api/v1/accounts/auth/registration/'
+user_list_url = '/api/v1/users/'
+stats_url = '/api/v1/users/auth-cache-stats/'
+
+
+class CachedAuthenticationTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password": "Qwerty!@#",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01"
+        }
+
+        auth_user = self.client.post(reg_url, payload, format='json')
+
+        self.access_token = auth_user.data.get('access_token')
+        self.user = get_user_model().objects.get(email=payload['email'])
+
+    def user_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(user_list_url)
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        return [q['sql'] for q in ctx.captured_queries
+                if 'core_user' in q['sql'] and 'WHERE' in q['sql']]
+
+    def test_jwt_user_served_from_cache(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + self.access_token
+        )
+
+        before = cache_stats()
+        self.assertEquals(len(self.user_queries()), 1)
+        self.assertEquals(self.user_queries(), [])
+        self.assertEquals(cache_stats()['hits'] - before['hits'], 1)
+        self.assertEquals(cache_stats()['misses'] - before['misses'], 1)
+
+    def test_token_and_user_served_from_cache(self):
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        self.client.get(user_list_url)
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(user_list_url)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertFalse([q for q in ctx.captured_queries
+                          if 'authtoken' in q['sql']])
+
+    def test_deactivated_user_rejected(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + self.access_token
+        )
+        self.client.get(user_list_url)
+
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(user_list_url)
+        self.assertEquals(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_rejected(self):
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        self.client.get(user_list_url)
+
+        token.delete()
+
+        res = self.client.get(user_list_url)
+        self.assertEquals(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_stats_for_superusers_only(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + self.access_token
+        )
+        res = self.client.get(stats_url)
+        self.assertEquals(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_superuser = True
+        self.user.save()
+        self.client.get(user_list_url)
+        res = self.client.get(stats_url)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data, cache_stats())
+        self.assertGreater(res.data['hits'], 0)
@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from core.blobs import collect
+from core.models import School, Subject, Level, Lesson, Session, \
+                        Attachment, Blob
+from core.storage import ContentAddressedStorage
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def backdate(path, hours=48):
+    then = time.time() - hours * 60 * 60
+    os.utime(path, (then, then))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class BlobTest(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        instructor = get_user_model().objects.create_user(
+            email="instructor@bondeveloper.com", password="Qwerty!@#"
+        )
+        sch = School.objects.create(basename="gruut-high", name="Gruut High")
+        sub = Subject.objects.create(basename="spanish-fal",
+                                     name="Spanish FAL", school=sch)
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=sch)
+        les = Lesson.objects.create(subject=sub, level=level,
+                                    instructor=instructor, name="Python 101")
+        self.session = Session.objects.create(start_time=timezone.now(),
+                                              end_time=timezone.now(),
+                                              type="LCT", lesson=les)
+        self.storage = ContentAddressedStorage()
+
+    def attach(self, content, name='notes.pdf'):
+        attachment = Attachment(session=self.session, notes="Notes")
+        attachment.file.save(name, ContentFile(content))
+        return attachment
+
+    def refs(self, attachment):
+        return Blob.objects.get(name=attachment.file.name).refs
+
+    def test_same_content_stored_once(self):
+        first = self.attach(b'week one')
+        second = self.attach(b'week one', name='copy.PDF')
+        other = self.attach(b'week two')
+
+        self.assertEquals(first.file.name, second.file.name)
+        self.assertTrue(first.file.name.startswith('blobs/'))
+        self.assertTrue(first.file.name.endswith('.pdf'))
+        self.assertNotEquals(first.file.name, other.file.name)
+        self.assertEquals(self.refs(first), 2)
+        with second.file.open('rb') as fp:
+            self.assertEquals(fp.read(), b'week one')
+
+    def test_refs_follow_attachments(self):
+        first = self.attach(b'week one')
+        second = self.attach(b'week one')
+        name = first.file.name
+
+        second.file.save('notes.pdf', ContentFile(b'week two'))
+        self.assertEquals(Blob.objects.get(name=name).refs, 1)
+        self.assertEquals(self.refs(second), 1)
+
+        self.session.delete()
+        self.assertEquals(set(Blob.objects.values_list('refs', flat=True)),
+                          {0})
+
+    def test_collect_unused_blobs_after_grace(self):
+        used = self.attach(b'week one')
+        unused = self.attach(b'week two')
+        unused_name = unused.file.name
+        unused.delete()
+        # stored, but its attachment was never saved
+        orphan = self.storage.save('orphan.pdf', ContentFile(b'week three'))
+
+        self.assertEquals(collect(self.storage, timedelta(hours=24)), 0)
+        self.assertTrue(self.storage.exists(unused_name))
+
+        Blob.objects.update(updated_at=timezone.now() - timedelta(days=2))
+        for name in (used.file.name, unused_name, orphan):
+            backdate(self.storage.path(name))
+
+        self.assertEquals(collect(self.storage, timedelta(hours=24)), 2)
+        self.assertTrue(self.storage.exists(used.file.name))
+        self.assertFalse(self.storage.exists(unused_name))
+        self.assertFalse(self.storage.exists(orphan))
+        self.assertEquals(list(Blob.objects.values_list('name', flat=True)),
+                          [used.file.name])
+
+    def test_stored_again_not_collected(self):
+        unused = self.attach(b'week one')
+        name = unused.file.name
+        unused.delete()
+        Blob.objects.update(updated_at=timezone.now() - timedelta(days=2))
+        backdate(self.storage.path(name))
+
+        # about to be attached again
+        self.storage.save('notes.pdf', ContentFile(b'week one'))
+
+        self.assertEquals(collect(self.storage, timedelta(hours=24)), 0)
+        self.assertTrue(self.storage.exists(name))
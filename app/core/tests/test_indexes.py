@@ -0,0 +1,69 @@
+from unittest import skipUnless
+
+from django.test import TestCase
+from django.db import connection
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from core.models import School, Subject, Level, Lesson, Session, \
+                        Attachment, Moderation
+
+
+@skipUnless(connection.vendor == 'postgresql', 'needs the postgres planner')
+class IndexUsageTest(TestCase):
+    """
+    The test tables are tiny, so sequential scans are disabled to make the
+    planner show which index it would pick for each access pattern.
+    """
+
+    def setUp(self):
+        user = get_user_model().objects.create(
+            username="instructor",
+            email="instructor@bondeveloper.coom",
+            password="Qwerty!@#",
+        )
+        sch = School.objects.create(basename="gruut-high", name="Gruut High")
+        sub = Subject.objects.create(basename="spanish-fal",
+                                     name="Spanish FAL", school=sch)
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=sch)
+        self.lesson = Lesson.objects.create(subject=sub, level=level,
+                                            instructor=user,
+                                            name="Python 101")
+        self.session = Session.objects.create(start_time=timezone.now(),
+                                              end_time=timezone.now(),
+                                              lesson=self.lesson)
+        self.learner = user
+
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+            cursor.execute('ANALYZE')
+
+    def assertUsesIndex(self, queryset, index):
+        self.assertIn(index, queryset.explain())
+
+    def test_sessions_for_lesson_in_range(self):
+        now = timezone.now()
+        qs = Session.objects.filter(lesson=self.lesson,
+                                    start_time__gte=now,
+                                    start_time__lt=now)
+
+        self.assertUsesIndex(qs, 'session_lesson_start_idx')
+
+    def test_upcoming_sessions(self):
+        qs = Session.objects.filter(
+            start_time__gte=timezone.now()
+        ).order_by('start_time', 'id')
+
+        self.assertUsesIndex(qs, 'session_start_idx')
+
+    def test_moderations_for_learner_in_session(self):
+        qs = Moderation.objects.filter(learner=self.learner,
+                                       session=self.session)
+
+        self.assertUsesIndex(qs, 'moderation_learner_session_idx')
+
+    def test_attachments_for_session_in_order(self):
+        qs = Attachment.objects.filter(session=self.session).order_by('id')
+
+        self.assertUsesIndex(qs, 'attachment_session_idx')
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 
@@ -52,3 +54,55 @@ class ModelsTest(TestCase):
 
         self.assertEquals(superuser.email, self.TEST_DATA.get("email"))
         self.assertTrue(superuser.is_superuser, True)
+
+    def test_bulk_create_users(self):
+        users_data = [
+            {"email": "user%d@BONDEVELOPER.COM" % i, "password": "pw%d" % i,
+             "username": "user%d" % i}
+            for i in range(10)
+        ]
+
+        users, failures = get_user_model().objects.bulk_create_users(
+            users_data
+        )
+
+        self.assertEquals(failures, [])
+        self.assertEquals(len(users), 10)
+        user = get_user_model().objects.get(email="user3@bondeveloper.com")
+        self.assertTrue(user.check_password("pw3"))
+
+    def test_bulk_create_users_without_passwords_skips_pool(self):
+        users_data = [
+            {"email": "user%d@bondeveloper.com" % i, "username": "user%d" % i}
+            for i in range(20)
+        ]
+
+        with patch('core.models.ProcessPoolExecutor') as pool:
+            users, failures = get_user_model().objects.bulk_create_users(
+                users_data, require_password=False
+            )
+
+        pool.assert_not_called()
+        self.assertEquals(len(users), 20)
+        self.assertFalse(any(user.has_usable_password() for user in users))
+
+    def test_bulk_create_users_reports_failures(self):
+        get_user_model().objects.create_user(
+            email=self.TEST_DATA.get("email"),
+            password=self.TEST_DATA.get("password")
+        )
+
+        users, failures = get_user_model().objects.bulk_create_users([
+            {"email": self.TEST_DATA.get("email"), "password": "123"},
+            {"email": "new@bondeveloper.com", "password": "123"},
+            {"email": "new@bondeveloper.com", "password": "456"},
+            {"email": "nopassword@bondeveloper.com"},
+        ])
+
+        self.assertEquals([user.email for user in users],
+                          ["new@bondeveloper.com"])
+        self.assertEquals(
+            sorted(failure['email'] for failure in failures),
+            ["new@bondeveloper.com", "nopassword@bondeveloper.com",
+             self.TEST_DATA.get("email")]
+        )
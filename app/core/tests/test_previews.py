@@ -0,0 +1,128 @@
+import io
+import shutil
+import tempfile
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.staticfiles import finders
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from core.models import School, Subject, Level, Lesson, Session, \
+                        Attachment, Blob
+from core.previews import generate
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class PreviewTest(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        instructor = get_user_model().objects.create_user(
+            email="instructor@bondeveloper.com", password="Qwerty!@#"
+        )
+        sch = School.objects.create(basename="gruut-high", name="Gruut High")
+        sub = Subject.objects.create(basename="spanish-fal",
+                                     name="Spanish FAL", school=sch)
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=sch)
+        les = Lesson.objects.create(subject=sub, level=level,
+                                    instructor=instructor, name="Python 101")
+        self.session = Session.objects.create(start_time=timezone.now(),
+                                              end_time=timezone.now(),
+                                              type="LCT", lesson=les)
+
+    def attach(self, name, content=None):
+        attachment = Attachment(session=self.session, notes="Notes")
+        if content is None:
+            with open(finders.find('tests/' + name), 'rb') as fp:
+                attachment.file.save(name, File(fp))
+        else:
+            attachment.file.save(name, ContentFile(content))
+        return attachment
+
+    def preview(self, attachment):
+        generate(attachment.pk)
+        return Attachment.objects.get(pk=attachment.pk)
+
+    def test_docx_excerpt(self):
+        attachment = self.attach('sample.docx')
+        self.assertEquals(attachment.preview_status, 'pending')
+
+        attachment = self.preview(attachment)
+
+        self.assertEquals(attachment.preview_status, 'ready')
+        self.assertEquals(attachment.excerpt, 'Test docs')
+
+    @skipUnless(shutil.which('pdftoppm') and shutil.which('pdftotext'),
+                'needs poppler')
+    def test_pdf_thumbnail(self):
+        attachment = self.preview(self.attach('sample.pdf'))
+
+        self.assertEquals(attachment.preview_status, 'ready')
+        with attachment.thumbnail.open('rb') as fp:
+            self.assertEquals(fp.read(8), b'\x89PNG\r\n\x1a\n')
+        self.assertEquals(Blob.objects.get(name=attachment.thumbnail.name)
+                                      .refs, 1)
+
+    def test_unknown_and_broken_files(self):
+        self.assertEquals(self.preview(self.attach('notes.txt', b'Hi'))
+                              .preview_status, 'none')
+        self.assertEquals(self.preview(self.attach('notes.docx', b'Hi'))
+                              .preview_status, 'failed')
+
+    def test_shared_file_previewed_once(self):
+        first = self.preview(self.attach('sample.docx'))
+        second = self.attach('sample.docx')
+
+        with patch('core.previews.make') as make:
+            second = self.preview(second)
+
+        make.assert_not_called()
+        self.assertEquals(second.preview_status, 'ready')
+        self.assertEquals(second.excerpt, first.excerpt)
+
+    def test_new_file_needs_new_preview(self):
+        attachment = self.preview(self.attach('sample.docx'))
+        attachment.thumbnail.save('thumbnail.png', ContentFile(b'png'))
+        thumbnail = attachment.thumbnail.name
+
+        attachment.file.save('notes.txt', ContentFile(b'Hi'))
+
+        attachment = Attachment.objects.get(pk=attachment.pk)
+        self.assertEquals(attachment.preview_status, 'pending')
+        self.assertEquals(attachment.excerpt, '')
+        self.assertFalse(attachment.thumbnail)
+        self.assertEquals(Blob.objects.get(name=thumbnail).refs, 0)
+
+    def test_generated_once_committed(self):
+        with patch('core.signals.schedule') as schedule:
+            attachment = self.attach('sample.docx')
+            attachment.notes = "Updated"
+            attachment.save()
+
+        schedule.assert_called_once_with(attachment.pk)
+
+    def test_command_catches_up(self):
+        attachment = self.attach('sample.docx')
+        Attachment.objects.filter(pk=attachment.pk) \
+                          .update(preview_status='failed')
+
+        call_command('generate_previews', stdout=io.StringIO())
+        self.assertEquals(Attachment.objects.get(pk=attachment.pk)
+                                            .preview_status, 'failed')
+
+        call_command('generate_previews', '--retry', stdout=io.StringIO())
+        self.assertEquals(Attachment.objects.get(pk=attachment.pk)
+                                            .preview_status, 'ready')
@@ -0,0 +1,128 @@
+from io import StringIO
+
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.core.management import call_command
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from core.models import School, Subject, Level, Lesson, Session, \
+                        Moderation, ScoreSummary
+
+
+class ScoreSummaryTest(TestCase):
+
+    def setUp(self):
+        self.learner = get_user_model().objects.create_user(
+            email="learner@bondeveloper.com", password="Qwerty!@#"
+        )
+        sch = School.objects.create(basename="gruut-high", name="Gruut High")
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=sch)
+        self.subjects = [
+            Subject.objects.create(basename="subject-%d" % i,
+                                   name="Subject %d" % i, school=sch)
+            for i in range(2)
+        ]
+        self.sessions = []
+        for subject in self.subjects:
+            lesson = Lesson.objects.create(subject=subject, level=level,
+                                           instructor=self.learner,
+                                           name="Python 101")
+            self.sessions.append(
+                Session.objects.create(start_time=timezone.now(),
+                                       end_time=timezone.now(),
+                                       type="TCN", lesson=lesson)
+            )
+
+    def moderate(self, score, max_score=10, score_type='unit', session=0):
+        return Moderation.objects.create(session=self.sessions[session],
+                                         learner=self.learner,
+                                         learner_score=score,
+                                         max_score=max_score,
+                                         score_type=score_type)
+
+    def summary(self, subject=0):
+        return ScoreSummary.objects.get(learner=self.learner,
+                                        subject=self.subjects[subject])
+
+    def summaries(self):
+        return sorted(ScoreSummary.objects.values_list(
+            'learner', 'subject', 'count', 'score_total', 'max_total',
+            'percent_total', 'average'
+        ))
+
+    def test_created_moderations_summarised(self):
+        self.moderate(5)
+        self.moderate(90, 100, 'percentage')
+        self.moderate(3, 0)
+
+        summary = self.summary()
+        self.assertEquals(summary.count, 2)
+        self.assertEquals(summary.score_total, 95)
+        self.assertEquals(summary.max_total, 110)
+        self.assertEquals(summary.average, 70)
+
+    def test_updated_moderation_moves_between_summaries(self):
+        moderation = self.moderate(5)
+        self.moderate(7)
+
+        moderation.learner_score = 9
+        moderation.save()
+        self.assertEquals(self.summary().average, 80)
+
+        moderation.session = self.sessions[1]
+        moderation.save()
+        self.assertEquals(self.summary(0).average, 70)
+        self.assertEquals(self.summary(1).average, 90)
+
+    def test_deleted_moderations_taken_out(self):
+        first = self.moderate(5)
+        second = self.moderate(7)
+
+        first.delete()
+        self.assertEquals(self.summary().average, 70)
+
+        second.delete()
+        self.assertFalse(ScoreSummary.objects.exists())
+
+    def test_cascade_takes_out_scores_together(self):
+        self.moderate(5)
+        before = self.summaries()
+
+        def delete_lesson(count):
+            lesson = Lesson.objects.create(subject=self.subjects[0],
+                                           level=self.sessions[0]
+                                           .lesson.level,
+                                           instructor=self.learner,
+                                           name="Python 102")
+            session = Session.objects.create(start_time=timezone.now(),
+                                             end_time=timezone.now(),
+                                             type="TCN", lesson=lesson)
+            for score in range(count):
+                Moderation.objects.create(session=session,
+                                          learner=self.learner,
+                                          learner_score=score, max_score=10,
+                                          score_type='unit')
+            with CaptureQueriesContext(connection) as ctx:
+                lesson.delete()
+            self.assertEquals(self.summaries(), before)
+            return [query for query in ctx.captured_queries
+                    if 'core_scoresummary' in query['sql']]
+
+        self.assertEquals(len(delete_lesson(2)), len(delete_lesson(30)))
+
+    def test_rebuild_matches_incremental_updates(self):
+        for score in (1, 4, 9):
+            self.moderate(score)
+        self.moderate(60, 100, 'percentage', session=1)
+        Moderation.objects.filter(learner_score=4).delete()
+        incremental = self.summaries()
+
+        ScoreSummary.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_score_summaries', stdout=out)
+
+        self.assertIn('Rebuilt 2 score summaries', out.getvalue())
+        self.assertEquals(self.summaries(), incremental)
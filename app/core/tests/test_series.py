@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from core.models import School, Subject, Level, Lesson, Session, \
+                        SessionSeries
+
+
+def day(number, hour=9):
+    return timezone.make_aware(datetime(2021, 1, number, hour))
+
+
+class SessionSeriesTest(TestCase):
+
+    def setUp(self):
+        instructor = get_user_model().objects.create_user(
+            email="instructor@bondeveloper.com", password="Qwerty!@#"
+        )
+        sch = School.objects.create(basename="gruut-high", name="Gruut High")
+        sub = Subject.objects.create(basename="spanish-fal",
+                                     name="Spanish FAL", school=sch)
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=sch)
+        self.lesson = Lesson.objects.create(subject=sub, level=level,
+                                            instructor=instructor,
+                                            name="Python 101")
+
+    def series(self, **kwargs):
+        # Mondays 9:00 to 10:00 from 4 January 2021
+        return SessionSeries.objects.create(lesson=self.lesson,
+                                            start_time=day(4),
+                                            end_time=day(4, 10), **kwargs)
+
+    def test_occurrences_in_window(self):
+        series = self.series()
+
+        self.assertEquals(list(series.occurrences(day(1), day(19))),
+                          [day(4), day(11), day(18)])
+        # an occurrence still running at the start of the window counts
+        self.assertEquals(list(series.occurrences(day(11, 9) +
+                                                  timedelta(minutes=30),
+                                                  day(12))),
+                          [day(11)])
+        self.assertEquals(list(series.occurrences(day(5), day(11))), [])
+
+    def test_far_window_skips_to_its_occurrences(self):
+        series = self.series(interval=2)
+        start = day(4) + timedelta(weeks=1000)
+
+        self.assertEquals(list(series.occurrences(start, start +
+                                                  timedelta(weeks=4))),
+                          [start, start + timedelta(weeks=2)])
+
+    def test_count_and_until_end_series(self):
+        self.assertEquals(
+            list(self.series(count=2).occurrences(day(1), day(31))),
+            [day(4), day(11)]
+        )
+        self.assertEquals(
+            list(self.series(until=day(18)).occurrences(day(1), day(31))),
+            [day(4), day(11), day(18)]
+        )
+
+    def test_index_of(self):
+        series = self.series(frequency='daily', count=5)
+
+        self.assertEquals(series.index_of(day(6)), 2)
+        self.assertEquals(series.index_of(day(6, 10)), None)
+        self.assertEquals(series.index_of(day(3)), None)
+        self.assertEquals(series.index_of(day(9)), None)
+
+    def test_materialize_once(self):
+        series = self.series()
+
+        session = series.materialize(day(11))
+
+        self.assertEquals(session.start_time, day(11))
+        self.assertEquals(session.end_time, day(11, 10))
+        self.assertEquals(session.lesson, self.lesson)
+        self.assertEquals(series.materialize(day(11)), session)
+        self.assertEquals(Session.objects.count(), 1)
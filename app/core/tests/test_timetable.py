@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+from io import StringIO
+
+from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from core.models import School, Subject, Level, Lesson, Session
+from core.timetable import sweep, conflicts
+
+
+def at(hour, day=2):
+    return timezone.make_aware(datetime(2020, 11, day, hour))
+
+
+class TimetableTest(TestCase):
+
+    def setUp(self):
+        self.instructors = [
+            get_user_model().objects.create_user(
+                email="instructor%d@bondeveloper.com" % i,
+                password="Qwerty!@#"
+            )
+            for i in range(2)
+        ]
+        self.learner = get_user_model().objects.create_user(
+            email="learner@bondeveloper.com", password="Qwerty!@#"
+        )
+        self.school = School.objects.create(basename="gruut-high",
+                                            name="Gruut High")
+        sub = Subject.objects.create(basename="spanish-fal",
+                                     name="Spanish FAL", school=self.school)
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=self.school)
+        self.lessons = [
+            Lesson.objects.create(subject=sub, level=level,
+                                  instructor=instructor, name="Python 101")
+            for instructor in self.instructors
+        ]
+
+    def session(self, start, end, lesson=0):
+        return Session.objects.create(start_time=at(start), end_time=at(end),
+                                      type="TCN", lesson=self.lessons[lesson])
+
+    def test_sweep_finds_every_overlapping_interval(self):
+        pairs = list(sweep([(0, 10, 'a'), (12, 13, 'd'), (1, 20, 'b'),
+                            (2, 5, 'c'), (20, 21, 'e')]))
+
+        self.assertEquals(pairs, [('a', 'b'), ('b', 'c'), ('b', 'd')])
+
+    def test_shared_instructor_clashes(self):
+        stored = self.session(9, 11)
+
+        self.assertEquals(
+            conflicts([('new', at(10), at(12), self.lessons[0].pk)]),
+            {'new': {stored.pk}}
+        )
+        self.assertEquals(
+            conflicts([('new', at(11), at(12), self.lessons[0].pk)]), {}
+        )
+        self.assertEquals(
+            conflicts([('new', at(10), at(12), self.lessons[1].pk)]), {}
+        )
+
+    def test_shared_learner_clashes(self):
+        self.lessons[0].learners.add(self.learner)
+        self.lessons[1].learners.add(self.learner)
+        stored = self.session(9, 11, lesson=0)
+
+        self.assertEquals(
+            conflicts([('new', at(10), at(12), self.lessons[1].pk)]),
+            {'new': {stored.pk}}
+        )
+
+    def test_stored_session_not_checked_against_itself(self):
+        stored = self.session(9, 11)
+
+        self.assertEquals(
+            conflicts([(stored.pk, at(10), at(12), self.lessons[0].pk)]), {}
+        )
+
+    def test_validate_term_command(self):
+        first = self.session(9, 11)
+        second = self.session(10, 12)
+        Session.objects.create(start_time=at(10, day=9),
+                               end_time=at(12, day=9), type="TCN",
+                               lesson=self.lessons[0])
+
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('validate_timetable', stdout=out)
+        self.assertIn('session %d clashes with session %d' % (
+            first.pk, second.pk
+        ), out.getvalue())
+
+        second.start_time += timedelta(hours=1)
+        second.save()
+        out = StringIO()
+        call_command('validate_timetable', '--school', self.school.pk,
+                     '--from', '2020-11-01', '--to', '2020-11-07',
+                     stdout=out)
+        self.assertIn('No timetable clashes', out.getvalue())
@@ -0,0 +1,116 @@
+"""
+Timetable conflicts: two sessions clash when they overlap in time and
+share a person, the instructor or a learner of their lessons, in either
+role. Touching sessions (one ends as the next starts) do not clash.
+
+Sessions are grouped per person and each group is swept once in start
+order, so checking n (session, person) intervals costs O(n log n).
+"""
+from collections import defaultdict
+from operator import itemgetter
+
+from django.db.models import DateTimeField, ExpressionWrapper, F, Q
+
+from core.models import Lesson, Session
+
+
+def participants(lesson_ids):
+    """the ids of each lesson's instructor and learners, by lesson id"""
+    people = defaultdict(set)
+    for lesson, instructor in Lesson.objects.filter(
+        pk__in=lesson_ids
+    ).values_list('id', 'instructor_id'):
+        people[lesson].add(instructor)
+    for lesson, learner in Lesson.learners.through.objects.filter(
+        lesson_id__in=lesson_ids
+    ).values_list('lesson_id', 'user_id'):
+        people[lesson].add(learner)
+    return people
+
+
+def sweep(intervals):
+    """
+    Clashing pairs among one person's ``(start, end, key)`` intervals.
+    Every interval that overlaps another is in at least one pair.
+    """
+    latest_end = latest = None
+    for start, end, key in sorted(intervals, key=itemgetter(0, 1)):
+        if latest_end is not None and start < latest_end:
+            yield latest, key
+        if latest_end is None or end > latest_end:
+            latest_end, latest = end, key
+
+
+def clashes(sessions):
+    """
+    ``(key, key, person)`` clashes among ``(key, start, end, lesson_id)``
+    sessions.
+    """
+    sessions = list(sessions)
+    people = participants({lesson for _, _, _, lesson in sessions})
+
+    by_person = defaultdict(list)
+    for key, start, end, lesson in sessions:
+        for person in people[lesson]:
+            by_person[person].append((start, end, key))
+
+    for person, intervals in by_person.items():
+        for first, second in sweep(intervals):
+            yield first, second, person
+
+
+def conflicts(candidates):
+    """
+    Sessions that clash with any of the ``(key, start, end, lesson_id)``
+    candidates, new sessions or new values of stored ones (keyed by their
+    id), as ``{candidate key: {clashing keys}}``.
+    """
+    candidates = list(candidates)
+    if not candidates:
+        return {}
+
+    people = set().union(*participants(
+        {lesson for _, _, _, lesson in candidates}
+    ).values())
+    keys = {key for key, _, _, _ in candidates}
+    stored = Session.objects.filter(
+        Q(lesson__instructor__in=people) | Q(lesson__learners__in=people),
+        start_time__lt=max(end for _, _, end, _ in candidates),
+        end_time__gt=min(start for _, start, _, _ in candidates),
+    ).exclude(pk__in=[key for key in keys if isinstance(key, int)]) \
+     .distinct().values_list('id', 'start_time', 'end_time', 'lesson_id')
+
+    found = defaultdict(set)
+    for first, second, _ in clashes(candidates + list(stored)):
+        if first in keys:
+            found[first].add(second)
+        if second in keys:
+            found[second].add(first)
+    return dict(found)
+
+
+def sessions_between(sessions, series, start, end):
+    """
+    The ``sessions`` overlapping ``start`` to ``end`` and the occurrences of
+    ``series`` there that are not stored yet, as unsaved Sessions, ordered
+    by start.
+    """
+    found = list(sessions.filter(start_time__lt=end, end_time__gt=start))
+
+    # a series still runs while its last occurrence may end after start
+    series = list(series.annotate(last_end=ExpressionWrapper(
+        F('until') + (F('end_time') - F('start_time')),
+        output_field=DateTimeField()
+    )).filter(Q(until__isnull=True) | Q(last_end__gt=start),
+              start_time__lt=end))
+    stored = set(Session.objects.filter(
+        series__in=series, occurrence__isnull=False
+    ).values_list('series_id', 'occurrence'))
+    for item in series:
+        found.extend(item.session(occurrence)
+                     for occurrence in item.occurrences(start, end)
+                     if (item.pk, occurrence) not in stored)
+
+    found.sort(key=lambda session: (session.start_time, session.pk is None,
+                                    session.pk))
+    return found
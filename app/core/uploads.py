@@ -0,0 +1,92 @@
+"""
+Chunked, resumable uploads of attachment files.
+
+A client starts a core.models.Upload giving the file's size and sends the
+file as numbered parts of ``chunk_size`` bytes, in any order and as often
+as needed. Each part is streamed to a temporary file under
+MEDIA_ROOT/uploads/<id>/ and only renamed into place once it has all of
+its bytes, so after a dropped connection the parts on disk tell the
+client where to resume. Completing the upload concatenates the parts into
+one file, which the storage then moves into place instead of copying it.
+"""
+import os
+import shutil
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+
+
+UPLOADS_DIR = 'uploads'
+BUFFER_SIZE = 64 * 1024
+
+
+class AssembledFile(File):
+    """a file on disk that FileSystemStorage moves rather than copies"""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def upload_dir(upload):
+    return os.path.join(settings.MEDIA_ROOT, UPLOADS_DIR, str(upload.pk))
+
+
+def part_path(upload, number):
+    return os.path.join(upload_dir(upload), '%d.part' % number)
+
+
+def received(upload):
+    """the numbers of the parts stored so far"""
+    try:
+        names = os.listdir(upload_dir(upload))
+    except FileNotFoundError:
+        return []
+    return sorted(int(name[:-5]) for name in names if name.endswith('.part'))
+
+
+def missing(upload):
+    return sorted(set(range(upload.parts)) - set(received(upload)))
+
+
+def write_part(upload, number, stream):
+    """
+    Stream part ``number`` from ``stream`` to disk, keeping it only if it
+    has exactly the size the part should have. Returns the bytes read,
+    which is one more than the part size when the body is too long.
+    """
+    expected = upload.part_size(number)
+    os.makedirs(upload_dir(upload), exist_ok=True)
+    path = part_path(upload, number)
+    # retries of a part may overlap, so each writes a file of its own
+    temp = '%s.%s.tmp' % (path, uuid.uuid4().hex)
+
+    written = 0
+    try:
+        with open(temp, 'wb') as fp:
+            while written <= expected:
+                data = stream.read(min(BUFFER_SIZE, expected + 1 - written))
+                if not data:
+                    break
+                fp.write(data)
+                written += len(data)
+        if written == expected:
+            os.replace(temp, path)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+    return written
+
+
+def assemble(upload):
+    """concatenate the parts into one file, a buffer at a time"""
+    path = os.path.join(upload_dir(upload), 'file')
+    with open(path, 'wb') as out:
+        for number in range(upload.parts):
+            with open(part_path(upload, number), 'rb') as part:
+                shutil.copyfileobj(part, out, BUFFER_SIZE)
+    return AssembledFile(open(path, 'rb'), upload.filename)
+
+
+def discard(upload):
+    shutil.rmtree(upload_dir(upload), ignore_errors=True)
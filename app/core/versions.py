@@ -0,0 +1,80 @@
+"""
+Last-change timestamps per model, kept in the cache.
+
+Signals (and bulk writes that bypass them) ``touch`` a model whenever its
+rows change, so cached responses and HTTP validators can tell whether a
+table changed without querying it.
+
+Versions are whole seconds, the granularity of Last-Modified, taken from
+one counter that only moves forward, at least to the clock: every touch
+gets a version above all earlier ones, of any model, even within a
+second. Under a burst of changes versions run ahead of the clock for a
+while.
+"""
+import math
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+CLOCK_KEY = 'version:clock'
+
+
+def version_key(model):
+    return 'version:%s' % model._meta.label_lower
+
+
+def model_version(model):
+    """when ``model`` last changed, or when we started tracking it"""
+    return key_version(version_key(model))
+
+
+def key_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, max(math.ceil(time.time()),
+                           cache.get(CLOCK_KEY, 0)), None)
+        version = cache.get(key)
+    return version
+
+
+def models_version(*models):
+    versions = cache.get_many([version_key(model) for model in models])
+    if len(versions) < len(models):
+        return max(model_version(model) for model in models)
+    return max(versions.values())
+
+
+def touch(*models):
+    touch_keys(*[version_key(model) for model in models])
+
+
+def touch_keys(*keys):
+    """
+    Bump the versions once the current transaction commits (at once
+    outside one), so a response read meanwhile, without the change, is
+    not cached under the new version.
+    """
+    def bump():
+        cache.set_many(dict.fromkeys(keys, next_version()), None)
+
+    transaction.on_commit(bump)
+
+
+def next_version():
+    """
+    A version above every one handed out before. Only atomic increments
+    are used, so concurrent calls all get different versions.
+    """
+    now = math.ceil(time.time())
+    try:
+        version = cache.incr(CLOCK_KEY)
+    except ValueError:
+        # never set or evicted
+        if cache.add(CLOCK_KEY, now, None):
+            return now
+        version = cache.incr(CLOCK_KEY)
+    if version < now:
+        version = cache.incr(CLOCK_KEY, now - version)
+    return version
@@ -66,9 +66,11 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'dj_rest_auth.jwt_auth.JWTCookieAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'core.authentication.CachedJWTCookieAuthentication',
+        'core.authentication.CachedTokenAuthentication',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': int(os.environ.get('API_PAGE_SIZE', 50)),
 }
 
 
@@ -119,6 +121,38 @@ DATABASES = {
 }
 
 
+# Cache
+# A shared backend (memcached, database, file) is needed for invalidation to
+# reach every worker; with the default per-process memory cache, stale
+# entries live until their timeout.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# seconds a cached public list response is kept
+LIST_CACHE_TIMEOUT = int(os.environ.get('LIST_CACHE_TIMEOUT', 300))
+
+# seconds the sync watermark trails the clock, so rows from transactions
+# still committing when a client syncs are sent again next time
+SYNC_WATERMARK_LAG = int(os.environ.get('SYNC_WATERMARK_LAG', 5))
+
+# days tombstones of deleted rows are kept (see purge_tombstones); clients
+# that last synced before that must sync everything again
+SYNC_TOMBSTONE_DAYS = int(os.environ.get('SYNC_TOMBSTONE_DAYS', 90))
+
+# bytes per part of a chunked attachment upload (see core.uploads), and the
+# largest file that can be uploaded that way; the proxy's
+# client_max_body_size must allow a whole part
+UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))
+UPLOAD_MAX_SIZE = int(os.environ.get('UPLOAD_MAX_SIZE', 4 * 1024 ** 3))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
@@ -162,6 +196,21 @@ STATIC_ROOT = '/vol/web/static'
 MEDIA_ROOT = '/vol/web/media'
 
 
+# make attachment previews in a thread of the web worker once the upload
+# is committed (core.previews); the generate_previews command does the
+# ones left pending either way
+PREVIEWS_IN_BACKGROUND = bool(int(os.environ.get('PREVIEWS_IN_BACKGROUND',
+                                                 1)))
+
+# Attachments are downloaded through the app, which checks permissions.
+# Behind the proxy it only answers with X-Accel-Redirect to MEDIA_URL, an
+# internal location there, and nginx sends the file; without the proxy
+# (DEBUG) the app sends the file itself.
+ATTACHMENT_ACCEL_REDIRECT = bool(int(os.environ.get(
+    'ATTACHMENT_ACCEL_REDIRECT', not DEBUG
+)))
+
+
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 AUTH_USER_MODEL = 'core.User'
@@ -177,6 +226,9 @@ REST_AUTH_REGISTER_SERIALIZERS  = {
     'REGISTER_SERIALIZER':  'account.serializers.RegisterSerializer',
 }
 
+# seconds an authenticated user is served from the cache
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', 30))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=30),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=60),
@@ -0,0 +1,89 @@
+"""
+Gradebook statistics over Moderation scores.
+
+Scores are compared as percentages (see core.scores). The database does the
+normalising, the sums and the per-learner grouping; only the sorted
+percentages are brought into Python, for the percentiles and the
+distribution.
+"""
+from bisect import bisect_left
+from math import floor
+
+from django.db.models import Avg, Count, Max, Min, StdDev
+
+from core.scores import percent
+
+
+PERCENTILES = (10, 25, 50, 75, 90)
+BIN_WIDTH = 10
+# learners in the ranking unless asked for more, and at most
+TOP_LEARNERS = 20
+MAX_TOP_LEARNERS = 500
+
+
+def percentile(scores, rank):
+    """the ``rank``th percentile of sorted ``scores``, interpolated"""
+    position = (len(scores) - 1) * rank / 100
+    low = floor(position)
+    high = min(low + 1, len(scores) - 1)
+    return scores[low] + (scores[high] - scores[low]) * (position - low)
+
+
+def rounded(value):
+    return None if value is None else round(value, 2)
+
+
+def gradebook(queryset, percentiles=PERCENTILES, top=TOP_LEARNERS):
+    """
+    summary, distribution and the ``top`` learners of the ranking of
+    ``queryset``'s scores
+    """
+    queryset = queryset.order_by().annotate(percent=percent()) \
+                       .filter(percent__isnull=False)
+
+    summary = queryset.aggregate(count=Count('id'), mean=Avg('percent'),
+                                 stdev=StdDev('percent'),
+                                 min=Min('percent'), max=Max('percent'),
+                                 learner_count=Count('learner',
+                                                     distinct=True))
+    scores = list(queryset.order_by('percent')
+                          .values_list('percent', flat=True))
+
+    # bins of BIN_WIDTH points, the last one closed and holding anything
+    # above 100, the first holding anything below 0
+    edges = [bisect_left(scores, edge)
+             for edge in range(BIN_WIDTH, 100, BIN_WIDTH)]
+    counts = [high - low for low, high in
+              zip([0] + edges, edges + [len(scores)])]
+    distribution = [{'from': start, 'to': start + BIN_WIDTH, 'count': count}
+                    for start, count in zip(range(0, 100, BIN_WIDTH), counts)]
+
+    by_learner = queryset.values('learner') \
+                         .annotate(mean=Avg('percent'), count=Count('id')) \
+                         .order_by('-mean', 'learner')[:top]
+    learners = []
+    previous = None
+    for position, row in enumerate(by_learner, start=1):
+        # learners with the same mean share a rank
+        if row['mean'] != previous:
+            rank = position
+            previous = row['mean']
+        learners.append({'learner': row['learner'],
+                         'mean': rounded(row['mean']),
+                         'count': row['count'], 'rank': rank})
+
+    return {
+        'count': summary['count'],
+        'mean': rounded(summary['mean']),
+        'stdev': rounded(summary['stdev']),
+        'min': rounded(summary['min']),
+        'max': rounded(summary['max']),
+        'median': rounded(percentile(scores, 50)) if scores else None,
+        'percentiles': {
+            str(rank): rounded(percentile(scores, rank)) if scores else None
+            for rank in percentiles
+        },
+        'distribution': distribution,
+        'learner_count': summary['learner_count'],
+        'learners': learners,
+    }
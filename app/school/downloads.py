@@ -0,0 +1,106 @@
+"""
+Sending files from the app when there is no proxy to do it (see
+ATTACHMENT_ACCEL_REDIRECT).
+
+Whole files go out as a FileResponse, which the server can hand to
+sendfile through wsgi.file_wrapper. A single byte range (``Range:
+bytes=first-last``, honouring If-Range) is read from a memory map of the
+file a buffer at a time, so seeking in a video or resuming a download
+reads only the requested bytes, and no request holds more than a buffer
+in memory. ETag and Last-Modified come from the file's size and mtime,
+and a matching If-None-Match or If-Modified-Since gets a 304.
+"""
+import mmap
+import os
+import re
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+
+BUFFER_SIZE = 64 * 1024
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header, size):
+    """
+    ``(first, last)`` of a single byte range, None to send the whole file
+    (no range, several ranges or a malformed one), or ``()`` if the range
+    cannot be satisfied.
+    """
+    match = RANGE.match(header.replace(' ', ''))
+    if match is None:
+        return None
+
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # the final ``last`` bytes
+        if int(last) == 0 or size == 0:
+            return ()
+        return max(0, size - int(last)), size - 1
+
+    first = int(first)
+    if last and int(last) < first:
+        return None
+    if first >= size:
+        return ()
+    return first, min(int(last), size - 1) if last else size - 1
+
+
+def read_range(path, first, last):
+    """the bytes ``first`` to ``last`` of a file, from a memory map"""
+    with open(path, 'rb') as fp:
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            position = first
+            while position <= last:
+                end = min(position + BUFFER_SIZE, last + 1)
+                yield mapped[position:end]
+                position = end
+
+
+def if_range_matches(request, etag, last_modified):
+    """whether a Range applies, given the If-Range it came with"""
+    value = request.META.get('HTTP_IF_RANGE')
+    if not value:
+        return True
+    if value.startswith(('"', 'W/')):
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+
+def file_response(request, path, content_type):
+    stat = os.stat(path)
+    etag = quote_etag('%x-%x' % (int(stat.st_mtime), stat.st_size))
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag,
+                                        last_modified=last_modified)
+    if response is None:
+        byte_range = None
+        header = request.META.get('HTTP_RANGE')
+        if header and if_range_matches(request, etag, last_modified):
+            byte_range = parse_range(header, stat.st_size)
+
+        if byte_range == ():
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */%d' % stat.st_size
+        elif byte_range:
+            first, last = byte_range
+            response = StreamingHttpResponse(read_range(path, first, last),
+                                             status=206,
+                                             content_type=content_type)
+            response['Content-Length'] = last - first + 1
+            response['Content-Range'] = 'bytes %d-%d/%d' % (
+                first, last, stat.st_size
+            )
+        else:
+            response = FileResponse(open(path, 'rb'),
+                                    content_type=content_type)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
@@ -0,0 +1,235 @@
+"""
+Import a term's roster from CSV.
+
+Each row enrols one learner in one lesson of a school::
+
+    email,first_name,last_name,username,password,subject,level,lesson
+
+``subject`` and ``level`` are basenames of the school's subjects and
+levels. Learners and lessons that do not exist yet are created, lessons
+with the importing instructor; a blank password leaves the learner with
+an unusable one. Rows are read lazily and stored in chunks, each chunk in
+one transaction with a bulk insert per table, so the import costs a few
+queries per chunk rather than several per row.
+
+A file that cannot be read, as text or as CSV, part way through keeps
+the chunks already stored; the report lists the row it stopped at.
+"""
+import csv
+from collections import defaultdict
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import connection, transaction
+
+from core.models import Subject, Level, Lesson, Profile
+from core.feeds import touch_feeds
+from core.sync import mark_updated
+from core.versions import touch
+
+
+COLUMNS = ('email', 'first_name', 'last_name', 'username', 'password',
+           'subject', 'level', 'lesson')
+REQUIRED_COLUMNS = ('email', 'subject', 'level', 'lesson')
+USER_COLUMNS = ('first_name', 'last_name', 'username', 'password')
+
+
+def unreadable(exc):
+    if isinstance(exc, UnicodeDecodeError):
+        return 'The file must be UTF-8 text.'
+    return 'The file is not valid CSV: %s.' % exc
+
+
+class RosterImporter:
+    """
+    Import CSV rows into ``school``. ``run`` returns a report with the
+    counts of created users and lessons, new enrolments, and the errors of
+    rows that were skipped, by line number.
+    """
+    chunk_size = 1000
+
+    def __init__(self, school, instructor, chunk_size=None):
+        self.school = school
+        self.instructor = instructor
+        if chunk_size:
+            self.chunk_size = chunk_size
+
+        self.subjects = dict(Subject.objects.filter(school=school)
+                             .values_list('basename', 'id'))
+        self.levels = dict(Level.objects.filter(school=school)
+                           .values_list('basename', 'id'))
+        self.lessons = {}
+        for pk, subject, level, name in Lesson.objects.filter(
+            subject__school=school
+        ).values_list('id', 'subject_id', 'level_id', 'name'):
+            self.lessons.setdefault((subject, level, name), pk)
+
+        self.report = {'rows': 0, 'created_users': 0, 'created_lessons': 0,
+                       'enrolled': 0, 'errors': []}
+
+    def run(self, lines):
+        """import an iterable of CSV text lines, header first"""
+        reader = csv.DictReader(lines)
+        try:
+            fieldnames = reader.fieldnames or ()
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise ValidationError(unreadable(exc))
+        missing = [column for column in REQUIRED_COLUMNS
+                   if column not in fieldnames]
+        if missing:
+            raise ValidationError(
+                'Missing columns: %s.' % ', '.join(missing)
+            )
+
+        rows = enumerate(reader, start=2)
+        while True:
+            try:
+                chunk = list(islice(rows, self.chunk_size))
+            except (UnicodeDecodeError, csv.Error) as exc:
+                self.stop(exc)
+                break
+            if not chunk:
+                break
+            self.import_chunk(chunk)
+
+        return self.report
+
+    def stop(self, exc):
+        """
+        Report the row the file could no longer be read at. When nothing
+        was stored yet the whole file is rejected instead.
+        """
+        if not self.report['rows']:
+            raise ValidationError(unreadable(exc))
+        self.error(self.report['rows'] + 2, {'file': [
+            '%s This row and the ones after it were not imported.'
+            % unreadable(exc)
+        ]})
+
+    def error(self, line, errors):
+        self.report['errors'].append({'row': line, 'errors': errors})
+
+    def clean(self, line, row):
+        """the row's values, or None after reporting what is wrong"""
+        row = {column: (row.get(column) or '').strip() for column in COLUMNS}
+        errors = {}
+
+        for column in REQUIRED_COLUMNS:
+            if not row[column]:
+                errors[column] = ['This field is required.']
+
+        if row['email']:
+            try:
+                validate_email(row['email'])
+            except ValidationError as exc:
+                errors['email'] = exc.messages
+            row['email'] = get_user_model().objects.normalize_email(
+                row['email']
+            )
+
+        for column, known in (('subject', self.subjects),
+                              ('level', self.levels)):
+            if row[column] and row[column] not in known:
+                errors[column] = ['Unknown %s "%s".' % (column, row[column])]
+
+        if errors:
+            self.error(line, errors)
+            return None
+        return row
+
+    def import_chunk(self, chunk):
+        self.report['rows'] += len(chunk)
+        rows = []
+        for line, row in chunk:
+            row = self.clean(line, row)
+            if row is not None:
+                rows.append((line, row))
+
+        with transaction.atomic():
+            users = self.import_users(rows)
+            lessons = self.import_lessons(rows)
+
+            Profile.objects.bulk_create(
+                [Profile(user_id=user, school=self.school)
+                 for user in set(users.values())],
+                ignore_conflicts=True
+            )
+
+            through = Lesson.learners.through
+            pairs = {(lessons[self.lesson_key(row)], users[row['email']])
+                     for line, row in rows if row['email'] in users}
+            existing = set(through.objects.filter(
+                lesson_id__in={lesson for lesson, _ in pairs},
+                user_id__in={user for _, user in pairs},
+            ).values_list('lesson_id', 'user_id'))
+            through.objects.bulk_create(
+                [through(lesson_id=lesson, user_id=user)
+                 for lesson, user in pairs - existing],
+                batch_size=1000, ignore_conflicts=True
+            )
+            self.report['enrolled'] += len(pairs - existing)
+            mark_updated(Lesson, {lesson for lesson, _ in pairs - existing})
+        touch_feeds({user for _, user in pairs - existing})
+
+        # bulk inserts send no post_save or m2m_changed signals
+        touch(Profile, Lesson, through)
+
+    def import_users(self, rows):
+        """ids of the rows' learners by email, creating the new ones"""
+        User = get_user_model()
+        emails = {row['email'] for _, row in rows}
+        users = dict(User.objects.filter(email__in=emails)
+                     .values_list('email', 'id'))
+
+        new = {}
+        lines = defaultdict(list)
+        for line, row in rows:
+            if row['email'] in users:
+                continue
+            lines[row['email']].append(line)
+            new.setdefault(row['email'], dict(
+                {column: row[column] for column in USER_COLUMNS},
+                email=row['email']
+            ))
+
+        created, failures = User.objects.bulk_create_users(
+            new.values(), require_password=False
+        )
+        users.update((user.email, user.id) for user in created)
+        self.report['created_users'] += len(created)
+
+        for failure in failures:
+            for line in lines[failure['email']]:
+                self.error(line, {'email': failure['errors']})
+        return users
+
+    def lesson_key(self, row):
+        return (self.subjects[row['subject']], self.levels[row['level']],
+                row['lesson'])
+
+    def import_lessons(self, rows):
+        """ids of the rows' lessons by key, creating the new ones"""
+        new = []
+        for _, row in rows:
+            key = self.lesson_key(row)
+            if key not in self.lessons:
+                self.lessons[key] = None
+                new.append(key)
+        if not new:
+            return self.lessons
+
+        created = [Lesson(subject_id=subject, level_id=level, name=name,
+                          instructor=self.instructor)
+                   for subject, level, name in new]
+        if connection.features.can_return_rows_from_bulk_insert:
+            Lesson.objects.bulk_create(created)
+        else:
+            for lesson in created:
+                lesson.save()
+
+        for key, lesson in zip(new, created):
+            self.lessons[key] = lesson.pk
+        self.report['created_lessons'] += len(created)
+        return self.lessons
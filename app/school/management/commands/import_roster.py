@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import School
+from school.imports import RosterImporter
+
+
+class Command(BaseCommand):
+    help = 'Import learners, lessons and enrolments of a school from CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('school', type=int, help='id of the school')
+        parser.add_argument('path', help='CSV file, see school.imports')
+        parser.add_argument('--instructor', required=True,
+                            help='email of the instructor of new lessons')
+        parser.add_argument('--chunk-size', type=int,
+                            default=RosterImporter.chunk_size)
+
+    def handle(self, *args, **options):
+        try:
+            school = School.objects.get(pk=options['school'])
+            instructor = get_user_model().objects.get(
+                email=options['instructor']
+            )
+        except (School.DoesNotExist, get_user_model().DoesNotExist) as exc:
+            raise CommandError(exc)
+
+        importer = RosterImporter(school, instructor,
+                                  chunk_size=options['chunk_size'])
+        with open(options['path'], newline='', encoding='utf-8-sig') as f:
+            try:
+                report = importer.run(f)
+            except ValidationError as exc:
+                raise CommandError('; '.join(exc.messages))
+
+        for error in report['errors']:
+            self.stderr.write('row %(row)s: %(errors)s' % error)
+        self.stdout.write(self.style.SUCCESS(
+            '%(rows)d rows: %(created_users)d users and %(created_lessons)d '
+            'lessons created, %(enrolled)d enrolments added' % report
+        ))
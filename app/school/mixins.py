@@ -0,0 +1,141 @@
+import hashlib
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+
+from core.models import Profile
+from core.versions import models_version
+
+
+def in_schools(queryset, user, school_field):
+    """the rows of ``queryset`` in one of ``user``'s schools"""
+    if user.is_superuser:
+        return queryset
+    schools = Profile.objects.filter(user=user).values('school_id')
+    return queryset.filter(**{school_field + '__in': schools})
+
+
+class SchoolScopedMixin:
+    """
+    Limit a view's queryset to rows belonging to the requesting user's
+    schools (their core.models.Profile memberships). Clients can narrow
+    the result further to one of those schools with ``?school=<id>``.
+
+    ``school_field`` is the lookup path from the view's model to School.
+    """
+    school_field = 'school'
+
+    def get_queryset(self):
+        return self.scope(super().get_queryset())
+
+    def scope(self, queryset):
+        queryset = in_schools(queryset, self.request.user, self.school_field)
+
+        school = self.request.query_params.get('school')
+        if school is not None:
+            if not school.isdigit():
+                raise ValidationError({'school': 'A valid id is required.'})
+            queryset = queryset.filter(**{self.school_field: school})
+
+        return queryset
+
+
+class BulkCreateMixin:
+    """
+    Let a create view accept a JSON list as well as a single object. The
+    list is validated as a whole, errors are returned per item in input
+    order, and nothing is stored unless every item is valid.
+    """
+    bulk_create_max = 1000
+
+    def get_serializer(self, *args, **kwargs):
+        data = kwargs.get('data')
+        if isinstance(data, list):
+            if len(data) > self.bulk_create_max:
+                raise ValidationError(
+                    'At most %d items can be created at once.'
+                    % self.bulk_create_max
+                )
+            kwargs['many'] = True
+        return super().get_serializer(*args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """
+    Give GET responses an ETag and Last-Modified derived from the versions
+    of ``version_models`` (see core.versions), and answer a matching
+    If-None-Match / If-Modified-Since with 304 before the queryset is read
+    or anything is serialized. ``check_request`` still runs first, so a
+    304 never stands in for a 400 or 404.
+
+    The tag also covers the request URL, the retrieved object and, when
+    ``vary_on_user`` is set, the user, since scoped lists differ per user.
+    """
+    version_models = ()
+    vary_on_user = True
+
+    def get_version(self):
+        return models_version(*self.version_models)
+
+    def check_request(self):
+        """
+        Raise what the response would for bad query parameters, which
+        get_queryset() checks while building the queryset, or a missing
+        object, which takes one query for its pk. Returns that pk, or
+        None for lists.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        if lookup not in self.kwargs:
+            return None
+        pk = queryset.filter(**{self.lookup_field: self.kwargs[lookup]}) \
+                     .values_list('pk', flat=True).first()
+        if pk is None:
+            raise NotFound()
+        return pk
+
+    def get(self, request, *args, **kwargs):
+        version = self.get_version()
+        pk = self.check_request()
+        user = request.user.pk if self.vary_on_user else None
+        self.version_tag = hashlib.md5(('%s|%s|%s|%s' % (
+            version, user, pk, request.build_absolute_uri()
+        )).encode()).hexdigest()
+        # versions are whole seconds (see core.versions), never round down
+        last_modified = math.ceil(version)
+        headers = {'ETag': quote_etag(self.version_tag),
+                   'Last-Modified': http_date(last_modified)}
+
+        response = get_conditional_response(request, etag=headers['ETag'],
+                                            last_modified=last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+
+class CachedListMixin(ConditionalGetMixin):
+    """
+    Also keep the serialized list in the cache under its version tag, so
+    until one of ``version_models`` changes the list is served without
+    touching the database.
+    """
+    vary_on_user = False
+    cache_timeout = getattr(settings, 'LIST_CACHE_TIMEOUT', 300)
+
+    def list(self, request, *args, **kwargs):
+        key = 'list:%s' % self.version_tag
+        data = cache.get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, self.cache_timeout)
+        return Response(data)
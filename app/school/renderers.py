@@ -0,0 +1,72 @@
+import abc
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BaseRenderer
+
+
+class StreamingRenderer(BaseRenderer, metaclass=abc.ABCMeta):
+    """
+    Renders rows one line at a time. Export views feed ``stream`` with a
+    header and an iterator of value tuples and hand the generator to a
+    StreamingHttpResponse; ``render`` only serves small payloads such as
+    error details.
+    """
+    charset = 'utf-8'
+
+    @abc.abstractmethod
+    def stream(self, header, rows):
+        """bytes for the header, then for each row"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        header = list(rows[0]) if rows else []
+        return b''.join(self.stream(
+            header, ([row.get(name) for name in header] for row in rows)
+        ))
+
+
+class Echo:
+    """a file-like object csv.writer can write one line to at a time"""
+
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(StreamingRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, header, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(header).encode(self.charset)
+        for row in rows:
+            yield writer.writerow([
+                value.isoformat() if hasattr(value, 'isoformat') else value
+                for value in row
+            ]).encode(self.charset)
+
+
+class NDJSONRenderer(StreamingRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def stream(self, header, rows):
+        for row in rows:
+            yield (json.dumps(dict(zip(header, row)), cls=DjangoJSONEncoder)
+                   + '\n').encode(self.charset)
+
+
+class IgnoreAcceptNegotiation(DefaultContentNegotiation):
+    """
+    Always pick the first renderer, for views that send their own
+    response (a file, a calendar) whatever the client accepts. The
+    renderer only formats errors.
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
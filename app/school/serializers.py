@@ -1,14 +1,191 @@
+from collections import defaultdict
+
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.urls import reverse
 
 from core.models import Category, School, Subject, Level, Lesson, Session, \
-                        Attachment, Moderation
+                        Attachment, Moderation, Profile, ScoreSummary, \
+                        SessionSeries, Upload
+from core.blobs import known
+from core.feeds import touch_feeds, touch_lesson_feeds
+from core.sync import mark_updated
+from core.timetable import conflicts
+from core.uploads import received
+from core.versions import touch
+from school.mixins import in_schools
 from user.serializers import UserSerializer
 
 # from core.helpers import removeKey
 
 
+class BatchPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    A primary key field that looks ids up in ``prefetched`` when
+    BulkCreateListSerializer has filled it, instead of one query per id.
+    """
+    prefetched = None
+
+    def to_internal_value(self, data):
+        if self.prefetched is None:
+            return super().to_internal_value(data)
+
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = self.get_queryset().model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in self.prefetched:
+            self.fail('does_not_exist', pk_value=data)
+        return self.prefetched[pk]
+
+
+class BulkCreateListSerializer(serializers.ListSerializer):
+    """
+    Create a validated list of model objects with one bulk_create inside a
+    transaction, so a batch is stored all-or-nothing. ManyToMany values are
+    written to their through tables with one bulk insert per relation.
+
+    Validation takes the same number of queries for any batch size: the
+    child's BatchPrimaryKeyRelatedFields look their ids up with one
+    in_bulk each, and unique values are checked with one ``__in`` query
+    per field.
+    """
+
+    def prefetch(self, data):
+        """
+        Fill the related fields' ``prefetched`` and take the unique
+        validators off the child's fields, returning ``(validator,
+        validators)`` by field, where ``validators`` is the field's own.
+        """
+        unique = {}
+        for field in self.child.fields.values():
+            if field.read_only:
+                continue
+
+            validators = field.validators
+            for validator in validators:
+                if isinstance(validator, UniqueValidator) and \
+                        validator.lookup == 'exact':
+                    unique[field] = (validator, validators)
+                    field.validators = [other for other in validators
+                                        if other is not validator]
+                    break
+
+            relation = getattr(field, 'child_relation', field)
+            if not isinstance(relation, BatchPrimaryKeyRelatedField):
+                continue
+            pk_field = relation.get_queryset().model._meta.pk
+            ids = set()
+            for item in data:
+                values = item.get(field.field_name) \
+                    if isinstance(item, dict) else None
+                if not isinstance(values, list):
+                    values = [values]
+                for pk in values:
+                    try:
+                        ids.add(pk_field.to_python(pk))
+                    except (TypeError, ValueError, DjangoValidationError):
+                        pass
+            ids.discard(None)
+            relation.prefetched = relation.get_queryset().in_bulk(ids)
+
+        return unique
+
+    def restore(self, unique):
+        for field in self.child.fields.values():
+            relation = getattr(field, 'child_relation', field)
+            if isinstance(relation, BatchPrimaryKeyRelatedField):
+                relation.prefetched = None
+        for field, (_, validators) in unique.items():
+            field.validators = validators
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+
+        unique = self.prefetch(data)
+        try:
+            value = super().to_internal_value(data)
+        finally:
+            self.restore(unique)
+
+        errors = [{} for _ in value]
+        for field, (validator, _) in unique.items():
+            name = field.source_attrs[-1]
+            taken = set(validator.queryset.filter(**{
+                name + '__in': {attrs[name] for attrs in value
+                                if name in attrs}
+            }).values_list(name, flat=True))
+            for index, attrs in enumerate(value):
+                if name in attrs and attrs[name] in taken:
+                    errors[index][field.field_name] = [validator.message]
+
+        # the unique validators only look at the database, so catch
+        # duplicates within the batch before they become IntegrityErrors
+        for field in self.child.Meta.model._meta.fields:
+            if not field.unique or field.primary_key:
+                continue
+            seen = set()
+            for index, attrs in enumerate(value):
+                if field.name not in attrs:
+                    continue
+                if attrs[field.name] in seen and \
+                        field.name not in errors[index]:
+                    errors[index][field.name] = [
+                        "Duplicate value within this batch."
+                    ]
+                seen.add(attrs[field.name])
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        return value
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        relations = [field for field in model._meta.many_to_many
+                     if field.name in self.child.fields]
+
+        instances = []
+        related = []
+        for attrs in validated_data:
+            attrs = dict(attrs)
+            related.append({field.name: attrs.pop(field.name, [])
+                            for field in relations})
+            instances.append(model(**attrs))
+
+        with transaction.atomic():
+            if connection.features.can_return_rows_from_bulk_insert:
+                model.objects.bulk_create(instances)
+            else:
+                # pks are needed for the M2M rows and the response
+                for instance in instances:
+                    instance.save()
+
+            for field in relations:
+                through = field.remote_field.through
+                row_column = field.m2m_field_name() + '_id'
+                user_column = field.m2m_reverse_field_name() + '_id'
+                through.objects.bulk_create([
+                    through(**{row_column: instance.pk,
+                               user_column: related_obj.pk})
+                    for instance, values in zip(instances, related)
+                    for related_obj in values[field.name]
+                ])
+
+        # bulk inserts send no post_save signals
+        touch(model, *[field.remote_field.through for field in relations])
+        return instances
+
+
 class CategorySerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -28,8 +205,44 @@ class CategoryPublicSerializer(CategorySerializer):
         read_only_fields = ('id',)
 
 
+class ProvisionUserListSerializer(serializers.ListSerializer):
+    """
+    Validate each user on its own so that one bad entry does not reject
+    the others. Invalid entries are kept in ``failures``.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+
+        self.failures = []
+        valid = []
+        for user_data in data:
+            try:
+                valid.append(self.child.run_validation(user_data))
+            except serializers.ValidationError as exc:
+                email = None
+                if isinstance(user_data, dict):
+                    email = user_data.get('email')
+                self.failures.append({'email': email, 'errors': exc.detail})
+
+        if data and not valid:
+            raise serializers.ValidationError(self.failures)
+
+        return valid
+
+
+class ProvisionUserSerializer(UserSerializer):
+
+    class Meta(UserSerializer.Meta):
+        # taken emails are checked for the whole list in one query
+        extra_kwargs = {'password': {'write_only': True},
+                        'email': {'validators': []}}
+        list_serializer_class = ProvisionUserListSerializer
+
+
 class SchoolSerializer(serializers.ModelSerializer):
-    users = UserSerializer(many=True)
+    users = ProvisionUserSerializer(many=True)
 
     class Meta:
         model = School
@@ -38,34 +251,37 @@ class SchoolSerializer(serializers.ModelSerializer):
         ordering = ('basename',)
         extra_kwargs = {'users': {'write_only': True}}
 
-
     def create(self, validated_data):
-  
-        """on create, there can only ever be one user"""
+        """
+        Users are created in bulk. The school is still created when some
+        of them fail, and those are listed under ``failed_users``, but not
+        when all of them do.
+        """
         users_data = validated_data.pop("users")
         if users_data is None or len(users_data) < 1:
             raise ValueError("School user is required")
 
-        school = School.objects.create(**validated_data)
-        users = []
-
-        for user_data in users_data:
-
-            # user_data = users_data[0]
-            email = user_data.pop("email")
-            password = user_data.pop("password")
-            user = get_user_model().objects.create_user(
-                email=email,
-                password=password,
-                **user_data
-            )
-
-            users.append(user)
-        
-        school.users.add(*users)
-
+        with transaction.atomic():
+            users, failures = \
+                get_user_model().objects.bulk_create_users(users_data)
+            failures = self.fields['users'].failures + failures
+            if not users:
+                raise serializers.ValidationError({'users': failures})
+            school = School.objects.create(**validated_data)
+            Profile.objects.bulk_create([
+                Profile(user=user, school=school) for user in users
+            ])
+        touch(Profile)
+
+        school.failed_users = failures
         return school
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        failures = getattr(instance, 'failed_users', None)
+        if failures:
+            data['failed_users'] = failures
+        return data
 
     def update(self, instance, validated_data):
 
@@ -82,52 +298,201 @@ class SchoolPublicSerializer(SchoolSerializer):
 
 
 class SubjectSerializer(serializers.ModelSerializer):
+    serializer_related_field = BatchPrimaryKeyRelatedField
 
     class Meta:
         model = Subject
         fields = ('id', 'basename', 'name', 'school')
         read_only_fields = ('id',)
+        list_serializer_class = BulkCreateListSerializer
 
 
 class LevelSerializer(serializers.ModelSerializer):
+    serializer_related_field = BatchPrimaryKeyRelatedField
+
     class Meta:
         model = Level
         fields = ('id', 'basename', 'name', 'school')
         read_only_fields = ('id',)
+        list_serializer_class = BulkCreateListSerializer
 
 
 class LessonSerializer(serializers.ModelSerializer):
+    serializer_related_field = BatchPrimaryKeyRelatedField
+
     class Meta:
         model = Lesson
         fields = ('id', 'subject', 'level', 'learners', 'name')
         read_only_fields = ('id',)
         extra_kwargs = {'instructor': {'write_only': True}}
+        list_serializer_class = BulkCreateListSerializer
+
+
+def clash_error(keys):
+    return "Clashes with %s of the same instructor or learners." % \
+        ', '.join(str(key) if isinstance(key, str) else 'session %d' % key
+                  for key in sorted(keys, key=str))
 
-    def create(self, validated_data):
-        user_id = None
-        request = self.context.get('request')
-        if request and hasattr(request, 'user') and request.user and hasattr(request.user, 'id'):
-            validated_data['instructor'] = request.user
 
-        return super().create(validated_data)
+class SessionListSerializer(BulkCreateListSerializer):
+    """check the whole batch for timetable clashes at once"""
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+
+        found = conflicts(
+            ('item %d' % index, attrs['start_time'], attrs['end_time'],
+             attrs['lesson'].pk)
+            for index, attrs in enumerate(value)
+        )
+        if found:
+            raise serializers.ValidationError([
+                {'non_field_errors': [clash_error(found['item %d' % index])]}
+                if 'item %d' % index in found else {}
+                for index in range(len(value))
+            ])
+
+        return value
+
+    def create(self, validated_data):
+        instances = super().create(validated_data)
+        # bulk inserts send no post_save signals
+        touch_lesson_feeds({instance.lesson_id for instance in instances})
+        return instances
 
 
 class SessionSerializer(serializers.ModelSerializer):
+    serializer_related_field = BatchPrimaryKeyRelatedField
+
     class Meta:
         model = Session
         fields = ('id', 'start_time', 'end_time', 'type', 'attendance',
-                  'lesson'
+                  'lesson', 'series', 'occurrence'
                   )
+        read_only_fields = ('id', 'series', 'occurrence')
+        list_serializer_class = SessionListSerializer
+
+    def validate(self, attrs):
+        if self.parent is not None:
+            # SessionListSerializer checks the batch
+            return attrs
+
+        values = {name: attrs.get(name, getattr(self.instance, name, None))
+                  for name in ('start_time', 'end_time', 'lesson')}
+        if self.instance is not None and all(
+            values[name] == getattr(self.instance, name) for name in values
+        ):
+            # edits that do not move the session keep clashes it had
+            return attrs
+        key = self.instance.pk if self.instance else 'new'
+        found = conflicts([(key, values['start_time'], values['end_time'],
+                            values['lesson'].pk)])
+        if found:
+            raise serializers.ValidationError(clash_error(found[key]))
+        return attrs
+
+
+class SessionSeriesSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SessionSeries
+        fields = ('id', 'lesson', 'type', 'start_time', 'end_time',
+                  'frequency', 'interval', 'until', 'count')
         read_only_fields = ('id',)
 
+    def validate(self, attrs):
+        values = {name: attrs.get(name, getattr(self.instance, name, None))
+                  for name in ('start_time', 'end_time', 'interval')}
+        if values['end_time'] < values['start_time']:
+            raise serializers.ValidationError(
+                {'end_time': 'A session cannot end before it starts.'}
+            )
+        if values['interval'] is not None and values['interval'] < 1:
+            raise serializers.ValidationError(
+                {'interval': 'Ensure this value is at least 1.'}
+            )
+        return attrs
+
+
+class OccurrenceSerializer(serializers.Serializer):
+    occurrence = serializers.DateTimeField()
+
+    def validate_occurrence(self, value):
+        if self.context['series'].index_of(value) is None:
+            raise serializers.ValidationError(
+                'The series has no occurrence starting then.'
+            )
+        return value
+
 
 class AttachmentSerializer(serializers.ModelSerializer):
+    """
+    ``download`` is where the file can be fetched; ``file`` is its media
+    URL, which the proxy only serves through the download view.
+
+    ``thumbnail`` and ``excerpt`` preview the file once ``preview_status``
+    is ready (see core.previews), so a list can be shown without
+    downloading the files.
+    """
     file = serializers.FileField(max_length=None, allow_empty_file=False)
+    download = serializers.SerializerMethodField()
+    thumbnail = serializers.SerializerMethodField()
 
     class Meta:
         model = Attachment
-        fields = ('id', 'session', 'notes', 'file')
-        read_only_fields = ('id',)
+        fields = ('id', 'session', 'notes', 'file', 'download', 'thumbnail',
+                  'excerpt', 'preview_status')
+        read_only_fields = ('id', 'excerpt', 'preview_status')
+
+    def url(self, name, attachment):
+        url = reverse(name, args=[attachment.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def get_download(self, attachment):
+        return self.url('school:attachment-download', attachment)
+
+    def get_thumbnail(self, attachment):
+        if not attachment.thumbnail:
+            return None
+        return self.url('school:attachment-thumbnail', attachment)
+
+
+class UploadSerializer(serializers.ModelSerializer):
+    """
+    ``known`` is true when a file with ``digest`` is attached somewhere
+    ``context['attachments']`` covers, so the upload can be completed
+    without sending any parts.
+    """
+    digest = serializers.RegexField(r'^[0-9a-fA-F]{64}$', required=False,
+                                    allow_blank=True)
+    parts = serializers.IntegerField(read_only=True)
+    received = serializers.SerializerMethodField()
+    known = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Upload
+        fields = ('id', 'session', 'notes', 'filename', 'size', 'digest',
+                  'chunk_size', 'parts', 'received', 'known')
+        read_only_fields = ('id', 'chunk_size')
+
+    def validate_digest(self, value):
+        return value.lower()
+
+    def validate_size(self, value):
+        if not 0 < value <= settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                'Ensure this value is between 1 and %d.'
+                % settings.UPLOAD_MAX_SIZE
+            )
+        return value
+
+    def get_received(self, upload):
+        return received(upload)
+
+    def get_known(self, upload):
+        attachments = self.context.get('attachments')
+        return bool(upload.digest and attachments is not None
+                    and known(upload.digest, attachments))
 
 
 class ModerationSerializer(serializers.ModelSerializer):
@@ -137,3 +502,143 @@ class ModerationSerializer(serializers.ModelSerializer):
                   'score_type'
                   )
         read_only_fields = ('id',)
+
+
+class ScoreSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ScoreSummary
+        fields = ('id', 'learner', 'subject', 'count', 'score_total',
+                  'max_total', 'average')
+        read_only_fields = fields
+
+
+class BulkRelationSerializer(serializers.Serializer):
+    """
+    Add and remove many (row, learner) pairs of a user ManyToMany relation
+    in one request, e.g. ``{"add": [{"session": 1, "learner": 2}],
+    "remove": [...]}``. The through table is changed with one bulk insert
+    and one delete, whatever the number of pairs.
+
+    Subclasses set ``model``, ``relation`` and ``key``, the name of the
+    row id in each pair. Rows outside the requesting user's schools are
+    rejected like unknown ones; ``school_field`` is the lookup path from
+    ``model`` to School.
+    """
+    add = serializers.ListField(child=serializers.DictField(), default=list)
+    remove = serializers.ListField(child=serializers.DictField(),
+                                   default=list)
+
+    model = None
+    relation = None
+    key = None
+    school_field = None
+    user_key = 'learner'
+
+    def to_pairs(self, items):
+        pairs = set()
+        for item in items:
+            try:
+                pairs.add((int(item[self.key]), int(item[self.user_key])))
+            except (KeyError, TypeError, ValueError):
+                raise serializers.ValidationError(
+                    "Each item needs integer '%s' and '%s' ids."
+                    % (self.key, self.user_key)
+                )
+        return pairs
+
+    def validate_add(self, value):
+        return self.to_pairs(value)
+
+    def validate_remove(self, value):
+        return self.to_pairs(value)
+
+    def validate(self, data):
+        if data['add'] & data['remove']:
+            raise serializers.ValidationError(
+                "A pair cannot be both added and removed."
+            )
+
+        rows = self.model.objects.all()
+        if self.school_field is not None:
+            rows = in_schools(rows, self.context['request'].user,
+                              self.school_field)
+
+        pairs = data['add'] | data['remove']
+        for queryset, ids, name in (
+            (rows, {row for row, _ in pairs}, self.key),
+            (get_user_model().objects.all(), {user for _, user in pairs},
+             self.user_key),
+        ):
+            found = set(queryset.filter(pk__in=ids)
+                        .values_list('pk', flat=True))
+            missing = sorted(ids - found)
+            if missing:
+                raise serializers.ValidationError(
+                    {name: "Invalid ids %s." % missing}
+                )
+
+        return data
+
+    def pairs_filter(self, pairs, row_column, user_column):
+        by_row = defaultdict(list)
+        for row, user in pairs:
+            by_row[row].append(user)
+
+        query = Q()
+        for row, users in by_row.items():
+            query |= Q(**{row_column: row, user_column + '__in': users})
+        return query
+
+    def save(self):
+        field = self.model._meta.get_field(self.relation)
+        through = field.remote_field.through
+        row_column = field.m2m_field_name() + '_id'
+        user_column = field.m2m_reverse_field_name() + '_id'
+
+        add = self.validated_data['add']
+        remove = self.validated_data['remove']
+        added = removed = 0
+
+        with transaction.atomic():
+            if remove:
+                removed, _ = through.objects.filter(
+                    self.pairs_filter(remove, row_column, user_column)
+                ).delete()
+
+            if add:
+                existing = set(through.objects.filter(
+                    self.pairs_filter(add, row_column, user_column)
+                ).values_list(row_column, user_column))
+                rows = [
+                    through(**{row_column: row, user_column: user})
+                    for row, user in add - existing
+                ]
+                through.objects.bulk_create(
+                    rows, batch_size=1000, ignore_conflicts=True
+                )
+                added = len(rows)
+
+            mark_updated(self.model, {row for row, _ in add | remove})
+
+        touch(through)
+        return {'added': added, 'removed': removed}
+
+
+class AttendanceBulkSerializer(BulkRelationSerializer):
+    model = Session
+    relation = 'attendance'
+    key = 'session'
+    school_field = 'lesson__subject__school'
+
+
+class EnrolmentBulkSerializer(BulkRelationSerializer):
+    model = Lesson
+    relation = 'learners'
+    key = 'lesson'
+    school_field = 'subject__school'
+
+    def save(self):
+        result = super().save()
+        pairs = self.validated_data['add'] | self.validated_data['remove']
+        touch_feeds({user for _, user in pairs})
+        return result
@@ -0,0 +1,145 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import School, Subject, Level, Lesson, Session, Moderation
+
+
+reg_url = '/api/v1/accounts/auth/registration/'
+analytics_url = reverse('school:moderation-analytics')
+
+
+class TestModerationAnalyticsApi(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password": "Qwerty!@#",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01"
+        }
+
+        auth_user = self.client.post(reg_url, payload, format='json')
+
+        access_token = auth_user.data.get('access_token')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.user = get_user_model().objects.get(email=payload['email'])
+
+        sch = School.objects.create(basename="gruut-high", name="Gruut High")
+        sch.users.add(self.user)
+        sub = Subject.objects.create(basename="spanish-fal",
+                                     name="Spanish FAL", school=sch)
+        self.levels = [
+            Level.objects.create(basename="grade-%d" % grade,
+                                 name="Grade %d" % grade, school=sch)
+            for grade in (9, 10)
+        ]
+        self.lessons = [
+            Lesson.objects.create(subject=sub, level=level,
+                                  instructor=self.user, name="Python 101")
+            for level in self.levels
+        ]
+        self.learners = [
+            get_user_model().objects.create(
+                username="learner%d" % i,
+                email="learner%d@bondeveloper.coom" % i,
+                password="Qwerty!@#",
+            )
+            for i in range(3)
+        ]
+
+        sessions = [Session.objects.create(start_time=timezone.now(),
+                                           end_time=timezone.now(),
+                                           type="TCN", lesson=lesson)
+                    for lesson in self.lessons]
+
+        # as percentages: 50, 80 and 80 in the first lesson, 20 in the
+        # second, and one score out of 0 that cannot be compared
+        for learner, score, max_score, score_type, ses in (
+            (self.learners[0], 5, 10, 'unit', sessions[0]),
+            (self.learners[1], 80, 100, 'percentage', sessions[0]),
+            (self.learners[2], 40, 50, 'unit', sessions[0]),
+            (self.learners[0], 2, 10, 'unit', sessions[1]),
+            (self.learners[1], 3, 0, 'unit', sessions[1]),
+        ):
+            Moderation.objects.create(session=ses, learner=learner,
+                                      learner_score=score,
+                                      max_score=max_score,
+                                      score_type=score_type)
+
+    def test_authentication_required(self):
+        self.client = APIClient()
+        res = self.client.get(analytics_url)
+
+        self.assertEquals(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_school_statistics(self):
+        res = self.client.get(analytics_url)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data['count'], 4)
+        self.assertEquals(res.data['mean'], 57.5)
+        self.assertEquals(res.data['min'], 20)
+        self.assertEquals(res.data['max'], 80)
+        self.assertEquals(res.data['median'], 65)
+        self.assertEquals(res.data['percentiles']['25'], 42.5)
+
+        counts = {row['from']: row['count']
+                  for row in res.data['distribution']}
+        self.assertEquals(counts[20], 1)
+        self.assertEquals(counts[50], 1)
+        self.assertEquals(counts[80], 2)
+        self.assertEquals(sum(counts.values()), 4)
+
+    def test_learner_ranking_shares_ties(self):
+        res = self.client.get(analytics_url, {'lesson': self.lessons[0].id})
+
+        self.assertEquals(
+            [(row['learner'], row['mean'], row['rank'])
+             for row in res.data['learners']],
+            [(self.learners[1].id, 80, 1), (self.learners[2].id, 80, 1),
+             (self.learners[0].id, 50, 3)]
+        )
+
+    def test_learner_ranking_cut_to_top(self):
+        res = self.client.get(analytics_url, {'lesson': self.lessons[0].id,
+                                              'top': 2})
+
+        self.assertEquals(res.data['learner_count'], 3)
+        self.assertEquals(
+            [(row['learner'], row['rank']) for row in res.data['learners']],
+            [(self.learners[1].id, 1), (self.learners[2].id, 1)]
+        )
+
+    def test_invalid_top_rejected(self):
+        for top in ('all', '0', '100000'):
+            res = self.client.get(analytics_url, {'top': top})
+
+            self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('top', res.data)
+
+    def test_filter_by_level(self):
+        res = self.client.get(analytics_url, {'level': self.levels[1].id})
+
+        self.assertEquals(res.data['count'], 1)
+        self.assertEquals(res.data['mean'], 20)
+
+    def test_other_schools_excluded(self):
+        School.objects.get().users.remove(self.user)
+
+        res = self.client.get(analytics_url)
+
+        self.assertEquals(res.data['count'], 0)
+        self.assertEquals(res.data['median'], None)
+        self.assertEquals(res.data['learners'], [])
+
+    def test_invalid_filter_rejected(self):
+        res = self.client.get(analytics_url, {'lesson': 'all'})
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -271,10 +271,15 @@ class TestPrivateAttachmentApi(TestCase):
             notes="Test note 2"
         )
 
+        auth_user = get_user_model().objects.get(
+            email="testuser@bondeveloper.com"
+        )
+        sch.users.add(auth_user)
+
         res = self.client.get(reverse('school:attachment-list'))
 
         self.assertEquals(res.status_code, status.HTTP_200_OK)
-        self.assertEquals(len(res.data), 2)
+        self.assertEquals(len(res.data['results']), 2)
 
     def test_attachment_delete_api(self):
         learner = get_user_model().objects.create(
@@ -0,0 +1,137 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import School, Subject, Level, Lesson, Session
+
+
+reg_url = '/api/v1/accounts/auth/registration/'
+attendance_url = reverse('school:session-attendance')
+
+
+class TestBulkAttendanceApi(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password": "Qwerty!@#",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01"
+        }
+
+        auth_user = self.client.post(reg_url, payload, format='json')
+
+        access_token = auth_user.data.get('access_token')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+
+        instructor = get_user_model().objects.get(email=payload['email'])
+        self.sch = sch = School.objects.create(basename="gruut-high",
+                                               name="Gruut High")
+        sch.users.add(instructor)
+        sub = Subject.objects.create(basename="spanish-fal",
+                                     name="Spanish FAL", school=sch)
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=sch)
+        les = Lesson.objects.create(subject=sub, level=level,
+                                    instructor=instructor, name="Python 101")
+
+        self.sessions = [
+            Session.objects.create(start_time=timezone.now(),
+                                   end_time=timezone.now(),
+                                   type="TCN", lesson=les)
+            for _ in range(6)
+        ]
+        self.learners = [
+            get_user_model().objects.create(
+                username="learner%d" % i,
+                email="learner%d@bondeveloper.coom" % i,
+                password="Qwerty!@#",
+            )
+            for i in range(40)
+        ]
+
+    def pairs(self, sessions, learners):
+        return [{"session": ses.id, "learner": learner.id}
+                for ses in sessions for learner in learners]
+
+    def test_authentication_required(self):
+        self.client = APIClient()
+        res = self.client.post(attendance_url, {}, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_mark_attendance_in_constant_queries(self):
+        # fill the authentication cache before counting
+        self.client.post(attendance_url, {}, format='json')
+
+        payload = {"add": self.pairs(self.sessions[:1], self.learners[:1])}
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(attendance_url, payload, format='json')
+
+        payload = {"add": self.pairs(self.sessions, self.learners)}
+        with CaptureQueriesContext(connection) as large:
+            res = self.client.post(attendance_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data, {'added': 239, 'removed': 0})
+        self.assertEquals(len(large.captured_queries),
+                          len(small.captured_queries))
+        for ses in self.sessions:
+            self.assertEquals(ses.attendance.count(), 40)
+
+    def test_add_and_remove_together(self):
+        self.sessions[0].attendance.add(*self.learners[:2])
+
+        payload = {
+            "add": self.pairs(self.sessions[:1], self.learners[2:3]),
+            "remove": self.pairs(self.sessions[:1], self.learners[:1]),
+        }
+        res = self.client.post(attendance_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data, {'added': 1, 'removed': 1})
+        self.assertEquals(
+            set(self.sessions[0].attendance.values_list('id', flat=True)),
+            {self.learners[1].id, self.learners[2].id}
+        )
+
+    def test_unknown_ids_rejected(self):
+        payload = {"add": [{"session": 0, "learner": self.learners[0].id}]}
+        res = self.client.post(attendance_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('session', res.data)
+        self.assertEquals(self.sessions[0].attendance.count(), 0)
+
+    def test_other_schools_sessions_rejected(self):
+        self.sch.users.clear()
+
+        payload = {"add": self.pairs(self.sessions[:1], self.learners[:1])}
+        res = self.client.post(attendance_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('session', res.data)
+        self.assertEquals(self.sessions[0].attendance.count(), 0)
+
+    def test_malformed_pair_rejected(self):
+        payload = {"add": [{"session": self.sessions[0].id}]}
+        res = self.client.post(attendance_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('add', res.data)
+
+    def test_conflicting_pair_rejected(self):
+        pairs = self.pairs(self.sessions[:1], self.learners[:1])
+        res = self.client.post(attendance_url,
+                               {"add": pairs, "remove": pairs},
+                               format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,212 @@
+from unittest import skipUnless
+
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import School, Subject, Level, Lesson, Session
+from school.views import SubjectCreateAPIView
+
+
+reg_url = '/api/v1/accounts/auth/registration/'
+subject_create_url = reverse('school:subject-create')
+
+
+class TestBulkCreateApi(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password": "Qwerty!@#",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01"
+        }
+
+        auth_user = self.client.post(reg_url, payload, format='json')
+
+        access_token = auth_user.data.get('access_token')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.user = get_user_model().objects.get(email=payload['email'])
+
+        self.school = School.objects.create(basename="gruut-high",
+                                            name="Gruut High")
+
+    def subjects(self, count):
+        return [{"basename": "subject-%d" % i, "name": "Subject %d" % i,
+                 "school": self.school.id}
+                for i in range(count)]
+
+    def test_single_object_still_accepted(self):
+        res = self.client.post(subject_create_url, self.subjects(1)[0],
+                               format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        self.assertEquals(res.data.get('basename'), 'subject-0')
+
+    def test_create_subject_batch(self):
+        res = self.client.post(subject_create_url, self.subjects(5),
+                               format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        self.assertEquals(len(res.data), 5)
+        self.assertTrue(all(item['id'] for item in res.data))
+        self.assertEquals(Subject.objects.count(), 5)
+
+    def test_invalid_item_rejects_whole_batch(self):
+        payload = self.subjects(3)
+        del payload[1]['name']
+
+        res = self.client.post(subject_create_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEquals(res.data[0], {})
+        self.assertIn('name', res.data[1])
+        self.assertEquals(res.data[2], {})
+        self.assertEquals(Subject.objects.count(), 0)
+
+    def test_duplicate_within_batch_reported(self):
+        payload = self.subjects(2)
+        payload[1]['basename'] = payload[0]['basename']
+
+        res = self.client.post(subject_create_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEquals(res.data[0], {})
+        self.assertIn('basename', res.data[1])
+        self.assertEquals(Subject.objects.count(), 0)
+
+    def test_batch_size_limited(self):
+        payload = self.subjects(SubjectCreateAPIView.bulk_create_max + 1)
+
+        res = self.client.post(subject_create_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_level_batch(self):
+        payload = [{"basename": "grade-%d" % i, "name": "Grade %d" % i,
+                    "school": self.school.id} for i in range(3)]
+
+        res = self.client.post(reverse('school:level-create'), payload,
+                               format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        self.assertEquals(Level.objects.count(), 3)
+
+    def test_create_lesson_and_session_batches(self):
+        sub = Subject.objects.create(basename="spanish-fal",
+                                     name="Spanish FAL", school=self.school)
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=self.school)
+        learner = get_user_model().objects.create(
+            username="learner01",
+            email="learner@bondeveloper.coom",
+            password="Qwerty!@#",
+        )
+
+        payload = [{"subject": sub.id, "level": level.id, "name": name,
+                    "learners": [learner.id]}
+                   for name in ("Python 101", "Python 102")]
+        res = self.client.post(reverse('school:lesson-create'), payload,
+                               format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        self.assertEquals(Lesson.objects.filter(instructor=self.user,
+                                                learners=learner).count(), 2)
+
+        payload = [{"start_time": timezone.now(), "end_time": timezone.now(),
+                    "type": "LCT", "lesson": item['id'],
+                    "attendance": [learner.id]}
+                   for item in res.data]
+        res = self.client.post(reverse('school:session-create'), payload,
+                               format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        self.assertEquals([item['attendance'] for item in res.data],
+                          [[learner.id], [learner.id]])
+        self.assertEquals(Session.objects.filter(attendance=learner).count(),
+                          2)
+
+    @skipUnless(connection.features.can_return_rows_from_bulk_insert,
+                'backend cannot bulk insert and return ids')
+    def test_batch_is_one_insert(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(subject_create_url, self.subjects(100),
+                             format='json')
+
+        inserts = [q for q in ctx.captured_queries
+                   if q['sql'].startswith('INSERT INTO "core_subject"')]
+        self.assertEquals(len(inserts), 1)
+
+    def test_validation_queries_independent_of_batch_size(self):
+        sub = Subject.objects.create(basename="spanish-fal",
+                                     name="Spanish FAL", school=self.school)
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=self.school)
+        learners = [get_user_model().objects.create(
+            username="learner%d" % i,
+            email="learner%d@bondeveloper.coom" % i,
+            password="Qwerty!@#",
+        ) for i in range(3)]
+        # fill the authentication cache before counting
+        self.client.post(subject_create_url, [], format='json')
+
+        def queries(url, payload):
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.post(url, payload, format='json')
+            self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+            if connection.features.can_return_rows_from_bulk_insert:
+                return len(ctx)
+            # the rows are saved one at a time, so count the validation
+            writes = [index for index, query
+                      in enumerate(ctx.captured_queries)
+                      if query['sql'].startswith(('SAVEPOINT', 'INSERT'))]
+            return writes[0]
+
+        self.assertEquals(
+            queries(subject_create_url, self.subjects(1)),
+            queries(subject_create_url, [
+                {"basename": "other-%d" % i, "name": "Other %d" % i,
+                 "school": self.school.id} for i in range(100)
+            ])
+        )
+
+        def lessons(count):
+            return [{"subject": sub.id, "level": level.id,
+                     "name": "Lesson %d" % i,
+                     "learners": [learner.id for learner in learners]}
+                    for i in range(count)]
+
+        self.assertEquals(queries(reverse('school:lesson-create'),
+                                  lessons(1)),
+                          queries(reverse('school:lesson-create'),
+                                  lessons(100)))
+
+    def test_taken_value_reported(self):
+        Subject.objects.create(basename="subject-1", name="Subject 1",
+                               school=self.school)
+
+        res = self.client.post(subject_create_url, self.subjects(3),
+                               format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEquals(res.data[0], {})
+        self.assertIn('basename', res.data[1])
+        self.assertEquals(res.data[2], {})
+
+    def test_unknown_related_id_reported(self):
+        payload = self.subjects(2)
+        payload[1]['school'] = 0
+
+        res = self.client.post(subject_create_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEquals(res.data[0], {})
+        self.assertIn('school', res.data[1])
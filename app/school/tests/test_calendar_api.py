@@ -0,0 +1,137 @@
+from datetime import datetime
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import School, Subject, Level, Lesson, Session, \
+                        SessionSeries
+
+
+reg_url = '/api/v1/accounts/auth/registration/'
+calendar_url = reverse('school:session-calendar')
+
+
+def day(number, hour=9):
+    return timezone.make_aware(datetime(2021, 1, number, hour))
+
+
+class TestSessionCalendarApi(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password": "Qwerty!@#",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01"
+        }
+
+        auth_user = self.client.post(reg_url, payload, format='json')
+
+        access_token = auth_user.data.get('access_token')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.user = get_user_model().objects.get(email=payload['email'])
+
+        self.school = School.objects.create(basename="gruut-high",
+                                            name="Gruut High")
+        self.school.users.add(self.user)
+        sub = Subject.objects.create(basename="spanish-fal",
+                                     name="Spanish FAL", school=self.school)
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=self.school)
+        self.lesson = Lesson.objects.create(subject=sub, level=level,
+                                            instructor=self.user,
+                                            name="Python 101")
+
+    def create_series(self, **payload):
+        payload = dict({"lesson": self.lesson.id, "type": "LCT",
+                        "start_time": day(4), "end_time": day(4, 10)},
+                       **payload)
+        return self.client.post(reverse('school:series-create'), payload,
+                                format='json')
+
+    def calendar(self, first, last):
+        return self.client.get(calendar_url, {'from': first, 'to': last})
+
+    def test_series_expanded_without_storing_sessions(self):
+        res = self.create_series(count=52)
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.calendar('2021-01-01', '2021-01-31')
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(len(res.data['results']), 4)
+        first = res.data['results'][0]
+        self.assertEquals(first['id'], None)
+        self.assertEquals(first['series'], SessionSeries.objects.get().id)
+        self.assertEquals(first['type'], 'LCT')
+        self.assertEquals(Session.objects.count(), 0)
+
+    def test_materialized_occurrence_replaces_expansion(self):
+        series_id = self.create_series().data['id']
+
+        res = self.client.post(
+            reverse('school:series-materialize', args=[series_id]),
+            {'occurrence': day(11)}, format='json'
+        )
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        session_id = res.data['id']
+        self.client.post(reverse('school:session-attendance'), {
+            "add": [{"session": session_id, "learner": self.user.id}]
+        }, format='json')
+
+        res = self.calendar('2021-01-10', '2021-01-19')
+
+        self.assertEquals([item['id'] for item in res.data['results']],
+                          [session_id, None])
+        self.assertEquals(res.data['results'][0]['attendance'],
+                          [self.user.id])
+
+    def test_unknown_occurrence_rejected(self):
+        series_id = self.create_series().data['id']
+
+        res = self.client.post(
+            reverse('school:series-materialize', args=[series_id]),
+            {'occurrence': day(12)}, format='json'
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEquals(Session.objects.count(), 0)
+
+    def test_stored_sessions_and_ended_series(self):
+        self.create_series(until=day(11))
+        stored = Session.objects.create(start_time=day(20, 12),
+                                        end_time=day(20, 13), type="TCN",
+                                        lesson=self.lesson)
+
+        res = self.calendar('2021-01-12', '2021-01-31')
+
+        self.assertEquals([item['id'] for item in res.data['results']],
+                          [stored.id])
+
+    def test_other_schools_excluded(self):
+        self.create_series()
+        self.school.users.remove(self.user)
+
+        res = self.calendar('2021-01-01', '2021-01-31')
+
+        self.assertEquals(res.data['results'], [])
+
+    def test_window_required_and_bounded(self):
+        res = self.client.get(calendar_url, {'from': '2021-01-01'})
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.calendar('2021-01-01', '2022-06-01')
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_series_must_not_end_before_start(self):
+        res = self.create_series(end_time=day(4, 8))
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('end_time', res.data)
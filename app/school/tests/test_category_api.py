@@ -148,7 +148,7 @@ class PrivateCategoryTestApi(TestCase):
         res = self.client.get(category_list_url)
 
         self.assertEquals(res.status_code, status.HTTP_200_OK)
-        self.assertTrue(len(res.data), 3)
+        self.assertTrue(len(res.data['results']), 3)
 
     def test_remove_category(self):
         saved = sample_category()
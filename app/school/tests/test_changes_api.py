@@ -0,0 +1,233 @@
+import io
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from school.views import SchoolChangesAPIView
+from core.models import School, Subject, Level, Lesson, Session, Moderation, \
+                        Tombstone
+
+
+reg_url = '/api/v1/accounts/auth/registration/'
+
+
+class TestSchoolChangesApi(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password": "Qwerty!@#",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01"
+        }
+
+        auth_user = self.client.post(reg_url, payload, format='json')
+
+        access_token = auth_user.data.get('access_token')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.user = get_user_model().objects.get(email=payload['email'])
+
+        self.school = School.objects.create(basename="gruut-high",
+                                            name="Gruut High")
+        self.school.users.add(self.user)
+        self.subject = Subject.objects.create(basename="spanish-fal",
+                                              name="Spanish FAL",
+                                              school=self.school)
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=self.school)
+        self.lesson = Lesson.objects.create(subject=self.subject, level=level,
+                                            instructor=self.user,
+                                            name="Python 101")
+        self.session = Session.objects.create(start_time=timezone.now(),
+                                              end_time=timezone.now(),
+                                              type="TCN", lesson=self.lesson)
+        self.url = reverse('school:changes', args=[self.school.id])
+
+    def since(self, moment):
+        return self.client.get(self.url, {'since': moment.isoformat()})
+
+    def test_full_sync_without_since(self):
+        other = School.objects.create(basename="other-high",
+                                      name="Other High")
+        Subject.objects.create(basename="isizulu-hl", name="IsiZulu HL",
+                               school=other)
+
+        res = self.client.get(self.url)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        changed = res.data['changed']
+        self.assertEquals([row['id'] for row in changed['subjects']],
+                          [self.subject.id])
+        self.assertEquals(len(changed['sessions']), 1)
+        self.assertEquals(res.data['deleted']['sessions'], [])
+        self.assertIn('watermark', res.data)
+
+    def test_only_rows_changed_after_watermark(self):
+        mark = timezone.now()
+        self.lesson.name = "Python 102"
+        self.lesson.save()
+
+        res = self.since(mark)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        changed = res.data['changed']
+        self.assertEquals([row['name'] for row in changed['lessons']],
+                          ["Python 102"])
+        self.assertEquals(changed['subjects'], [])
+        self.assertEquals(changed['sessions'], [])
+
+    def test_relation_change_marks_row_updated(self):
+        mark = timezone.now()
+        self.lesson.learners.add(self.user)
+        self.client.post(reverse('school:session-attendance'), {
+            "add": [{"session": self.session.id, "learner": self.user.id}]
+        }, format='json')
+
+        res = self.since(mark)
+
+        self.assertEquals(res.data['changed']['lessons'][0]['learners'],
+                          [self.user.id])
+        self.assertEquals(res.data['changed']['sessions'][0]['attendance'],
+                          [self.user.id])
+
+    def test_deleted_rows_reported(self):
+        Moderation.objects.create(session=self.session, learner=self.user,
+                                  learner_score=5, max_score=10,
+                                  score_type="unit")
+        mark = timezone.now()
+
+        self.client.delete(reverse('school:lesson-delete',
+                                   args=[self.lesson.id]))
+
+        res = self.since(mark)
+
+        self.assertEquals(res.data['deleted']['lessons'], [self.lesson.id])
+        self.assertEquals(res.data['deleted']['sessions'], [self.session.id])
+        self.assertEquals(len(res.data['deleted']['moderations']), 1)
+        self.assertEquals(
+            set(Tombstone.objects.values_list('school_id', flat=True)),
+            {self.school.id}
+        )
+
+        res = self.since(timezone.now() + timedelta(seconds=1))
+        self.assertEquals(res.data['deleted']['lessons'], [])
+
+    def test_cascade_buries_rows_together(self):
+        def tombstone_queries(count):
+            lesson = Lesson.objects.create(subject=self.subject,
+                                           level=self.lesson.level,
+                                           instructor=self.user,
+                                           name="Python 102")
+            for _ in range(count):
+                session = Session.objects.create(start_time=timezone.now(),
+                                                 end_time=timezone.now(),
+                                                 type="TCN", lesson=lesson)
+                Moderation.objects.create(session=session,
+                                          learner=self.user,
+                                          learner_score=5, max_score=10,
+                                          score_type="unit")
+            with CaptureQueriesContext(connection) as queries:
+                lesson.delete()
+            return sum('core_tombstone' in query['sql']
+                       for query in queries.captured_queries)
+
+        self.assertEquals(tombstone_queries(2), tombstone_queries(30))
+        self.assertEquals(
+            set(Tombstone.objects.values_list('school_id', flat=True)),
+            {self.school.id}
+        )
+        self.assertEquals(Tombstone.objects.filter(model='session').count(),
+                          32)
+
+    def test_since_older_than_tombstones_rejected(self):
+        with self.settings(SYNC_TOMBSTONE_DAYS=30):
+            res = self.since(timezone.now() - timedelta(days=31))
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('since', res.data)
+
+    def test_old_tombstones_purged(self):
+        self.session.delete()
+        Tombstone.objects.update(
+            deleted_at=timezone.now() - timedelta(days=31)
+        )
+        self.lesson.delete()
+
+        call_command('purge_tombstones', days=30, stdout=io.StringIO())
+
+        self.assertEquals(
+            list(Tombstone.objects.values_list('model', flat=True)),
+            ['lesson']
+        )
+
+    def test_invalid_since_rejected(self):
+        res = self.client.get(self.url, {'since': 'yesterday'})
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('since', res.data)
+
+    def test_other_school_not_found(self):
+        other = School.objects.create(basename="other-high",
+                                      name="Other High")
+
+        res = self.client.get(reverse('school:changes', args=[other.id]))
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_watermark_in_utc(self):
+        res = self.client.get(self.url)
+
+        self.assertTrue(res.data['watermark'].endswith('Z'))
+        self.assertNotIn('next', res.data)
+
+    @patch.object(SchoolChangesAPIView, 'page_size', 2)
+    def test_changes_sent_in_pages(self):
+        for i in range(4):
+            Subject.objects.create(basename="subject-%d" % i,
+                                   name="Subject %d" % i, school=self.school)
+        mark = timezone.now()
+        for subject in Subject.objects.all():
+            subject.save()
+        for i in range(3):
+            Session.objects.create(start_time=timezone.now(),
+                                   end_time=timezone.now(),
+                                   type="TCN", lesson=self.lesson).delete()
+
+        res = self.since(mark)
+        watermark = res.data['watermark']
+        subjects = []
+        deleted = []
+        pages = 0
+        while True:
+            pages += 1
+            self.assertEquals(res.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(res.data['changed']['subjects']), 2)
+            self.assertEquals(res.data['watermark'], watermark)
+            subjects += [row['id'] for row in res.data['changed']['subjects']]
+            deleted += res.data['deleted']['sessions']
+            if 'next' not in res.data:
+                break
+            res = self.client.get(self.url, {'cursor': res.data['next']})
+
+        self.assertEquals(pages, 3)
+        self.assertEquals(sorted(subjects),
+                          sorted(Subject.objects.values_list('id', flat=True)))
+        self.assertEquals(len(set(deleted)), 3)
+
+    def test_invalid_cursor_rejected(self):
+        res = self.client.get(self.url, {'cursor': 'page-2'})
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('cursor', res.data)
@@ -0,0 +1,149 @@
+import time
+
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import School, Subject, Level, Lesson, Session
+
+
+reg_url = '/api/v1/accounts/auth/registration/'
+
+
+class TestConditionalGetApi(TransactionTestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password": "Qwerty!@#",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01"
+        }
+
+        auth_user = self.client.post(reg_url, payload, format='json')
+
+        access_token = auth_user.data.get('access_token')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.user = get_user_model().objects.get(email=payload['email'])
+
+        sch = School.objects.create(basename="gruut-high", name="Gruut High")
+        sch.users.add(self.user)
+        sub = Subject.objects.create(basename="spanish-fal",
+                                     name="Spanish FAL", school=sch)
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=sch)
+        self.lesson = Lesson.objects.create(subject=sub, level=level,
+                                            instructor=self.user,
+                                            name="Python 101")
+        self.session = Session.objects.create(start_time=timezone.now(),
+                                              end_time=timezone.now(),
+                                              type="TCN", lesson=self.lesson)
+        self.session_url = reverse('school:session-view',
+                                   args=[self.session.id])
+        self.lesson_list_url = reverse('school:lesson-list')
+
+    def test_unchanged_retrieve_is_not_modified(self):
+        first = self.client.get(self.session_url)
+        self.assertEquals(first.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', first)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(self.session_url,
+                                  HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEquals(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEquals(res['ETag'], first['ETag'])
+        # only the check that the session is still there
+        self.assertEquals(len(ctx.captured_queries), 1)
+
+    def test_update_changes_etag(self):
+        first = self.client.get(self.session_url)
+
+        self.session.type = "XM"
+        self.session.save()
+
+        res = self.client.get(self.session_url,
+                              HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data.get('type'), 'XM')
+
+    def test_attendance_change_changes_etag(self):
+        first = self.client.get(self.session_url)
+
+        self.client.post(reverse('school:session-attendance'), {
+            "add": [{"session": self.session.id, "learner": self.user.id}]
+        }, format='json')
+
+        res = self.client.get(self.session_url,
+                              HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data.get('attendance'), [self.user.id])
+
+    def test_unchanged_list_is_not_modified(self):
+        first = self.client.get(self.lesson_list_url)
+
+        res = self.client.get(self.lesson_list_url,
+                              HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEquals(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.lesson.learners.add(self.user)
+        res = self.client.get(self.lesson_list_url,
+                              HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+
+    def test_list_etag_differs_per_query_and_user(self):
+        first = self.client.get(self.lesson_list_url)
+
+        res = self.client.get(self.lesson_list_url, {'page_size': 1},
+                              HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+
+        other = get_user_model().objects.create_user(
+            email="other@bondeveloper.com", password="Qwerty!@#"
+        )
+        self.client.force_authenticate(other)
+        res = self.client.get(self.lesson_list_url,
+                              HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data['results'], [])
+
+    def test_missing_object_not_tagged(self):
+        res = self.client.get(reverse('school:session-view', args=[0]))
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn('ETag', res)
+
+    def test_missing_object_not_modified_since_not_found(self):
+        res = self.client.get(reverse('school:session-view', args=[9999]),
+                              HTTP_IF_MODIFIED_SINCE=http_date(
+                                  time.time() + 3600
+                              ))
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_deleted_object_not_found_with_old_etag(self):
+        first = self.client.get(self.session_url)
+
+        Session.objects.filter(pk=self.session.pk).delete()
+        res = self.client.get(self.session_url,
+                              HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_param_not_modified_since_rejected(self):
+        res = self.client.get(self.lesson_list_url, {'school': 'abc'},
+                              HTTP_IF_MODIFIED_SINCE=http_date(
+                                  time.time() + 3600
+                              ))
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('school', res.data)
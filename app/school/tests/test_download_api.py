@@ -0,0 +1,201 @@
+import shutil
+import tempfile
+import tracemalloc
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import School, Subject, Level, Lesson, Session, Attachment
+from school.downloads import parse_range
+
+
+reg_url = '/api/v1/accounts/auth/registration/'
+MEDIA_ROOT = tempfile.mkdtemp()
+CONTENT = b'%PDF-1.4 week one'
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class TestAttachmentDownloadApi(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = APIClient()
+
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password": "Qwerty!@#",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01"
+        }
+
+        auth_user = self.client.post(reg_url, payload, format='json')
+
+        access_token = auth_user.data.get('access_token')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        user = get_user_model().objects.get(email=payload['email'])
+
+        self.school = School.objects.create(basename="gruut-high",
+                                            name="Gruut High")
+        self.school.users.add(user)
+        sub = Subject.objects.create(basename="spanish-fal",
+                                     name="Spanish FAL", school=self.school)
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=self.school)
+        les = Lesson.objects.create(subject=sub, level=level,
+                                    instructor=user, name="Python 101")
+        session = Session.objects.create(start_time=timezone.now(),
+                                         end_time=timezone.now(),
+                                         type="LCT", lesson=les)
+        self.attachment = Attachment(session=session, notes="Week 1")
+        self.attachment.file.save('week1.pdf', ContentFile(CONTENT))
+        self.url = reverse('school:attachment-download',
+                           args=[self.attachment.pk])
+
+    @override_settings(ATTACHMENT_ACCEL_REDIRECT=True)
+    def test_file_left_to_proxy(self):
+        res = self.client.get(self.url)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res['X-Accel-Redirect'],
+                          '/static/media/' + self.attachment.file.name)
+        self.assertEquals(res['Content-Type'], 'application/pdf')
+        self.assertEquals(res['Content-Disposition'],
+                          'attachment; filename="attachment-%d.pdf"'
+                          % self.attachment.pk)
+        self.assertEquals(res.content, b'')
+
+    @override_settings(ATTACHMENT_ACCEL_REDIRECT=False)
+    def test_file_type_accepted(self):
+        res = self.client.get(self.url, HTTP_ACCEPT='application/pdf')
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(b''.join(res.streaming_content), CONTENT)
+
+        self.school.users.clear()
+        res = self.client.get(self.url, HTTP_ACCEPT='application/pdf')
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(ATTACHMENT_ACCEL_REDIRECT=False)
+    def test_file_sent_without_proxy(self):
+        res = self.client.get(self.url)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Accel-Redirect', res)
+        self.assertEquals(b''.join(res.streaming_content), CONTENT)
+
+    @override_settings(ATTACHMENT_ACCEL_REDIRECT=False)
+    def test_byte_ranges(self):
+        res = self.client.get(self.url, HTTP_RANGE='bytes=4-7')
+        self.assertEquals(res.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEquals(b''.join(res.streaming_content), CONTENT[4:8])
+        self.assertEquals(res['Content-Range'],
+                          'bytes 4-7/%d' % len(CONTENT))
+        self.assertEquals(res['Content-Length'], '4')
+
+        res = self.client.get(self.url, HTTP_RANGE='bytes=-3')
+        self.assertEquals(b''.join(res.streaming_content), CONTENT[-3:])
+
+        res = self.client.get(self.url, HTTP_RANGE='bytes=100-')
+        self.assertEquals(res.status_code,
+                          status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEquals(res['Content-Range'], 'bytes */%d' % len(CONTENT))
+
+    @override_settings(ATTACHMENT_ACCEL_REDIRECT=False)
+    def test_range_with_file_type_accepted(self):
+        res = self.client.get(self.url, HTTP_RANGE='bytes=4-7',
+                              HTTP_ACCEPT='application/pdf')
+
+        self.assertEquals(res.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEquals(b''.join(res.streaming_content), CONTENT[4:8])
+
+    @override_settings(ATTACHMENT_ACCEL_REDIRECT=False)
+    def test_range_of_changed_file_sends_whole_file(self):
+        res = self.client.get(self.url, HTTP_RANGE='bytes=4-7',
+                              HTTP_IF_RANGE='"stale"')
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(b''.join(res.streaming_content), CONTENT)
+
+    @override_settings(ATTACHMENT_ACCEL_REDIRECT=False)
+    def test_unchanged_file_not_sent_again(self):
+        res = self.client.get(self.url)
+
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEquals(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        again = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEquals(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @override_settings(ATTACHMENT_ACCEL_REDIRECT=False)
+    def test_memory_per_download_bounded(self):
+        size = 8 * 1024 * 1024
+        self.attachment.file.save('recording.mp4',
+                                  ContentFile(b'x' * size))
+
+        tracemalloc.start()
+        try:
+            for headers in ({}, {'HTTP_RANGE': 'bytes=1024-'}):
+                res = self.client.get(self.url, **headers)
+                sent = sum(len(chunk) for chunk in res.streaming_content)
+                res.close()
+                self.assertGreater(sent, size - 2048)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        # a few buffers, not the file
+        self.assertLess(peak, size // 8)
+
+    def test_parse_range(self):
+        self.assertEquals(parse_range('bytes=0-0', 10), (0, 0))
+        self.assertEquals(parse_range('bytes=5-20', 10), (5, 9))
+        self.assertEquals(parse_range('bytes=-20', 10), (0, 9))
+        self.assertEquals(parse_range('bytes=10-', 10), ())
+        self.assertEquals(parse_range('bytes=-0', 10), ())
+        self.assertEquals(parse_range('bytes=7-3', 10), None)
+        self.assertEquals(parse_range('bytes=0-1,4-5', 10), None)
+        self.assertEquals(parse_range('items=0-1', 10), None)
+
+    def test_other_schools_not_found(self):
+        self.school.users.clear()
+
+        res = self.client.get(self.url)
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_listed_with_download_url(self):
+        res = self.client.get(reverse('school:attachment-list'))
+
+        self.assertTrue(res.data['results'][0]['download']
+                        .endswith(self.url))
+
+    @override_settings(ATTACHMENT_ACCEL_REDIRECT=True)
+    def test_thumbnail_listed_and_served_inline(self):
+        res = self.client.get(reverse('school:attachment-list'))
+        self.assertEquals(res.data['results'][0]['thumbnail'], None)
+        self.assertEquals(res.data['results'][0]['preview_status'],
+                          'pending')
+
+        self.attachment.thumbnail.save('thumbnail.png', ContentFile(b'png'))
+        url = reverse('school:attachment-thumbnail',
+                      args=[self.attachment.pk])
+
+        res = self.client.get(reverse('school:attachment-list'))
+        self.assertTrue(res.data['results'][0]['thumbnail'].endswith(url))
+
+        res = self.client.get(url, HTTP_ACCEPT='image/png,image/*')
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res['X-Accel-Redirect'],
+                          '/static/media/' + self.attachment.thumbnail.name)
+        self.assertEquals(res['Content-Type'], 'image/png')
+        self.assertTrue(res['Content-Disposition'].startswith('inline;'))
@@ -0,0 +1,117 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import School, Subject, Level, Lesson
+
+
+reg_url = '/api/v1/accounts/auth/registration/'
+enrolment_url = reverse('school:lesson-enrolment')
+
+
+class TestBulkEnrolmentApi(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password": "Qwerty!@#",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01"
+        }
+
+        auth_user = self.client.post(reg_url, payload, format='json')
+
+        access_token = auth_user.data.get('access_token')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+
+        instructor = get_user_model().objects.get(email=payload['email'])
+        self.sch = sch = School.objects.create(basename="gruut-high",
+                                               name="Gruut High")
+        sch.users.add(instructor)
+        sub = Subject.objects.create(basename="spanish-fal",
+                                     name="Spanish FAL", school=sch)
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=sch)
+
+        self.lessons = [
+            Lesson.objects.create(subject=sub, level=level,
+                                  instructor=instructor,
+                                  name="Lesson %d" % i)
+            for i in range(10)
+        ]
+        get_user_model().objects.bulk_create([
+            get_user_model()(username="learner%d" % i,
+                             email="learner%d@bondeveloper.coom" % i,
+                             password="Qwerty!@#")
+            for i in range(100)
+        ])
+        self.learners = list(
+            get_user_model().objects.filter(username__startswith='learner')
+        )
+
+    def pairs(self, lessons, learners):
+        return [{"lesson": les.id, "learner": learner.id}
+                for les in lessons for learner in learners]
+
+    def test_authentication_required(self):
+        self.client = APIClient()
+        res = self.client.post(enrolment_url, {}, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_enrol_cohort(self):
+        payload = {"add": self.pairs(self.lessons, self.learners)}
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(enrolment_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data, {'added': 1000, 'removed': 0})
+        self.assertLess(len(ctx.captured_queries), 15)
+        for les in self.lessons:
+            self.assertEquals(les.learners.count(), 100)
+
+    def test_already_enrolled_not_counted(self):
+        self.lessons[0].learners.add(self.learners[0])
+
+        payload = {"add": self.pairs(self.lessons[:1], self.learners[:2])}
+        res = self.client.post(enrolment_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data, {'added': 1, 'removed': 0})
+
+    def test_unenrol(self):
+        self.lessons[0].learners.add(*self.learners[:3])
+        self.lessons[1].learners.add(*self.learners[:3])
+
+        payload = {"remove": self.pairs(self.lessons[:1], self.learners[:2])}
+        res = self.client.post(enrolment_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data, {'added': 0, 'removed': 2})
+        self.assertEquals(self.lessons[0].learners.count(), 1)
+        self.assertEquals(self.lessons[1].learners.count(), 3)
+
+    def test_unknown_learner_rejected(self):
+        payload = {"add": [{"lesson": self.lessons[0].id, "learner": 0}]}
+        res = self.client.post(enrolment_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('learner', res.data)
+
+    def test_other_schools_lessons_rejected(self):
+        self.sch.users.clear()
+
+        payload = {"add": self.pairs(self.lessons[:1], self.learners[:1])}
+        res = self.client.post(enrolment_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('lesson', res.data)
+        self.assertEquals(self.lessons[0].learners.count(), 0)
@@ -0,0 +1,130 @@
+import csv
+import json
+from datetime import datetime
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import School, Subject, Level, Lesson, Session, Moderation
+
+
+reg_url = '/api/v1/accounts/auth/registration/'
+moderation_export_url = reverse('school:moderation-export')
+attendance_export_url = reverse('school:session-attendance-export')
+
+
+def content(res):
+    return b''.join(res.streaming_content).decode()
+
+
+class TestExportApi(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password": "Qwerty!@#",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01"
+        }
+
+        auth_user = self.client.post(reg_url, payload, format='json')
+
+        access_token = auth_user.data.get('access_token')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.user = get_user_model().objects.get(email=payload['email'])
+
+        self.school = School.objects.create(basename="gruut-high",
+                                            name="Gruut High")
+        self.school.users.add(self.user)
+        sub = Subject.objects.create(basename="spanish-fal",
+                                     name="Spanish FAL", school=self.school)
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=self.school)
+        self.lessons = [
+            Lesson.objects.create(subject=sub, level=level,
+                                  instructor=self.user, name=name)
+            for name in ("Python 101", "Python 102")
+        ]
+        self.learners = [
+            get_user_model().objects.create(
+                username="learner%d" % i,
+                email="learner%d@bondeveloper.coom" % i,
+                password="Qwerty!@#",
+            )
+            for i in range(3)
+        ]
+
+        self.sessions = []
+        for day, lesson in ((1, self.lessons[0]), (2, self.lessons[0]),
+                            (3, self.lessons[1])):
+            start = timezone.make_aware(datetime(2020, 11, day, 9))
+            ses = Session.objects.create(start_time=start, end_time=start,
+                                         type="TCN", lesson=lesson)
+            ses.attendance.add(*self.learners)
+            for learner in self.learners:
+                Moderation.objects.create(session=ses, learner=learner,
+                                          learner_score=5, max_score=10,
+                                          score_type="unit")
+            self.sessions.append(ses)
+
+    def test_authentication_required(self):
+        self.client = APIClient()
+        res = self.client.get(moderation_export_url)
+
+        self.assertEquals(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_moderations_csv(self):
+        res = self.client.get(moderation_export_url)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertTrue(res['Content-Type'].startswith('text/csv'))
+        self.assertIn('moderations.csv', res['Content-Disposition'])
+
+        rows = list(csv.DictReader(content(res).splitlines()))
+        self.assertEquals(len(rows), 9)
+        self.assertEquals(rows[0]['learner_email'], self.learners[0].email)
+        self.assertEquals(rows[0]['learner_score'], '5')
+        self.assertEquals(rows[0]['start_time'],
+                          self.sessions[0].start_time.isoformat())
+
+    def test_moderations_ndjson(self):
+        res = self.client.get(moderation_export_url, {'format': 'ndjson'})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        rows = [json.loads(line) for line in content(res).splitlines()]
+        self.assertEquals(len(rows), 9)
+        self.assertEquals(rows[0]['session'], self.sessions[0].id)
+
+    def test_attendance_filtered_by_lesson_and_date(self):
+        res = self.client.get(attendance_export_url,
+                              {'lesson': self.lessons[0].id,
+                               'from': '2020-11-02', 'to': '2020-11-03'})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        rows = list(csv.DictReader(content(res).splitlines()))
+        self.assertEquals({row['session'] for row in rows},
+                          {str(self.sessions[1].id)})
+        self.assertEquals([row['learner'] for row in rows],
+                          [str(learner.id) for learner in self.learners])
+
+    def test_other_schools_excluded(self):
+        self.school.users.remove(self.user)
+
+        res = self.client.get(attendance_export_url, {'format': 'ndjson'})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(content(res), '')
+
+    def test_invalid_date_rejected(self):
+        res = self.client.get(moderation_export_url, {'from': '02/11/2020'})
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(b'from', res.content)
@@ -0,0 +1,193 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.feeds import feed_key
+from core.models import School, Subject, Level, Lesson, Session, \
+                        SessionSeries
+
+
+reg_url = '/api/v1/accounts/auth/registration/'
+link_url = reverse('school:calendar-link')
+
+
+class TestCalendarFeedApi(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password": "Qwerty!@#",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01"
+        }
+
+        auth_user = self.client.post(reg_url, payload, format='json')
+
+        access_token = auth_user.data.get('access_token')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.user = get_user_model().objects.get(email=payload['email'])
+        self.other = get_user_model().objects.create_user(
+            email="other@bondeveloper.com", password="Qwerty!@#"
+        )
+
+        sch = School.objects.create(basename="gruut-high", name="Gruut High")
+        self.sub = Subject.objects.create(basename="spanish-fal",
+                                          name="Spanish FAL", school=sch)
+        self.level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                          school=sch)
+        self.lesson = self.create_lesson("Python 101", self.other)
+        self.lesson.learners.add(self.user)
+        self.other_lesson = self.create_lesson("Django 101", self.other)
+
+        self.start = timezone.now().replace(microsecond=0) + \
+            timedelta(days=1)
+        self.session = self.create_session(self.lesson)
+
+        self.feed_url = reverse('school:calendar-feed',
+                                args=[feed_key(self.user.pk)])
+
+    def create_lesson(self, name, instructor):
+        return Lesson.objects.create(subject=self.sub, level=self.level,
+                                     instructor=instructor, name=name)
+
+    def create_session(self, lesson, days=0):
+        start = self.start + timedelta(days=days)
+        return Session.objects.create(start_time=start,
+                                      end_time=start + timedelta(hours=1),
+                                      type="LCT", lesson=lesson)
+
+    def feed(self, **headers):
+        return APIClient().get(self.feed_url, **headers)
+
+    def test_link_points_at_feed(self):
+        res = self.client.get(link_url)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data['url'].endswith(self.feed_url))
+
+    def test_feed_has_own_sessions_and_occurrences(self):
+        SessionSeries.objects.create(lesson=self.lesson, type="TUT",
+                                     start_time=self.start,
+                                     end_time=self.start +
+                                     timedelta(hours=1),
+                                     frequency='daily', count=3)
+        self.create_session(self.other_lesson)
+
+        res = self.feed()
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res['Content-Type'], 'text/calendar; charset=utf-8')
+        content = res.content.decode()
+        self.assertTrue(content.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertEquals(content.count('BEGIN:VEVENT'), 4)
+        self.assertIn('UID:session-%d@' % self.session.pk, content)
+        self.assertIn('SUMMARY:Python 101 (Lecture)', content)
+        self.assertNotIn('Django 101', content)
+
+    def test_calendar_accept_header(self):
+        res = self.feed(HTTP_ACCEPT='text/calendar')
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res['Content-Type'], 'text/calendar; charset=utf-8')
+
+    def test_instructor_sees_taught_lessons(self):
+        self.create_session(self.other_lesson)
+
+        res = APIClient().get(reverse('school:calendar-feed',
+                                      args=[feed_key(self.other.pk)]))
+
+        self.assertEquals(res.content.decode().count('BEGIN:VEVENT'), 2)
+
+    def test_bad_key_not_found(self):
+        res = APIClient().get(reverse('school:calendar-feed',
+                                      args=[feed_key(self.user.pk) + 'x']))
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_unchanged_feed_polled_without_queries(self):
+        etag = self.feed()['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.feed(HTTP_IF_NONE_MATCH=etag)
+            cached = self.feed()
+
+        self.assertEquals(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEquals(cached.status_code, status.HTTP_200_OK)
+        self.assertEquals(len(queries), 0)
+
+    def test_session_change_refreshes_feed(self):
+        etag = self.feed()['ETag']
+
+        self.create_session(self.lesson, days=2)
+        res = self.feed(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.content.decode().count('BEGIN:VEVENT'), 2)
+
+    def test_enrolment_refreshes_feed(self):
+        etag = self.feed()['ETag']
+
+        self.other_lesson.learners.add(self.user)
+        res = self.feed(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+
+    def test_other_lessons_keep_feed(self):
+        outsider = self.create_lesson("Flask 101", self.other)
+        etag = self.feed()['ETag']
+
+        self.create_session(outsider)
+        res = self.feed(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_moved_session_refreshes_old_lesson_feed(self):
+        etag = self.feed()['ETag']
+
+        self.session.lesson = self.other_lesson
+        self.session.save()
+        res = self.feed(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn('BEGIN:VEVENT', res.content.decode())
+
+    def test_new_instructor_refreshes_old_instructor_feed(self):
+        feed_url = reverse('school:calendar-feed',
+                           args=[feed_key(self.other.pk)])
+        etag = APIClient().get(feed_url)['ETag']
+
+        self.lesson.instructor = self.user
+        self.lesson.save()
+        res = APIClient().get(feed_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn('Python 101', res.content.decode())
+
+    def test_materialized_occurrence_keeps_uid(self):
+        series = SessionSeries.objects.create(
+            lesson=self.lesson, type="TUT", start_time=self.start,
+            end_time=self.start + timedelta(hours=1),
+            frequency='daily', count=3
+        )
+        occurrence = self.start + timedelta(days=1)
+        uid = 'UID:series-%d-%s@' % (series.pk,
+                                     occurrence.strftime('%Y%m%dT%H%M%SZ'))
+        self.assertIn(uid, self.feed().content.decode())
+
+        series.materialize(occurrence)
+        content = self.feed().content.decode()
+
+        self.assertEquals(content.count('BEGIN:VEVENT'), 4)
+        self.assertEquals(content.count(uid), 1)
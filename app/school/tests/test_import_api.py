@@ -0,0 +1,196 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import School, Subject, Level, Lesson, Profile
+from school.imports import RosterImporter
+
+
+reg_url = '/api/v1/accounts/auth/registration/'
+HEADER = 'email,first_name,last_name,username,password,subject,level,lesson'
+
+
+def roster(*rows):
+    return '\n'.join((HEADER,) + rows) + '\n'
+
+
+class TestRosterImportApi(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password": "Qwerty!@#",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01"
+        }
+
+        auth_user = self.client.post(reg_url, payload, format='json')
+
+        access_token = auth_user.data.get('access_token')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.user = get_user_model().objects.get(email=payload['email'])
+
+        self.school = School.objects.create(basename="gruut-high",
+                                            name="Gruut High")
+        self.school.users.add(self.user)
+        self.subject = Subject.objects.create(basename="spanish-fal",
+                                              name="Spanish FAL",
+                                              school=self.school)
+        self.level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                          school=self.school)
+        self.url = reverse('school:import', args=[self.school.id])
+
+    def upload(self, content):
+        if isinstance(content, str):
+            content = content.encode()
+        return self.client.post(self.url, {
+            'file': SimpleUploadedFile('roster.csv', content,
+                                       content_type='text/csv')
+        }, format='multipart')
+
+    def test_import_creates_learners_lessons_and_enrolments(self):
+        existing = get_user_model().objects.create_user(
+            email="existing@bondeveloper.com", password="Qwerty!@#"
+        )
+        res = self.upload(roster(
+            'ann@bondeveloper.com,Ann,Smith,ann,Qwerty!@#,spanish-fal,'
+            'grade-9,Python 101',
+            'ann@bondeveloper.com,Ann,Smith,ann,,spanish-fal,'
+            'grade-9,Python 102',
+            'bob@bondeveloper.com,Bob,,bob,,spanish-fal,grade-9,Python 101',
+            'existing@bondeveloper.com,,,,,spanish-fal,grade-9,Python 101',
+        ))
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data['rows'], 4)
+        self.assertEquals(res.data['created_users'], 2)
+        self.assertEquals(res.data['created_lessons'], 2)
+        self.assertEquals(res.data['enrolled'], 4)
+        self.assertEquals(res.data['errors'], [])
+
+        lesson = Lesson.objects.get(name="Python 101")
+        self.assertEquals(lesson.instructor, self.user)
+        self.assertEquals(
+            set(lesson.learners.values_list('email', flat=True)),
+            {"ann@bondeveloper.com", "bob@bondeveloper.com", existing.email}
+        )
+        ann = get_user_model().objects.get(email="ann@bondeveloper.com")
+        self.assertTrue(ann.check_password("Qwerty!@#"))
+        bob = get_user_model().objects.get(email="bob@bondeveloper.com")
+        self.assertFalse(bob.has_usable_password())
+        self.assertTrue(Profile.objects.filter(user=existing,
+                                               school=self.school).exists())
+
+    def test_reimport_adds_nothing(self):
+        content = roster('ann@bondeveloper.com,,,,,spanish-fal,grade-9,'
+                         'Python 101')
+        self.upload(content)
+
+        res = self.upload(content)
+
+        self.assertEquals(res.data['created_users'], 0)
+        self.assertEquals(res.data['created_lessons'], 0)
+        self.assertEquals(res.data['enrolled'], 0)
+        self.assertEquals(Lesson.objects.count(), 1)
+
+    def test_row_errors_reported_and_skipped(self):
+        res = self.upload(roster(
+            'not-an-email,,,,,spanish-fal,grade-9,Python 101',
+            'ann@bondeveloper.com,,,,,history,grade-9,Python 101',
+            'bob@bondeveloper.com,,,,,spanish-fal,grade-9,',
+            'cat@bondeveloper.com,,,,,spanish-fal,grade-9,Python 101',
+        ))
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals([error['row'] for error in res.data['errors']],
+                          [2, 3, 4])
+        self.assertIn('email', res.data['errors'][0]['errors'])
+        self.assertIn('subject', res.data['errors'][1]['errors'])
+        self.assertIn('lesson', res.data['errors'][2]['errors'])
+        self.assertEquals(res.data['enrolled'], 1)
+
+    def test_missing_columns_rejected(self):
+        res = self.upload('email,lesson\nann@bondeveloper.com,Python 101\n')
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('file', res.data)
+
+    def test_unreadable_file_rejected(self):
+        res = self.upload(roster(
+            'ann@bondeveloper.com,,,,,spanish-fal,grade-9,Python 101',
+        ).encode('utf-16'))
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('file', res.data)
+
+    def test_unreadable_rest_reported_after_stored_chunks(self):
+        RosterImporter.chunk_size, chunk_size = 2, RosterImporter.chunk_size
+        self.addCleanup(setattr, RosterImporter, 'chunk_size', chunk_size)
+        rows = ['learner%d@bondeveloper.com,,,,,spanish-fal,grade-9,'
+                'Python 101' % i for i in range(3)]
+
+        res = self.upload(roster(*rows).encode() +
+                          b'\xff\xfe,,,,,spanish-fal,grade-9,Python 101\n')
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data['enrolled'], 2)
+        self.assertEquals(res.data['errors'][0]['row'], 4)
+        self.assertIn('file', res.data['errors'][0]['errors'])
+        self.assertEquals(Lesson.objects.get(name="Python 101")
+                          .learners.count(), 2)
+
+    def test_other_school_not_found(self):
+        other = School.objects.create(basename="other-high",
+                                      name="Other High")
+        self.url = reverse('school:import', args=[other.id])
+
+        res = self.upload(roster())
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_queries_per_chunk_not_per_row(self):
+        def run(count):
+            rows = ['learner%d-%d@bondeveloper.com,,,,,spanish-fal,grade-9,'
+                    'Lesson %d-%d' % (count, i, count, i)
+                    for i in range(count)]
+            importer = RosterImporter(self.school, self.user)
+            with CaptureQueriesContext(connection) as ctx:
+                importer.run(roster(*rows).splitlines())
+            return len(ctx.captured_queries)
+
+        few, many = run(5), run(50)
+
+        # lessons are saved one by one where bulk inserts return no ids
+        if connection.features.can_return_rows_from_bulk_insert:
+            self.assertEquals(many, few)
+        self.assertEquals(Lesson.objects.get(name="Lesson 50-3")
+                          .learners.count(), 1)
+
+    def test_import_command(self):
+        path = os.path.join(tempfile.mkdtemp(), 'roster.csv')
+        with open(path, 'w') as f:
+            f.write(roster(
+                'ann@bondeveloper.com,,,,,spanish-fal,grade-9,Python 101',
+                'bob@bondeveloper.com,,,,,spanish-fal,grade-1,Python 101',
+            ))
+
+        out, err = StringIO(), StringIO()
+        call_command('import_roster', self.school.id, path,
+                     '--instructor', self.user.email, stdout=out, stderr=err)
+
+        self.assertIn('2 rows: 1 users and 1 lessons created', out.getvalue())
+        self.assertIn('row 3', err.getvalue())
+        self.assertEquals(Lesson.objects.get().learners.count(), 1)
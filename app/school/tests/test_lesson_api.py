@@ -210,9 +210,14 @@ class TestPrivateLessonApi(TestCase):
             name="Python Advanced"
         )
 
+        auth_user = get_user_model().objects.get(
+            email="testuser@bondeveloper.com"
+        )
+        sch.users.add(auth_user)
+
         res = self.client.get(reverse("school:lesson-list"))
         self.assertEquals(res.status_code, status.HTTP_200_OK)
-        self.assertEquals(len(res.data), 4)
+        self.assertEquals(len(res.data['results']), 4)
 
     def test_lesson_delete_api(self):
         cat = Category.objects.create(
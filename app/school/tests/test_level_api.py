@@ -1,5 +1,6 @@
 from django.test import TestCase
 from django.urls import reverse
+from django.contrib.auth import get_user_model
 
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -97,7 +98,7 @@ class TestPrivateLevelApi(TestCase):
         self.assertEqual(res.data.get("name"), update_name)
 
     def test_list_levels_api(self):
-        sample_level()
+        level = sample_level()
 
         cat2 = Category.objects.create(
             basename="test-cat02",
@@ -116,9 +117,15 @@ class TestPrivateLevelApi(TestCase):
             school=sch2,
         )
 
+        auth_user = get_user_model().objects.get(
+            email="testuser@bondeveloper.com"
+        )
+        level.school.users.add(auth_user)
+        sch2.users.add(auth_user)
+
         res = self.client.get(reverse('school:level-list'))
         self.assertEquals(res.status_code, status.HTTP_200_OK)
-        self.assertEquals(len(res.data), 2)
+        self.assertEquals(len(res.data['results']), 2)
 
     def test_delete_level_api(self):
         level = sample_level()
@@ -256,10 +256,15 @@ class TestPrivateModerationApi(TestCase):
             score_type="percentage"
         )
 
+        auth_user = get_user_model().objects.get(
+            email="testuser@bondeveloper.com"
+        )
+        sch.users.add(auth_user)
+
         res = self.client.get(reverse('school:moderation-list'))
 
         self.assertEquals(res.status_code, status.HTTP_200_OK)
-        self.assertEquals(len(res.data), 2)
+        self.assertEquals(len(res.data['results']), 2)
 
     def test_moderation_delete_successful(self):
         learner = get_user_model().objects.create(
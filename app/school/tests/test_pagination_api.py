@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.request import Request
+from rest_framework import status
+
+from core.models import Category, School, Subject, Level, Lesson, Session
+from core.pagination import KeysetPagination
+
+
+reg_url = '/api/v1/accounts/auth/registration/'
+category_list_url = reverse('school:category-list')
+
+
+class TestListPagination(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password": "Qwerty!@#",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01"
+        }
+
+        auth_user = self.client.post(reg_url, payload, format='json')
+
+        access_token = auth_user.data.get('access_token')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+
+        for i in range(5):
+            Category.objects.create(basename="cat-%d" % i,
+                                    name="Category %d" % i)
+
+    def test_list_is_paginated(self):
+        res = self.client.get(category_list_url, {'page_size': 2})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertIn('next', res.data)
+        self.assertIn('previous', res.data)
+        self.assertEquals(len(res.data['results']), 2)
+
+    def test_following_cursor_visits_every_row_once(self):
+        seen = []
+        url = category_list_url + '?page_size=2'
+        while url:
+            res = self.client.get(url)
+            self.assertEquals(res.status_code, status.HTTP_200_OK)
+            seen.extend(row['basename'] for row in res.data['results'])
+            url = res.data['next']
+
+        self.assertEquals(seen, ["cat-%d" % i for i in range(5)])
+
+    def test_invalid_cursor_rejected(self):
+        res = self.client.get(category_list_url, {'cursor': 'garbage'})
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_size_is_capped(self):
+        request = Request(APIRequestFactory().get('/', {'page_size': 10**6}))
+
+        self.assertEquals(KeysetPagination().get_page_size(request),
+                          KeysetPagination.max_page_size)
+
+    def test_page_query_uses_keyset_not_offset(self):
+        """a page costs one indexed range scan, whatever the table size"""
+        first = self.client.get(category_list_url, {'page_size': 2})
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(first.data['next'])
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+
+        page_sql = [q['sql'] for q in ctx.captured_queries
+                    if 'core_category' in q['sql']]
+        self.assertEquals(len(page_sql), 1)
+        self.assertNotIn('OFFSET', page_sql[0].upper())
+        self.assertNotIn('COUNT(', page_sql[0].upper())
+        self.assertIn('LIMIT 3', page_sql[0].upper())
+
+    def test_sessions_paginate_by_start_time(self):
+        instructor = get_user_model().objects.create(
+            username="instructor",
+            email="instructor@bondeveloper.coom",
+            password="Qwerty!@#",
+        )
+        sch = School.objects.create(basename="gruut-high", name="Gruut High")
+        sch.users.add(get_user_model().objects.get(
+            email="testuser@bondeveloper.com"
+        ))
+        sub = Subject.objects.create(basename="spanish-fal",
+                                     name="Spanish FAL", school=sch)
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=sch)
+        les = Lesson.objects.create(subject=sub, level=level,
+                                    instructor=instructor, name="Python 101")
+
+        now = timezone.now()
+        for days in (3, 1, 2):
+            Session.objects.create(start_time=now + timedelta(days=days),
+                                   end_time=now + timedelta(days=days),
+                                   type="TCN", lesson=les)
+
+        res = self.client.get(reverse('school:session-list'))
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        starts = [row['start_time'] for row in res.data['results']]
+        self.assertEquals(len(starts), 3)
+        self.assertEquals(starts, sorted(starts))
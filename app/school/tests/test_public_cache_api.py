@@ -0,0 +1,121 @@
+from unittest.mock import patch
+
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection, transaction
+from django.urls import reverse
+from django.core.cache import cache
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Category, School
+from core.versions import model_version
+
+
+category_public_url = reverse('school:category-public-list')
+school_public_url = reverse('school:public-list')
+
+
+class TestPublicListCache(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.cat = Category.objects.create(basename="pre-school",
+                                           name="Pre School")
+        School.objects.create(basename="bbg", name="Beitbridge Gvt",
+                              category=self.cat)
+
+    def test_cached_list_needs_no_queries(self):
+        first = self.client.get(category_public_url)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(category_public_url)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data, first.data)
+        self.assertEquals(len(ctx.captured_queries), 0)
+
+    def test_query_string_cached_separately(self):
+        Category.objects.create(basename="college", name="College")
+
+        self.client.get(category_public_url)
+        res = self.client.get(category_public_url, {'page_size': 1})
+
+        self.assertEquals(len(res.data['results']), 1)
+
+    def test_change_invalidates(self):
+        self.client.get(school_public_url)
+
+        School.objects.create(basename="mckeurtan", name="Mckeurtan")
+        res = self.client.get(school_public_url)
+
+        self.assertEquals(len(res.data['results']), 2)
+
+    def test_version_bumped_on_commit(self):
+        version = model_version(School)
+
+        with transaction.atomic():
+            School.objects.create(basename="mckeurtan", name="Mckeurtan")
+            self.assertEquals(model_version(School), version)
+
+        self.assertGreater(model_version(School), version)
+
+    def test_versions_differ_within_a_second(self):
+        with patch('core.versions.time.time', return_value=1000000000.5):
+            version = model_version(School)
+            School.objects.create(basename="mckeurtan", name="Mckeurtan")
+            second = model_version(School)
+            School.objects.create(basename="kgosi", name="Kgosi")
+
+            self.assertGreater(second, version)
+            self.assertGreater(model_version(School), second)
+            self.assertEquals(model_version(School) % 1, 0)
+
+            # past the versions of other models that ran ahead
+            Category.objects.create(basename="college", name="College")
+            self.assertGreater(model_version(Category),
+                               model_version(School))
+
+    def test_change_within_a_second_modified_since(self):
+        with patch('core.versions.time.time', return_value=1000000000.5):
+            first = self.client.get(category_public_url)
+            Category.objects.create(basename="college", name="College")
+            res = self.client.get(
+                category_public_url,
+                HTTP_IF_MODIFIED_SINCE=first['Last-Modified']
+            )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(len(res.data['results']), 2)
+
+    def test_delete_invalidates(self):
+        self.client.get(category_public_url)
+
+        School.objects.all().delete()
+        self.cat.delete()
+        res = self.client.get(category_public_url)
+
+        self.assertEquals(len(res.data['results']), 0)
+
+    def test_if_none_match(self):
+        first = self.client.get(school_public_url)
+        self.assertIn('ETag', first)
+        self.assertIn('Last-Modified', first)
+
+        res = self.client.get(school_public_url,
+                              HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEquals(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEquals(res['ETag'], first['ETag'])
+
+        School.objects.create(basename="mckeurtan", name="Mckeurtan")
+        res = self.client.get(school_public_url,
+                              HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+
+    def test_if_modified_since(self):
+        first = self.client.get(category_public_url)
+
+        res = self.client.get(category_public_url,
+                              HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEquals(res.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -0,0 +1,109 @@
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Category, School, Subject, Level, Lesson, Session, \
+                        Attachment, Moderation
+
+
+reg_url = '/api/v1/accounts/auth/registration/'
+
+LIST_URLS = (
+    'school:category-list',
+    'school:category-public-list',
+    'school:list',
+    'school:public-list',
+    'school:subject-list',
+    'school:level-list',
+    'school:lesson-list',
+    'school:session-list',
+    'school:attachment-list',
+    'school:moderation-list',
+)
+
+
+class TestListQueryCount(TransactionTestCase):
+    """
+    The number of queries a list endpoint runs must not depend on the
+    number of rows it renders.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password": "Qwerty!@#",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01"
+        }
+
+        auth_user = self.client.post(reg_url, payload, format='json')
+
+        access_token = auth_user.data.get('access_token')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.user = get_user_model().objects.get(email=payload['email'])
+        self.created = 0
+
+    def populate(self, count):
+        for _ in range(count):
+            i = self.created
+            self.created += 1
+
+            learners = [
+                get_user_model().objects.create(
+                    username="learner%d-%d" % (i, n),
+                    email="learner%d-%d@bondeveloper.coom" % (i, n),
+                    password="Qwerty!@#",
+                )
+                for n in range(3)
+            ]
+
+            cat = Category.objects.create(basename="cat-%d" % i,
+                                          name="Category %d" % i)
+            sch = School.objects.create(basename="school-%d" % i,
+                                        name="School %d" % i, category=cat)
+            sch.users.add(self.user, *learners)
+            sub = Subject.objects.create(basename="subject-%d" % i,
+                                         name="Subject %d" % i, school=sch)
+            level = Level.objects.create(basename="level-%d" % i,
+                                         name="Level %d" % i, school=sch)
+            les = Lesson.objects.create(subject=sub, level=level,
+                                        instructor=self.user,
+                                        name="Lesson %d" % i)
+            les.learners.add(*learners)
+            ses = Session.objects.create(start_time=timezone.now(),
+                                         end_time=timezone.now(),
+                                         type="TCN", lesson=les)
+            ses.attendance.add(*learners)
+            Attachment.objects.create(session=ses, notes="Notes %d" % i)
+            for learner in learners:
+                Moderation.objects.create(session=ses, learner=learner,
+                                          learner_score=5, max_score=10,
+                                          score_type="unit")
+
+    def count_queries(self, url):
+        # the first request also fills the authentication cache
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url)
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries), len(res.data['results'])
+
+    def test_list_query_count_independent_of_rows(self):
+        self.populate(2)
+        few = {name: self.count_queries(reverse(name)) for name in LIST_URLS}
+
+        self.populate(4)
+        for name in LIST_URLS:
+            with self.subTest(endpoint=name):
+                queries, rows = self.count_queries(reverse(name))
+                self.assertGreater(rows, few[name][1])
+                self.assertEquals(queries, few[name][0])
@@ -88,6 +88,88 @@ class TestPublicSchoolApi(TestCase):
         self.assertTrue(len(res.data.get("users")) == 2)
         self.assertIn("id", res.data.get("users")[0].keys())
 
+    def test_school_create_reports_failed_users(self):
+        sample_user()
+
+        payload = {
+            "basename": "test-school",
+            "name": "Test School",
+            "users": [
+                {
+                    "username": "taken",
+                    "email": "testuser@bondeveloper.coom",
+                    "password": "Qwerty!@#",
+                    "first_name": "Taken",
+                    "last_name": "Taken"
+                },
+                {
+                    "username": "bad-email",
+                    "email": "not-an-email",
+                    "password": "Qwerty!@#",
+                    "first_name": "Bad",
+                    "last_name": "Email"
+                },
+                {
+                    "username": "testuser02",
+                    "email": "testuser02@bondeveloper.coom",
+                    "password": "Qwerty!@#",
+                    "first_name": "Test User 02 Firstname",
+                    "last_name": "Test User 02 Lastname"
+                }
+            ]
+        }
+
+        res = self.client.post(create_school_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        self.assertEquals([user['email'] for user in res.data['users']],
+                          ["testuser02@bondeveloper.coom"])
+        self.assertEquals(
+            sorted(failure['email'] for failure in res.data['failed_users']),
+            ["not-an-email", "testuser@bondeveloper.coom"]
+        )
+
+    def test_school_create_all_users_invalid(self):
+        payload = {
+            "basename": "test-school",
+            "name": "Test School",
+            "users": [{"username": "bad-email", "email": "not-an-email"}]
+        }
+
+        res = self.client.post(create_school_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(School.objects.exists())
+
+    def test_school_create_all_users_taken(self):
+        sample_user()
+
+        payload = {
+            "basename": "test-school",
+            "name": "Test School",
+            "users": [
+                {
+                    "username": "taken",
+                    "email": "testuser@bondeveloper.coom",
+                    "password": "Qwerty!@#"
+                },
+                {
+                    "username": "bad-email",
+                    "email": "not-an-email",
+                    "password": "Qwerty!@#"
+                }
+            ]
+        }
+
+        res = self.client.post(create_school_url, payload, format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEquals(
+            sorted(failure['email'] for failure in res.data['users']),
+            ["not-an-email", "testuser@bondeveloper.coom"]
+        )
+        self.assertFalse(School.objects.exists())
+
     def test_add_admin_user_to_school(self):
         cat = Category.objects.create(
                     basename="pre-school",
@@ -207,7 +289,7 @@ class TestPrivateSchoolApi(TestCase):
         res = self.client.get(list_school_url)
         self.assertEquals(res.status_code, status.HTTP_200_OK)
 
-        self.assertEquals(len(res.data), 2)
+        self.assertEquals(len(res.data['results']), 2)
 
     def test_update_school(self):
         cat = Category.objects.create(
@@ -229,7 +311,7 @@ class TestPrivateSchoolApi(TestCase):
             category=cat,
         ).users.add(user1)
 
-        school = self.client.get(list_school_url).data[0]
+        school = self.client.get(list_school_url).data['results'][0]
         school.name = "BB Gov"
         school.get('users')[0].pop("email")
 
@@ -248,27 +330,29 @@ class TestPrivateSchoolApi(TestCase):
 
         school_res = self.client.get(list_school_url)
         self.assertEquals(school_res.status_code, status.HTTP_200_OK)
-        self.assertEquals(len(school_res.data), 1)
+        self.assertEquals(len(school_res.data['results']), 1)
+        school_id = school_res.data['results'][0].get('id')
 
         res = self.client.delete(reverse('school:delete',
-                                         args=[school_res.data[0].get('id')]
+                                         args=[school_id]
                                          )
                                  )
         self.assertEquals(res.status_code, status.HTTP_204_NO_CONTENT)
 
         school_res = self.client.get(list_school_url)
         self.assertEquals(school_res.status_code, status.HTTP_200_OK)
-        self.assertEquals(len(school_res.data), 0)
+        self.assertEquals(len(school_res.data['results']), 0)
 
     def test_retrieve_school_successful(self):
         sample_school()
 
         school_res = self.client.get(list_school_url)
         self.assertEquals(school_res.status_code, status.HTTP_200_OK)
-        self.assertEquals(len(school_res.data), 1)
+        self.assertEquals(len(school_res.data['results']), 1)
+        school_id = school_res.data['results'][0].get('id')
 
         res = self.client.get(reverse('school:view',
-                                      args=[school_res.data[0].get('id')]
+                                      args=[school_id]
                                       )
                               )
         self.assertEquals(res.status_code, status.HTTP_200_OK)
@@ -0,0 +1,126 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import School, Subject, Level, Lesson, Session, Moderation
+
+
+reg_url = '/api/v1/accounts/auth/registration/'
+
+
+def sample_lesson(school, name, instructor):
+    sub = Subject.objects.create(
+        basename="%s-maths" % school.basename,
+        name="%s Maths" % school.name,
+        school=school
+    )
+    level = Level.objects.create(
+        basename="%s-grade-9" % school.basename,
+        name="Grade 9",
+        school=school
+    )
+    return Lesson.objects.create(
+        subject=sub,
+        level=level,
+        instructor=instructor,
+        name=name
+    )
+
+
+class TestSchoolScopedListApi(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password": "Qwerty!@#",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01"
+        }
+
+        auth_user = self.client.post(reg_url, payload, format='json')
+
+        access_token = auth_user.data.get('access_token')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.user = get_user_model().objects.get(email=payload['email'])
+
+        instructor = get_user_model().objects.create(
+            username="instructor",
+            email="instructor@bondeveloper.coom",
+            password="Qwerty!@#",
+        )
+
+        self.own = School.objects.create(basename="own", name="Own")
+        self.other = School.objects.create(basename="other", name="Other")
+        self.third = School.objects.create(basename="third", name="Third")
+        self.own.users.add(self.user)
+        self.third.users.add(self.user)
+
+        self.own_lesson = sample_lesson(self.own, "Own 101", instructor)
+        self.other_lesson = sample_lesson(self.other, "Other 101",
+                                          instructor)
+        self.third_lesson = sample_lesson(self.third, "Third 101",
+                                          instructor)
+
+        for lesson in (self.own_lesson, self.other_lesson):
+            ses = Session.objects.create(
+                start_time=timezone.now(),
+                end_time=timezone.now(),
+                type="TST",
+                lesson=lesson
+            )
+            Moderation.objects.create(
+                session=ses,
+                learner=self.user,
+                learner_score=5,
+                max_score=10,
+                score_type="unit"
+            )
+
+    def names(self, url, **params):
+        res = self.client.get(url, params)
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        return [row['name'] for row in res.data['results']]
+
+    def test_lessons_limited_to_member_schools(self):
+        names = self.names(reverse('school:lesson-list'))
+
+        self.assertEquals(sorted(names), ["Own 101", "Third 101"])
+
+    def test_nested_relations_scoped(self):
+        res = self.client.get(reverse('school:moderation-list'))
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(len(res.data['results']), 1)
+
+        res = self.client.get(reverse('school:session-list'))
+        self.assertEquals([row['lesson'] for row in res.data['results']],
+                          [self.own_lesson.id])
+
+    def test_school_filter(self):
+        names = self.names(reverse('school:lesson-list'), school=self.third.id)
+
+        self.assertEquals(names, ["Third 101"])
+
+    def test_school_filter_cannot_escape_membership(self):
+        names = self.names(reverse('school:lesson-list'), school=self.other.id)
+
+        self.assertEquals(names, [])
+
+    def test_school_filter_invalid(self):
+        res = self.client.get(reverse('school:subject-list'), {'school': 'x'})
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_superuser_sees_every_school(self):
+        self.user.is_superuser = True
+        self.user.save()
+
+        names = self.names(reverse('school:lesson-list'))
+
+        self.assertEquals(len(names), 3)
@@ -208,10 +208,15 @@ class TestPrivateSessionApi(TestCase):
             lesson=les
         )
 
+        auth_user = get_user_model().objects.get(
+            email="testuser@bondeveloper.com"
+        )
+        sch.users.add(auth_user)
+
         res = self.client.get(reverse('school:session-list'))
 
         self.assertEquals(res.status_code, status.HTTP_200_OK)
-        self.assertEquals(len(res.data), 2)
+        self.assertEquals(len(res.data['results']), 2)
 
     def test_session_delete_api(self):
         instructor = get_user_model().objects.create(
@@ -127,9 +127,15 @@ class SubjectPrivateApi(TestCase):
             school=s2
         )
 
+        auth_user = get_user_model().objects.get(
+            email="testuser@bondeveloper.com"
+        )
+        s1.users.add(auth_user)
+        s2.users.add(auth_user)
+
         res = self.client.get(subject_list_url)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEquals(len(res.data), 2)
+        self.assertEquals(len(res.data['results']), 2)
 
     def test_subject_update_successful(self):
         subject = sample_subject()
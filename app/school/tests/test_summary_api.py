@@ -0,0 +1,86 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import School, Subject, Level, Lesson, Session, Moderation
+
+
+reg_url = '/api/v1/accounts/auth/registration/'
+summary_url = reverse('school:moderation-summary-list')
+
+
+class TestScoreSummaryApi(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password": "Qwerty!@#",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01"
+        }
+
+        auth_user = self.client.post(reg_url, payload, format='json')
+
+        access_token = auth_user.data.get('access_token')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.user = get_user_model().objects.get(email=payload['email'])
+
+        sch = School.objects.create(basename="gruut-high", name="Gruut High")
+        sch.users.add(self.user)
+        self.subject = Subject.objects.create(basename="spanish-fal",
+                                              name="Spanish FAL", school=sch)
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=sch)
+        lesson = Lesson.objects.create(subject=self.subject, level=level,
+                                       instructor=self.user,
+                                       name="Python 101")
+        self.session = Session.objects.create(start_time=timezone.now(),
+                                              end_time=timezone.now(),
+                                              type="TCN", lesson=lesson)
+
+    def test_moderation_api_keeps_summary_current(self):
+        url = reverse('school:moderation-create')
+        for score in (4, 8):
+            self.client.post(url, {
+                "session": self.session.id, "learner": self.user.id,
+                "learner_score": score, "max_score": 10,
+                "score_type": "unit"
+            }, format='json')
+
+        res = self.client.get(summary_url, {'learner': self.user.id})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(len(res.data['results']), 1)
+        self.assertEquals(res.data['results'][0]['subject'], self.subject.id)
+        self.assertEquals(res.data['results'][0]['count'], 2)
+        self.assertEquals(res.data['results'][0]['average'], 60)
+
+    def test_report_does_not_join_moderations(self):
+        Moderation.objects.create(session=self.session, learner=self.user,
+                                  learner_score=5, max_score=10,
+                                  score_type="unit")
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(summary_url, {'subject': self.subject.id})
+
+        self.assertEquals(len(res.data['results']), 1)
+        self.assertFalse([q for q in ctx.captured_queries
+                          if 'core_moderation' in q['sql']])
+
+    def test_other_schools_excluded(self):
+        Moderation.objects.create(session=self.session, learner=self.user,
+                                  learner_score=5, max_score=10,
+                                  score_type="unit")
+        School.objects.get().users.remove(self.user)
+
+        res = self.client.get(summary_url)
+
+        self.assertEquals(res.data['results'], [])
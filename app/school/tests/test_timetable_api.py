@@ -0,0 +1,101 @@
+from datetime import datetime
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import School, Subject, Level, Lesson, Session
+
+
+reg_url = '/api/v1/accounts/auth/registration/'
+session_create_url = reverse('school:session-create')
+
+
+def at(hour):
+    return timezone.make_aware(datetime(2020, 11, 2, hour))
+
+
+class TestTimetableClashApi(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password": "Qwerty!@#",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01"
+        }
+
+        auth_user = self.client.post(reg_url, payload, format='json')
+
+        access_token = auth_user.data.get('access_token')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.user = get_user_model().objects.get(email=payload['email'])
+
+        sch = School.objects.create(basename="gruut-high", name="Gruut High")
+        sub = Subject.objects.create(basename="spanish-fal",
+                                     name="Spanish FAL", school=sch)
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=sch)
+        self.lesson = Lesson.objects.create(subject=sub, level=level,
+                                            instructor=self.user,
+                                            name="Python 101")
+        self.stored = Session.objects.create(start_time=at(9),
+                                             end_time=at(11), type="TCN",
+                                             lesson=self.lesson)
+
+    def payload(self, start, end):
+        return {"start_time": at(start), "end_time": at(end), "type": "LCT",
+                "lesson": self.lesson.id}
+
+    def test_clashing_session_rejected(self):
+        res = self.client.post(session_create_url, self.payload(10, 12),
+                               format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('session %d' % self.stored.id,
+                      res.data['non_field_errors'][0])
+        self.assertEquals(Session.objects.count(), 1)
+
+    def test_following_session_accepted(self):
+        res = self.client.post(session_create_url, self.payload(11, 12),
+                               format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+
+    def test_update_into_clash_rejected(self):
+        other = Session.objects.create(start_time=at(12), end_time=at(13),
+                                       type="TCN", lesson=self.lesson)
+        url = reverse('school:session-update', args=[other.id])
+
+        res = self.client.patch(url, {"start_time": at(10)}, format='json')
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.patch(url, {"type": "XM"}, format='json')
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+
+    def test_existing_clash_does_not_block_other_edits(self):
+        other = Session.objects.create(start_time=at(10), end_time=at(12),
+                                       type="TCN", lesson=self.lesson)
+        url = reverse('school:session-update', args=[other.id])
+
+        res = self.client.patch(url, {"type": "XM"}, format='json')
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.patch(url, {"end_time": at(13)}, format='json')
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_clash_within_batch_reported_per_item(self):
+        res = self.client.post(session_create_url, [
+            self.payload(12, 14), self.payload(15, 16), self.payload(13, 14)
+        ], format='json')
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('item 2', res.data[0]['non_field_errors'][0])
+        self.assertEquals(res.data[1], {})
+        self.assertIn('item 0', res.data[2]['non_field_errors'][0])
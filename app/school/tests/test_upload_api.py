@@ -0,0 +1,196 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import School, Subject, Level, Lesson, Session, \
+                        Attachment, Upload
+from core.uploads import upload_dir
+
+
+reg_url = '/api/v1/accounts/auth/registration/'
+MEDIA_ROOT = tempfile.mkdtemp()
+CONTENT = b'0123456789'
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, UPLOAD_CHUNK_SIZE=4,
+                   UPLOAD_MAX_SIZE=100)
+class TestAttachmentUploadApi(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = APIClient()
+
+        payload = {
+            "email": "testuser@bondeveloper.com",
+            "password": "Qwerty!@#",
+            "password1": "Qwerty!@#",
+            "password2": "Qwerty!@#",
+            "username": "testuser01"
+        }
+
+        auth_user = self.client.post(reg_url, payload, format='json')
+
+        access_token = auth_user.data.get('access_token')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.user = get_user_model().objects.get(email=payload['email'])
+
+        sch = School.objects.create(basename="gruut-high", name="Gruut High")
+        sub = Subject.objects.create(basename="spanish-fal",
+                                     name="Spanish FAL", school=sch)
+        level = Level.objects.create(basename="grade-9", name="Grade 9",
+                                     school=sch)
+        les = Lesson.objects.create(subject=sub, level=level,
+                                    instructor=self.user, name="Python 101")
+        self.session = Session.objects.create(start_time=timezone.now(),
+                                              end_time=timezone.now(),
+                                              type="LCT", lesson=les)
+
+    def start(self, size=len(CONTENT), **payload):
+        return self.client.post(reverse('school:upload-create'), dict({
+            "session": self.session.id,
+            "notes": "Week 1 recording",
+            "filename": "week1.mp4",
+            "size": size,
+        }, **payload), format='json')
+
+    def upload(self, **payload):
+        pk = self.start(**payload).data['id']
+        for number in range(3):
+            self.send(pk, number, CONTENT[number * 4:number * 4 + 4])
+        return self.complete(pk)
+
+    def send(self, pk, number, data):
+        return self.client.put(reverse('school:upload-part',
+                                       args=[pk, number]),
+                               data, content_type='application/octet-stream')
+
+    def complete(self, pk):
+        return self.client.post(reverse('school:upload-complete', args=[pk]))
+
+    def test_parts_assembled_into_attachment(self):
+        res = self.start()
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        self.assertEquals(res.data['parts'], 3)
+        pk = res.data['id']
+
+        # parts may come in any order
+        for number in (2, 0, 1):
+            res = self.send(pk, number, CONTENT[number * 4:number * 4 + 4])
+            self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data['received'], [0, 1, 2])
+
+        res = self.complete(pk)
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        self.assertEquals(res.data['notes'], 'Week 1 recording')
+        attachment = Attachment.objects.get(pk=res.data['id'])
+        with attachment.file.open('rb') as fp:
+            self.assertEquals(fp.read(), CONTENT)
+        self.assertFalse(Upload.objects.exists())
+        self.assertFalse(os.path.exists(os.path.join(
+            MEDIA_ROOT, 'uploads', str(pk)
+        )))
+
+    def test_resume_after_broken_part(self):
+        pk = self.start().data['id']
+        self.send(pk, 0, CONTENT[:4])
+
+        res = self.send(pk, 1, CONTENT[4:6])
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.send(pk, 2, CONTENT[8:] + b'!')
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(reverse('school:upload-view', args=[pk]))
+        self.assertEquals(res.data['received'], [0])
+        self.assertEquals(os.listdir(upload_dir(Upload(pk=pk))), ['0.part'])
+
+        res = self.complete(pk)
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEquals(Attachment.objects.count(), 0)
+
+        self.send(pk, 1, CONTENT[4:8])
+        self.send(pk, 2, CONTENT[8:])
+        self.assertEquals(self.complete(pk).status_code,
+                          status.HTTP_201_CREATED)
+
+    def test_part_out_of_range(self):
+        pk = self.start().data['id']
+
+        res = self.send(pk, 3, CONTENT[:4])
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_size_limited(self):
+        self.assertEquals(self.start(size=0).status_code,
+                          status.HTTP_400_BAD_REQUEST)
+        self.assertEquals(self.start(size=101).status_code,
+                          status.HTTP_400_BAD_REQUEST)
+
+    def test_uploads_private_to_their_user(self):
+        other = get_user_model().objects.create_user(
+            email="other@bondeveloper.com", password="Qwerty!@#"
+        )
+        upload = Upload.objects.create(user=other, session=self.session,
+                                       filename="notes.pdf", size=4,
+                                       chunk_size=4)
+
+        res = self.send(upload.pk, 0, CONTENT[:4])
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_abandoned_uploads_purged(self):
+        pk = self.start().data['id']
+        self.send(pk, 0, CONTENT[:4])
+        fresh = self.start().data['id']
+        Upload.objects.filter(pk=pk).update(
+            created_at=timezone.now() - timedelta(days=8)
+        )
+
+        call_command('purge_uploads', stdout=io.StringIO())
+
+        self.assertEquals(list(Upload.objects.values_list('id', flat=True)),
+                          [fresh])
+        self.assertFalse(os.path.exists(upload_dir(Upload(pk=pk))))
+
+    def test_known_file_not_sent_again(self):
+        self.session.lesson.subject.school.users.add(self.user)
+        first = self.upload()
+        digest = hashlib.sha256(CONTENT).hexdigest()
+
+        res = self.start(digest=digest.upper())
+        self.assertTrue(res.data['known'])
+        res = self.complete(res.data['id'])
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        second = Attachment.objects.get(pk=res.data['id'])
+        self.assertEquals(second.file.name,
+                          Attachment.objects.get(pk=first.data['id'])
+                                            .file.name)
+        self.assertTrue(second.file.name.startswith('blobs/'))
+
+    def test_hash_alone_gives_no_access(self):
+        # the file is only attached in a school the user is not in
+        self.upload()
+        digest = hashlib.sha256(CONTENT).hexdigest()
+
+        res = self.start(digest=digest)
+        self.assertFalse(res.data['known'])
+        res = self.complete(res.data['id'])
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEquals(Attachment.objects.count(), 1)
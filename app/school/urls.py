@@ -30,6 +30,10 @@ urlpatterns = [
           name="delete"),
      path('<int:pk>/view/', views.SchoolRetrieveAPIView.as_view(),
           name="view"),
+     path('<int:pk>/changes/', views.SchoolChangesAPIView.as_view(),
+          name="changes"),
+     path('<int:pk>/import/', views.SchoolRosterImportAPIView.as_view(),
+          name="import"),
 
      # Subject urls
      path('subjects/create/', views.SubjectCreateAPIView.as_view(),
@@ -66,6 +70,8 @@ urlpatterns = [
           name='lesson-delete'),
      path('lessons/<int:pk>/view/', views.LessonRetrieveAPIView.as_view(),
           name='lesson-view'),
+     path('lessons/enrolments/', views.LessonEnrolmentBulkAPIView.as_view(),
+          name='lesson-enrolment'),
 
      path('sessions/', views.SessionListAPIView.as_view(),
           name='session-list'),
@@ -77,6 +83,37 @@ urlpatterns = [
           name='session-delete'),
      path('sessions/<int:pk>/view/', views.SessionRetrieveAPIView.as_view(),
           name='session-view'),
+     path('sessions/attendance/',
+          views.SessionAttendanceBulkAPIView.as_view(),
+          name='session-attendance'),
+     path('sessions/attendance/export/',
+          views.SessionAttendanceExportAPIView.as_view(),
+          name='session-attendance-export'),
+
+     path('sessions/calendar/', views.SessionCalendarAPIView.as_view(),
+          name='session-calendar'),
+
+     path('calendar/', views.CalendarFeedLinkAPIView.as_view(),
+          name='calendar-link'),
+     path('calendar/<str:key>.ics', views.CalendarFeedAPIView.as_view(),
+          name='calendar-feed'),
+
+     path('series/', views.SessionSeriesListAPIView.as_view(),
+          name='series-list'),
+     path('series/create/', views.SessionSeriesCreateAPIView.as_view(),
+          name='series-create'),
+     path('series/<int:pk>/update/',
+          views.SessionSeriesUpdateAPIView.as_view(),
+          name='series-update'),
+     path('series/<int:pk>/delete/',
+          views.SessionSeriesDestroyAPIView.as_view(),
+          name='series-delete'),
+     path('series/<int:pk>/view/',
+          views.SessionSeriesRetrieveAPIView.as_view(),
+          name='series-view'),
+     path('series/<int:pk>/materialize/',
+          views.SessionSeriesMaterializeAPIView.as_view(),
+          name='series-materialize'),
 
      path('attachments/', views.AttachmentListAPIView.as_view(),
           name='attachment-list'),
@@ -91,9 +128,37 @@ urlpatterns = [
      path('attachments/<int:pk>/view/',
           views.AttachmentRetrieveAPIView.as_view(),
           name='attachment-view'),
+     path('attachments/<int:pk>/download/',
+          views.AttachmentDownloadAPIView.as_view(),
+          name='attachment-download'),
+     path('attachments/<int:pk>/thumbnail/',
+          views.AttachmentThumbnailAPIView.as_view(),
+          name='attachment-thumbnail'),
+     path('attachments/uploads/create/',
+          views.AttachmentUploadCreateAPIView.as_view(),
+          name='upload-create'),
+     path('attachments/uploads/<int:pk>/view/',
+          views.AttachmentUploadRetrieveAPIView.as_view(),
+          name='upload-view'),
+     path('attachments/uploads/<int:pk>/delete/',
+          views.AttachmentUploadDestroyAPIView.as_view(),
+          name='upload-delete'),
+     path('attachments/uploads/<int:pk>/parts/<int:number>/',
+          views.AttachmentUploadPartAPIView.as_view(),
+          name='upload-part'),
+     path('attachments/uploads/<int:pk>/complete/',
+          views.AttachmentUploadCompleteAPIView.as_view(),
+          name='upload-complete'),
 
      path('moderations/', views.ModerationListAPIView.as_view(),
           name='moderation-list'),
+     path('moderations/analytics/',
+          views.ModerationAnalyticsAPIView.as_view(),
+          name='moderation-analytics'),
+     path('moderations/summaries/', views.ScoreSummaryListAPIView.as_view(),
+          name='moderation-summary-list'),
+     path('moderations/export/', views.ModerationExportAPIView.as_view(),
+          name='moderation-export'),
      path('moderations/create/', views.ModerationCreateAPIView.as_view(),
           name='moderation-create'),
      path('moderations/<int:pk>/update/',
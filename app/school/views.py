@@ -1,9 +1,127 @@
-from rest_framework import generics
+import codecs
+import io
+import mimetypes
+import os
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.encoding import escape_uri_path
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import generics, status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
 
 import school.serializers as CustomSerializers
+from school.analytics import gradebook, TOP_LEARNERS, MAX_TOP_LEARNERS
+from school.downloads import file_response
+from school.imports import RosterImporter
+from school.renderers import CSVRenderer, NDJSONRenderer, \
+                             IgnoreAcceptNegotiation
+from school.mixins import SchoolScopedMixin, BulkCreateMixin, \
+                          ConditionalGetMixin, CachedListMixin
 from core.models import Category, School, Subject, Level, Lesson, Session, \
-                       Attachment,  Moderation
+                       Attachment,  Moderation, Profile, Tombstone, \
+                       ScoreSummary, SessionSeries, Upload
+from core.feeds import feed_key, feed_user_id, feed_version, ics
+from core.sync import SCHOOL_FIELDS, dump_cursor, load_cursor, page, \
+                      stamp
+from core.timetable import sessions_between
+from core.blobs import known
+from core.uploads import assemble, missing, write_part
+
+
+def user_ids():
+    """only the key is rendered for M2M user fields, so only load that"""
+    return get_user_model().objects.only('id')
+
+
+class BulkRelationAPIView(generics.GenericAPIView):
+    """POST add/remove pairs to a BulkRelationSerializer, returns counts"""
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.save())
+
+
+class ExportAPIView(SchoolScopedMixin, generics.GenericAPIView):
+    """
+    Stream every matching row as CSV (the default) or NDJSON, chosen with
+    ``?format=`` or the Accept header. Rows are read with iterator(), a
+    server-side cursor on Postgres, so memory use does not grow with the
+    size of the export.
+
+    Besides ``?school=``, rows can be filtered with ``?lesson=<id>`` and
+    by session date with ``?from=`` / ``?to=`` (YYYY-MM-DD, inclusive).
+
+    Subclasses set ``columns``, pairs of a header and a values() lookup.
+    """
+    renderer_classes = (CSVRenderer, NDJSONRenderer)
+    columns = ()
+    ordering = ('pk',)
+    lesson_field = 'session__lesson'
+    start_field = 'session__start_time'
+    chunk_size = 2000
+    filename = 'export'
+
+    def get_date(self, name):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        try:
+            value = parse_date(value)
+        except ValueError:
+            value = None
+        if value is None:
+            raise ValidationError({name: 'A YYYY-MM-DD date is required.'})
+        return timezone.make_aware(datetime.combine(value, time.min))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        lesson = self.request.query_params.get('lesson')
+        if lesson is not None:
+            if not lesson.isdigit():
+                raise ValidationError({'lesson': 'A valid id is required.'})
+            queryset = queryset.filter(**{self.lesson_field: lesson})
+
+        start = self.get_date('from')
+        if start is not None:
+            queryset = queryset.filter(**{self.start_field + '__gte': start})
+        end = self.get_date('to')
+        if end is not None:
+            queryset = queryset.filter(
+                **{self.start_field + '__lt': end + timedelta(days=1)}
+            )
+
+        return queryset.order_by(*self.ordering)
+
+    def get(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        rows = self.get_queryset().values_list(
+            *[lookup for _, lookup in self.columns]
+        ).iterator(chunk_size=self.chunk_size)
+
+        response = StreamingHttpResponse(
+            renderer.stream([header for header, _ in self.columns], rows),
+            content_type='%s; charset=%s' % (renderer.media_type,
+                                             renderer.charset)
+        )
+        response['Content-Disposition'] = 'attachment; filename="%s.%s"' % (
+            self.filename, renderer.format
+        )
+        return response
 
 
 class CategoryCreateAPIView(generics.CreateAPIView):
@@ -15,14 +133,17 @@ class CategoryUpdateAPIView(generics.UpdateAPIView):
     serializer_class = CustomSerializers.CategorySerializer
 
 
-class CategoryListAPIView(generics.ListAPIView):
+class CategoryListAPIView(ConditionalGetMixin, generics.ListAPIView):
     queryset = Category.objects.all()
     serializer_class = CustomSerializers.CategorySerializer
+    version_models = (Category,)
 
-class CategoryPublicListAPIView(generics.ListAPIView):
+
+class CategoryPublicListAPIView(CachedListMixin, generics.ListAPIView):
     queryset = Category.objects.all()
     serializer_class = CustomSerializers.CategoryPublicSerializer
     permission_classes = (AllowAny,)
+    version_models = (Category,)
 
 
 class CategoryDestroyAPIView(generics.DestroyAPIView):
@@ -30,9 +151,10 @@ class CategoryDestroyAPIView(generics.DestroyAPIView):
     serializer_class = CustomSerializers.CategorySerializer
 
 
-class CategoryRetrieveAPIView(generics.RetrieveAPIView):
+class CategoryRetrieveAPIView(ConditionalGetMixin, generics.RetrieveAPIView):
     queryset = Category.objects.all()
     serializer_class = CustomSerializers.CategorySerializer
+    version_models = (Category,)
 
 
 class SchoolCreateAPIView(generics.CreateAPIView):
@@ -40,15 +162,17 @@ class SchoolCreateAPIView(generics.CreateAPIView):
     permission_classes = (AllowAny,)
 
 
-class SchoolListAPIView(generics.ListAPIView):
-    queryset = School.objects.all()
+class SchoolListAPIView(ConditionalGetMixin, generics.ListAPIView):
+    queryset = School.objects.prefetch_related('users')
     serializer_class = CustomSerializers.SchoolSerializer
+    version_models = (School, Profile, get_user_model())
 
 
-class SchoolPublicListAPIView(generics.ListAPIView):
+class SchoolPublicListAPIView(CachedListMixin, generics.ListAPIView):
     queryset = School.objects.all()
     serializer_class = CustomSerializers.SchoolPublicSerializer
     permission_classes = (AllowAny,)
+    version_models = (School,)
 
 
 class SchoolUpdateAPIView(generics.UpdateAPIView):
@@ -61,23 +185,176 @@ class SchoolDeleteAPIView(generics.DestroyAPIView):
     serializer_class = CustomSerializers.SchoolSerializer
 
 
-class SchoolRetrieveAPIView(generics.RetrieveAPIView):
-    queryset = School.objects.all()
+class SchoolRetrieveAPIView(ConditionalGetMixin, generics.RetrieveAPIView):
+    queryset = School.objects.prefetch_related('users')
     serializer_class = CustomSerializers.SchoolSerializer
+    version_models = (School, Profile, get_user_model())
+
+
+class SchoolChangesAPIView(SchoolScopedMixin, generics.GenericAPIView):
+    """
+    What changed in one of the user's schools after ``?since=``, an ISO 8601
+    watermark: the rows saved since then and the ids of rows deleted since
+    then, keyed by type. Without ``since`` every row is sent.
+
+    At most ``page_size`` rows of each type, and ids of deleted rows, come
+    in a response. When more are left it has a ``next`` cursor, to be
+    passed as ``?cursor=`` for the following page.
+
+    Clients pass the returned ``watermark`` as ``since`` on their next
+    sync, once every page is read. It trails the clock a little, so a row
+    may be sent twice but none is missed. Deletions are only kept
+    ``SYNC_TOMBSTONE_DAYS``, so an older ``since`` is refused and the
+    client has to sync everything again.
+    """
+    queryset = School.objects.all()
+    school_field = 'pk'
+    page_size = 500
+    feed = (
+        ('subjects', Subject.objects.all(),
+         CustomSerializers.SubjectSerializer),
+        ('levels', Level.objects.all(), CustomSerializers.LevelSerializer),
+        ('lessons', Lesson.objects.prefetch_related(
+            Prefetch('learners', queryset=user_ids())
+         ), CustomSerializers.LessonSerializer),
+        ('sessions', Session.objects.prefetch_related(
+            Prefetch('attendance', queryset=user_ids())
+         ), CustomSerializers.SessionSerializer),
+        ('series', SessionSeries.objects.all(),
+         CustomSerializers.SessionSeriesSerializer),
+        ('attachments', Attachment.objects.all(),
+         CustomSerializers.AttachmentSerializer),
+        ('moderations', Moderation.objects.all(),
+         CustomSerializers.ModerationSerializer),
+    )
+
+    def get_since(self):
+        since = self.request.query_params.get('since')
+        if since is None:
+            return None
+        try:
+            since = parse_datetime(since)
+        except ValueError:
+            since = None
+        if since is None:
+            raise ValidationError(
+                {'since': 'An ISO 8601 date and time is required.'}
+            )
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
+
+    def get_cursor(self):
+        """``(since, watermark, positions)`` of the page to send"""
+        cursor = self.request.query_params.get('cursor')
+        if cursor is None:
+            watermark = timezone.now() - timedelta(
+                seconds=settings.SYNC_WATERMARK_LAG
+            )
+            return self.get_since(), watermark, {}
+        cursor = load_cursor(cursor)
+        if cursor is None:
+            raise ValidationError(
+                {'cursor': 'A cursor from a previous page is required.'}
+            )
+        return cursor
+
+    def check_since(self, since):
+        """refuse a ``since`` older than the tombstones that are kept"""
+        kept = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+        if since is not None and since < kept:
+            raise ValidationError({'since': (
+                'Deletions are kept for %d days; sync again without since.'
+                % settings.SYNC_TOMBSTONE_DAYS
+            )})
+
+    def get(self, request, *args, **kwargs):
+        school = self.get_object()
+        since, watermark, positions = self.get_cursor()
+        self.check_since(since)
+        done = {name for name, position in positions.items()
+                if position is None}
+
+        # where each type stopped, None once it is all sent
+        following = {}
+        changed = {}
+        names = {}
+        for name, queryset, serializer_class in self.feed:
+            model = queryset.model
+            names[model._meta.model_name] = name
+            changed[name] = []
+            following[name] = None
+            if name in done:
+                continue
+            queryset = queryset.filter(**{SCHOOL_FIELDS[model]: school})
+            if since is not None:
+                queryset = queryset.filter(updated_at__gt=since)
+            rows, following[name] = page(queryset, 'updated_at',
+                                         positions.get(name), self.page_size)
+            changed[name] = serializer_class(
+                rows, many=True, context=self.get_serializer_context()
+            ).data
+
+        deleted = defaultdict(list)
+        following['deleted'] = None
+        if since is not None and 'deleted' not in done:
+            tombstones, following['deleted'] = page(
+                Tombstone.objects.filter(school_id=school.pk,
+                                         deleted_at__gt=since),
+                'deleted_at', positions.get('deleted'), self.page_size
+            )
+            for tombstone in tombstones:
+                deleted[names[tombstone.model]].append(tombstone.object_id)
+
+        data = {'watermark': stamp(watermark),
+                'changed': changed,
+                'deleted': {name: deleted[name] for name in changed}}
+        if any(position is not None for position in following.values()):
+            data['next'] = dump_cursor(since, watermark, following)
+        return Response(data)
+
+
+class SchoolRosterImportAPIView(SchoolScopedMixin, generics.GenericAPIView):
+    """
+    Import learners, lessons and enrolments into one of the user's schools
+    from an uploaded CSV ``file`` (see school.imports). New lessons get the
+    requesting user as instructor. Responds with the import report; rows
+    with errors are listed there and skipped, as is the row a file that
+    cannot be read further stops at.
+    """
+    queryset = School.objects.all()
+    school_field = 'pk'
+    parser_classes = (MultiPartParser,)
+
+    def post(self, request, *args, **kwargs):
+        school = self.get_object()
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'A CSV file is required.'})
+
+        importer = RosterImporter(school, request.user)
+        try:
+            report = importer.run(codecs.iterdecode(upload, 'utf-8-sig'))
+        except DjangoValidationError as exc:
+            raise ValidationError({'file': exc.messages})
+        return Response(report)
 
 
-class SubjectCreateAPIView(generics.CreateAPIView):
+class SubjectCreateAPIView(BulkCreateMixin, generics.CreateAPIView):
     serializer_class = CustomSerializers.SubjectSerializer
 
 
-class SubjectListAPIView(generics.ListAPIView):
+class SubjectListAPIView(ConditionalGetMixin, SchoolScopedMixin,
+                         generics.ListAPIView):
     queryset = Subject.objects.all()
     serializer_class = CustomSerializers.SubjectSerializer
+    version_models = (Subject, Profile)
 
 
-class SubjectRetrieveAPIView(generics.RetrieveAPIView):
+class SubjectRetrieveAPIView(ConditionalGetMixin, generics.RetrieveAPIView):
     queryset = Subject.objects.all()
     serializer_class = CustomSerializers.SubjectSerializer
+    version_models = (Subject,)
 
 
 class SubjectUpdateAPIView(generics.UpdateAPIView):
@@ -90,7 +367,7 @@ class SubjectDestroyAPIView(generics.DestroyAPIView):
     serializer_class = CustomSerializers.SubjectSerializer
 
 
-class LevelCreateAPIView(generics.CreateAPIView):
+class LevelCreateAPIView(BulkCreateMixin, generics.CreateAPIView):
     serializer_class = CustomSerializers.LevelSerializer
 
 
@@ -99,9 +376,11 @@ class LevelUpdateAPIView(generics.UpdateAPIView):
     serializer_class = CustomSerializers.LevelSerializer
 
 
-class LevelListAPIView(generics.ListAPIView):
+class LevelListAPIView(ConditionalGetMixin, SchoolScopedMixin,
+                       generics.ListAPIView):
     queryset = Level.objects.all()
     serializer_class = CustomSerializers.LevelSerializer
+    version_models = (Level, Profile)
 
 
 class LevelDestroyAPIView(generics.DestroyAPIView):
@@ -109,23 +388,33 @@ class LevelDestroyAPIView(generics.DestroyAPIView):
     serializer_class = CustomSerializers.LevelSerializer
 
 
-class LevelRetrieveAPIView(generics.RetrieveAPIView):
+class LevelRetrieveAPIView(ConditionalGetMixin, generics.RetrieveAPIView):
     queryset = Level.objects.all()
     serializer_class = CustomSerializers.LevelSerializer
+    version_models = (Level,)
 
 
-class LessonCreateAPIView(generics.CreateAPIView):
+class LessonCreateAPIView(BulkCreateMixin, generics.CreateAPIView):
     serializer_class = CustomSerializers.LessonSerializer
 
+    def perform_create(self, serializer):
+        serializer.save(instructor=self.request.user)
+
 
 class LessonUpdateAPIView(generics.UpdateAPIView):
     queryset = Lesson.objects.all()
     serializer_class = CustomSerializers.LessonSerializer
 
 
-class LessonListAPIView(generics.ListAPIView):
-    queryset = Lesson.objects.all()
+class LessonListAPIView(ConditionalGetMixin, SchoolScopedMixin,
+                        generics.ListAPIView):
+    queryset = Lesson.objects.prefetch_related(
+        Prefetch('learners', queryset=user_ids())
+    )
     serializer_class = CustomSerializers.LessonSerializer
+    school_field = 'subject__school'
+    version_models = (Lesson, Lesson.learners.through, Subject,
+                      Profile)
 
 
 class LessonDestroyAPIView(generics.DestroyAPIView):
@@ -133,17 +422,31 @@ class LessonDestroyAPIView(generics.DestroyAPIView):
     serializer_class = CustomSerializers.LessonSerializer
 
 
-class LessonRetrieveAPIView(generics.RetrieveAPIView):
-    queryset = Lesson.objects.all()
+class LessonRetrieveAPIView(ConditionalGetMixin, generics.RetrieveAPIView):
+    queryset = Lesson.objects.prefetch_related(
+        Prefetch('learners', queryset=user_ids())
+    )
     serializer_class = CustomSerializers.LessonSerializer
+    version_models = (Lesson, Lesson.learners.through)
 
 
-class SessionListAPIView(generics.ListAPIView):
-    queryset = Session.objects.all()
+class LessonEnrolmentBulkAPIView(BulkRelationAPIView):
+    serializer_class = CustomSerializers.EnrolmentBulkSerializer
+
+
+class SessionListAPIView(ConditionalGetMixin, SchoolScopedMixin,
+                         generics.ListAPIView):
+    queryset = Session.objects.prefetch_related(
+        Prefetch('attendance', queryset=user_ids())
+    )
     serializer_class = CustomSerializers.SessionSerializer
+    pagination_ordering = ('start_time', 'id')
+    school_field = 'lesson__subject__school'
+    version_models = (Session, Session.attendance.through, Lesson,
+                      Subject, Profile)
 
 
-class SessionCreateAPIView(generics.CreateAPIView):
+class SessionCreateAPIView(BulkCreateMixin, generics.CreateAPIView):
     serializer_class = CustomSerializers.SessionSerializer
 
 
@@ -157,14 +460,225 @@ class SessionDestroyAPIView(generics.DestroyAPIView):
     serializer_class = CustomSerializers.SessionSerializer
 
 
-class SessionRetrieveAPIView(generics.RetrieveAPIView):
-    queryset = Session.objects.all()
+class SessionRetrieveAPIView(ConditionalGetMixin, generics.RetrieveAPIView):
+    queryset = Session.objects.prefetch_related(
+        Prefetch('attendance', queryset=user_ids())
+    )
     serializer_class = CustomSerializers.SessionSerializer
-
-
-class AttachmentListAPIView(generics.ListAPIView):
+    version_models = (Session, Session.attendance.through)
+
+
+class SessionAttendanceBulkAPIView(BulkRelationAPIView):
+    serializer_class = CustomSerializers.AttendanceBulkSerializer
+
+
+class SessionAttendanceExportAPIView(ExportAPIView):
+    """one row per learner present at a session"""
+    queryset = Session.attendance.through.objects.all()
+    school_field = 'session__lesson__subject__school'
+    ordering = ('session', 'user')
+    filename = 'attendance'
+    columns = (
+        ('session', 'session_id'),
+        ('lesson', 'session__lesson_id'),
+        ('start_time', 'session__start_time'),
+        ('end_time', 'session__end_time'),
+        ('type', 'session__type'),
+        ('learner', 'user_id'),
+        ('learner_email', 'user__email'),
+    )
+
+
+class SessionSeriesCreateAPIView(generics.CreateAPIView):
+    serializer_class = CustomSerializers.SessionSeriesSerializer
+
+
+class SessionSeriesListAPIView(ConditionalGetMixin, SchoolScopedMixin,
+                               generics.ListAPIView):
+    queryset = SessionSeries.objects.all()
+    serializer_class = CustomSerializers.SessionSeriesSerializer
+    school_field = 'lesson__subject__school'
+    version_models = (SessionSeries, Lesson, Subject, Profile)
+
+
+class SessionSeriesUpdateAPIView(generics.UpdateAPIView):
+    queryset = SessionSeries.objects.all()
+    serializer_class = CustomSerializers.SessionSeriesSerializer
+
+
+class SessionSeriesDestroyAPIView(generics.DestroyAPIView):
+    queryset = SessionSeries.objects.all()
+    serializer_class = CustomSerializers.SessionSeriesSerializer
+
+
+class SessionSeriesRetrieveAPIView(ConditionalGetMixin,
+                                   generics.RetrieveAPIView):
+    queryset = SessionSeries.objects.all()
+    serializer_class = CustomSerializers.SessionSeriesSerializer
+    version_models = (SessionSeries,)
+
+
+class SessionSeriesMaterializeAPIView(generics.GenericAPIView):
+    """
+    POST ``{"occurrence": <start>}`` to get the stored Session of one
+    occurrence of a series, e.g. to record attendance for it. The session
+    is created the first time.
+    """
+    queryset = SessionSeries.objects.all()
+    serializer_class = CustomSerializers.OccurrenceSerializer
+
+    def get_serializer_context(self):
+        return dict(super().get_serializer_context(),
+                    series=self.get_object())
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session = serializer.context['series'].materialize(
+            serializer.validated_data['occurrence']
+        )
+        return Response(CustomSerializers.SessionSerializer(session).data)
+
+
+class SessionCalendarAPIView(ConditionalGetMixin, SchoolScopedMixin,
+                             generics.ListAPIView):
+    """
+    The sessions in the user's schools overlapping ``?from=`` to ``?to=``
+    (YYYY-MM-DD, inclusive, at most ``max_days`` apart), stored ones and
+    the not yet stored occurrences of series, ordered by start. Narrow
+    with ``?lesson=``. Occurrences have no id; their ``series`` and
+    ``occurrence`` identify them.
+    """
+    queryset = Session.objects.prefetch_related(
+        Prefetch('attendance', queryset=user_ids())
+    )
+    serializer_class = CustomSerializers.SessionSerializer
+    school_field = 'lesson__subject__school'
+    version_models = (Session, Session.attendance.through, SessionSeries,
+                      Lesson, Subject, Profile)
+    max_days = 366
+
+    def get_day(self, name):
+        value = self.request.query_params.get(name)
+        try:
+            value = parse_date(value or '')
+        except ValueError:
+            value = None
+        if value is None:
+            raise ValidationError({name: 'A YYYY-MM-DD date is required.'})
+        return value
+
+    def filter_lesson(self, queryset):
+        lesson = self.request.query_params.get('lesson')
+        if lesson is None:
+            return queryset
+        if not lesson.isdigit():
+            raise ValidationError({'lesson': 'A valid id is required.'})
+        return queryset.filter(lesson=lesson)
+
+    def get_window(self):
+        first, last = self.get_day('from'), self.get_day('to')
+        if not 0 <= (last - first).days < self.max_days:
+            raise ValidationError(
+                {'to': 'Must be on or after from, and less than %d days '
+                       'later.' % self.max_days}
+            )
+        start = timezone.make_aware(datetime.combine(first, time.min))
+        end = timezone.make_aware(datetime.combine(last, time.min)) \
+            + timedelta(days=1)
+        return start, end
+
+    def check_request(self):
+        self.get_window()
+        self.filter_lesson(self.get_queryset())
+        return super().check_request()
+
+    def list(self, request, *args, **kwargs):
+        start, end = self.get_window()
+        sessions = sessions_between(
+            self.filter_lesson(self.get_queryset()),
+            self.filter_lesson(self.scope(SessionSeries.objects.all())),
+            start, end
+        )
+        return Response({
+            'results': self.get_serializer(sessions, many=True).data
+        })
+
+
+class CalendarFeedLinkAPIView(generics.GenericAPIView):
+    """the URL of the requesting user's iCalendar feed"""
+
+    def get(self, request, *args, **kwargs):
+        return Response({'url': request.build_absolute_uri(reverse(
+            'school:calendar-feed', args=[feed_key(request.user.pk)]
+        ))})
+
+
+class CalendarFeedAPIView(ConditionalGetMixin, generics.ListAPIView):
+    """
+    The iCalendar feed of the sessions a user teaches or is enrolled in,
+    from ``past_days`` ago to ``future_days`` ahead. The signed key in the
+    URL stands in for authentication, as calendar apps cannot log in.
+
+    Feeds are cached until a session of one of the user's lessons changes
+    (see core.feeds), and polls that send back the ETag or Last-Modified
+    get a 304 without touching the database.
+    """
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+    # calendar apps ask for text/calendar
+    content_negotiation_class = IgnoreAcceptNegotiation
+    vary_on_user = False
+    past_days = 30
+    future_days = 180
+    cache_timeout = 24 * 60 * 60
+
+    def get_version(self):
+        self.user_id = feed_user_id(self.kwargs['key'])
+        if self.user_id is None:
+            raise NotFound()
+        # the window moves every day
+        self.today = timezone.now().replace(hour=0, minute=0, second=0,
+                                            microsecond=0)
+        return max(feed_version(self.user_id), self.today.timestamp())
+
+    def check_request(self):
+        # get_version checked the key, and the feed takes no parameters
+        return None
+
+    def list(self, request, *args, **kwargs):
+        key = 'ics:%s' % self.version_tag
+        content = cache.get(key)
+        if content is None:
+            content = self.render_feed()
+            cache.set(key, content, self.cache_timeout)
+        return HttpResponse(content, content_type='text/calendar; '
+                                                  'charset=utf-8')
+
+    def render_feed(self):
+        user = get_user_model().objects.filter(pk=self.user_id).first()
+        if user is None:
+            raise NotFound()
+
+        lessons = Q(lesson__instructor=user) | Q(lesson__learners=user)
+        sessions = sessions_between(
+            Session.objects.filter(lessons).distinct()
+                           .select_related('lesson'),
+            SessionSeries.objects.filter(lessons).distinct()
+                                 .select_related('lesson'),
+            self.today - timedelta(days=self.past_days),
+            self.today + timedelta(days=self.future_days),
+        )
+        return ics(sessions, 'Timetable of %s' % user.email,
+                   self.request.get_host().split(':')[0])
+
+
+class AttachmentListAPIView(ConditionalGetMixin, SchoolScopedMixin,
+                            generics.ListAPIView):
     queryset = Attachment.objects.all()
     serializer_class = CustomSerializers.AttachmentSerializer
+    school_field = 'session__lesson__subject__school'
+    version_models = (Attachment, Session, Lesson, Subject, Profile)
 
 
 class AttachmentCreateAPIView(generics.CreateAPIView):
@@ -181,14 +695,252 @@ class AttachmentDestroyAPIView(generics.DestroyAPIView):
     serializer_class = CustomSerializers.AttachmentSerializer
 
 
-class AttachmentRetrieveAPIView(generics.RetrieveAPIView):
+class AttachmentRetrieveAPIView(ConditionalGetMixin, generics.RetrieveAPIView):
     queryset = Attachment.objects.all()
     serializer_class = CustomSerializers.AttachmentSerializer
+    version_models = (Attachment,)
+
+
+class AttachmentDownloadAPIView(SchoolScopedMixin, generics.RetrieveAPIView):
+    """
+    An attachment's file, for users of its school. Behind the proxy only
+    the permission check happens here: the X-Accel-Redirect hands the
+    request back to nginx, which sends the file from its internal media
+    location with sendfile and Range support, without going through a
+    uwsgi worker. Without it the file is sent from here (see
+    school.downloads).
+    """
+    queryset = Attachment.objects.all()
+    school_field = 'session__lesson__subject__school'
+    # clients ask for the file's own type
+    content_negotiation_class = IgnoreAcceptNegotiation
+    field = 'file'
+    filename = 'attachment'
+    disposition = 'attachment'
+
+    def retrieve(self, request, *args, **kwargs):
+        attachment = self.get_object()
+        file = getattr(attachment, self.field)
+        if not file:
+            raise NotFound()
+
+        name = file.name
+        content_type = mimetypes.guess_type(name)[0] or \
+            'application/octet-stream'
+        if settings.ATTACHMENT_ACCEL_REDIRECT:
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = escape_uri_path(
+                settings.MEDIA_URL + name
+            )
+        else:
+            response = file_response(request, file.path, content_type)
+
+        response['Content-Disposition'] = '%s; filename="%s-%d%s"' % (
+            self.disposition, self.filename, attachment.pk,
+            os.path.splitext(name)[1]
+        )
+        return response
+
+
+class AttachmentThumbnailAPIView(AttachmentDownloadAPIView):
+    """the preview image of an attachment's first page"""
+    field = 'thumbnail'
+    filename = 'thumbnail'
+    disposition = 'inline'
+
+
+class UploadMixin:
+    """uploads are only visible to the user who started them"""
+    serializer_class = CustomSerializers.UploadSerializer
+
+    def get_queryset(self):
+        return Upload.objects.filter(user=self.request.user)
+
+    def get_serializer_context(self):
+        return dict(super().get_serializer_context(),
+                    attachments=self.visible_attachments())
+
+    def visible_attachments(self):
+        """
+        Files can be reused from these only: knowing a file's hash must
+        not give access to it.
+        """
+        attachments = Attachment.objects.all()
+        if not self.request.user.is_superuser:
+            schools = Profile.objects.filter(user=self.request.user) \
+                                     .values('school_id')
+            attachments = attachments.filter(
+                session__lesson__subject__school__in=schools
+            )
+        return attachments
+
+
+class AttachmentUploadCreateAPIView(UploadMixin, generics.CreateAPIView):
+    """
+    Start a chunked upload of an attachment. The response tells how many
+    parts of ``chunk_size`` bytes to send (see core.uploads).
+    """
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user,
+                        chunk_size=settings.UPLOAD_CHUNK_SIZE)
+
+
+class AttachmentUploadRetrieveAPIView(UploadMixin, generics.RetrieveAPIView):
+    """the parts received so far, to resume an interrupted upload"""
+
+
+class AttachmentUploadDestroyAPIView(UploadMixin, generics.DestroyAPIView):
+    pass
+
+
+class AttachmentUploadPartAPIView(UploadMixin, generics.GenericAPIView):
+    """
+    Store one part, sent as the raw request body. The body is streamed to
+    disk without being parsed, so it is never held in memory. Sending a
+    part again replaces it.
+    """
+
+    def put(self, request, *args, **kwargs):
+        upload = self.get_object()
+        number = kwargs['number']
+        if number >= upload.parts:
+            raise ValidationError({'part': 'The upload has %d parts.'
+                                           % upload.parts})
+
+        expected = upload.part_size(number)
+        written = write_part(upload, number, request.stream or io.BytesIO())
+        if written != expected:
+            raise ValidationError({'part': 'Part %d must be %d bytes.'
+                                           % (number, expected)})
+        return Response(self.get_serializer(upload).data)
+
+
+class AttachmentUploadCompleteAPIView(UploadMixin, generics.GenericAPIView):
+    """
+    Join the parts into the file of a new Attachment, or reuse the stored
+    file when the upload's digest is ``known`` and parts are missing.
+    """
+
+    @transaction.atomic
+    def post(self, request, *args, **kwargs):
+        upload = self.get_object()
+        attachment = Attachment(session=upload.session, notes=upload.notes)
+
+        parts = missing(upload)
+        if not parts:
+            with assemble(upload) as file:
+                attachment.file.save(upload.filename, file)
+        else:
+            name = upload.digest and known(upload.digest,
+                                           self.visible_attachments())
+            if not name:
+                raise ValidationError({'parts': 'Parts %s are missing.'
+                                                % ', '.join(map(str, parts))})
+            attachment.file = name
+            attachment.save()
+        upload.delete()
+
+        serializer = CustomSerializers.AttachmentSerializer(
+            attachment, context=self.get_serializer_context()
+        )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def get_queryset(self):
+        # completing twice at once must not make two attachments
+        return super().get_queryset().select_for_update()
+
+
+class ModerationListAPIView(ConditionalGetMixin, SchoolScopedMixin,
+                            generics.ListAPIView):
+    queryset = Moderation.objects.all()
+    serializer_class = CustomSerializers.ModerationSerializer
+    school_field = 'session__lesson__subject__school'
+    version_models = (Moderation, Session, Lesson, Subject, Profile)
 
 
-class ModerationListAPIView(generics.ListAPIView):
+class ModerationExportAPIView(ExportAPIView):
     queryset = Moderation.objects.all()
-    serializer_class = CustomSerializers.ModerationSerializer
+    school_field = 'session__lesson__subject__school'
+    filename = 'moderations'
+    columns = (
+        ('id', 'id'),
+        ('session', 'session_id'),
+        ('lesson', 'session__lesson_id'),
+        ('start_time', 'session__start_time'),
+        ('learner', 'learner_id'),
+        ('learner_email', 'learner__email'),
+        ('learner_score', 'learner_score'),
+        ('max_score', 'max_score'),
+        ('score_type', 'score_type'),
+    )
+
+
+class ModerationAnalyticsAPIView(ConditionalGetMixin, SchoolScopedMixin,
+                                 generics.ListAPIView):
+    """
+    Gradebook statistics of the moderations in the user's schools (see
+    school.analytics), narrowed with ``?school=``, ``?lesson=`` or
+    ``?level=``. The learner ranking holds the ``?top=`` best learners,
+    TOP_LEARNERS unless asked, ``learner_count`` says how many there are.
+    """
+    queryset = Moderation.objects.all()
+    school_field = 'session__lesson__subject__school'
+    version_models = (Moderation, Session, Lesson, Subject, Profile)
+    filter_fields = {'lesson': 'session__lesson',
+                     'level': 'session__lesson__level'}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        for param, field in self.filter_fields.items():
+            value = self.request.query_params.get(param)
+            if value is None:
+                continue
+            if not value.isdigit():
+                raise ValidationError({param: 'A valid id is required.'})
+            queryset = queryset.filter(**{field: value})
+        return queryset
+
+    def get_top(self):
+        top = self.request.query_params.get('top')
+        if top is None:
+            return TOP_LEARNERS
+        if not top.isdigit() or not 0 < int(top) <= MAX_TOP_LEARNERS:
+            raise ValidationError({'top': (
+                'A number of learners from 1 to %d is required.'
+                % MAX_TOP_LEARNERS
+            )})
+        return int(top)
+
+    def check_request(self):
+        self.get_top()
+        return super().check_request()
+
+    def list(self, request, *args, **kwargs):
+        return Response(gradebook(self.get_queryset(), top=self.get_top()))
+
+
+class ScoreSummaryListAPIView(ConditionalGetMixin, SchoolScopedMixin,
+                              generics.ListAPIView):
+    """
+    Each learner's average score per subject, read from the summaries kept
+    by core.scores. Filter with ``?learner=`` and ``?subject=``.
+    """
+    queryset = ScoreSummary.objects.all()
+    serializer_class = CustomSerializers.ScoreSummarySerializer
+    school_field = 'subject__school'
+    version_models = (ScoreSummary, Subject, Profile)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        for param in ('learner', 'subject'):
+            value = self.request.query_params.get(param)
+            if value is None:
+                continue
+            if not value.isdigit():
+                raise ValidationError({param: 'A valid id is required.'})
+            queryset = queryset.filter(**{param: value})
+        return queryset
 
 
 class ModerationCreateAPIView(generics.CreateAPIView):
@@ -205,6 +957,7 @@ class ModerationDestroyAPIView(generics.DestroyAPIView):
     serializer_class = CustomSerializers.ModerationSerializer
 
 
-class ModerationRetrieveAPIView(generics.RetrieveAPIView):
+class ModerationRetrieveAPIView(ConditionalGetMixin, generics.RetrieveAPIView):
     queryset = Moderation.objects.all()
     serializer_class = CustomSerializers.ModerationSerializer
+    version_models = (Moderation,)
@@ -7,4 +7,6 @@ app_name = 'user'
 urlpatterns = [
     path('', views.ListUserView.as_view(), name="list"),
     path('detail/<int:pk>', views.RetrieveUserView.as_view(), name="detail"),
+    path('auth-cache-stats/', views.AuthCacheStatsView.as_view(),
+         name="auth-cache-stats"),
 ]
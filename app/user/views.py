@@ -1,7 +1,9 @@
 from rest_framework import generics
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import BasePermission, IsAuthenticated
+from rest_framework.response import Response
 
 from user.serializers import UserSerializer
+from core.authentication import cache_stats
 from core.models import User
 
 
@@ -14,3 +16,21 @@ class ListUserView(generics.ListAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (IsAuthenticated,)
+
+
+class IsSuperUser(BasePermission):
+    """users are staff by default, so IsAdminUser would let anyone in"""
+
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_superuser)
+
+
+class AuthCacheStatsView(generics.GenericAPIView):
+    """
+    Hits and misses of the authenticated user cache in the worker serving
+    the request, since it started. Other workers keep their own.
+    """
+    permission_classes = (IsSuperUser,)
+
+    def get(self, request, *args, **kwargs):
+        return Response(cache_stats())